@@ -8,7 +8,9 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from postgrest.exceptions import APIError
 
+from app.core import db
 from app.core.auth import CurrentUser, ensure_sst_user_exists, get_current_user
 from app.core.supabase_client import supabase
 from app.models.labeling import (
@@ -22,15 +24,17 @@ from app.services.gamification.service import apply_suggestion_reward
 router = APIRouter(prefix="/api/labeling", tags=["labeling"])
 logger = logging.getLogger(__name__)
 
+# False once the update_suggestion_with_reward RPC is known to be missing (not migrated yet)
+_suggestion_rpc_available = True
+
 
 @router.get("/{session_id}/suggestions", response_model=List[SuggestionResponse])
 async def get_suggestions(session_id: str):
     try:
-        file_res = (
+        file_res = await db.execute(
             supabase.table("sst_audio_files")
             .select("id")
             .eq("session_id", session_id)
-            .execute()
         )
         file_ids = [f["id"] for f in (file_res.data or [])]
     except Exception as exc:
@@ -41,12 +45,11 @@ async def get_suggestions(session_id: str):
         return []
 
     try:
-        sug_res = (
+        sug_res = await db.execute(
             supabase.table("sst_suggestions")
             .select("*")
             .in_("audio_id", file_ids)
             .order("created_at", desc=True)
-            .execute()
         )
         rows = sug_res.data or []
     except Exception as exc:
@@ -62,7 +65,7 @@ async def update_suggestion(
     body: UpdateSuggestionRequest,
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    if not ensure_sst_user_exists(current_user):
+    if not await ensure_sst_user_exists(current_user):
         raise HTTPException(status_code=503, detail="Failed to initialize user profile")
 
     now_iso = datetime.now(timezone.utc).isoformat()
@@ -84,24 +87,79 @@ async def update_suggestion(
     if body.freq_high is not None:
         update_payload["freq_high"] = body.freq_high
 
+    row = await _update_suggestion_rpc(suggestion_id, update_payload, current_user.id)
+    if row is None:
+        row = await _update_suggestion_multi_call(suggestion_id, update_payload, current_user.id)
+    return _row_to_response(row)
+
+
+async def _update_suggestion_rpc(suggestion_id: str, update_payload: dict, user_id: str) -> dict | None:
+    """Status update + reward + mission progress in one round trip (update_suggestion_with_reward RPC).
+
+    Returns the updated row, or None when the RPC is unavailable so the caller falls back.
+    """
+    global _suggestion_rpc_available
+    if not _suggestion_rpc_available:
+        return None
+    try:
+        res = await db.execute(
+            supabase.rpc(
+                "update_suggestion_with_reward",
+                {"p_suggestion_id": suggestion_id, "p_user_id": user_id, "p_update": update_payload},
+            )
+        )
+    except APIError as exc:
+        # not deployed (PGRST202) or not executable with this key (42501, anon key without
+        # service role): stop trying in this process
+        if exc.code in ("PGRST202", "42501"):
+            _suggestion_rpc_available = False
+            logger.warning("RPC update_suggestion_with_reward unavailable (%s). Using multi-call update.", exc.code)
+            return None
+        logger.exception("RPC update_suggestion_with_reward failed", extra={"suggestion_id": suggestion_id})
+        raise HTTPException(status_code=503, detail="Failed to update suggestion") from exc
+    except Exception as exc:
+        # The RPC may have committed before a timeout/reset: never replay it on the non-atomic path
+        logger.exception("RPC update_suggestion_with_reward failed", extra={"suggestion_id": suggestion_id})
+        raise HTTPException(status_code=503, detail="Failed to update suggestion") from exc
+
+    result = res.data
+    if not result:
+        raise HTTPException(status_code=404, detail="Suggestion not found")
+    points = int(result.get("reward_points") or 0)
+    if points > 0:
+        logger.info(
+            "reward_granted suggestion=%s user=%s status=%s points=%d",
+            suggestion_id,
+            user_id,
+            update_payload.get("status"),
+            points,
+        )
+    return result["suggestion"]
+
+
+async def _update_suggestion_multi_call(
+    suggestion_id: str,
+    update_payload: dict,
+    user_id: str,
+) -> dict:
+    """Fallback path: select + update, then apply_suggestion_reward (several round trips)."""
+    next_status = update_payload.get("status")
     previous_status = SuggestionStatusValue.pending.value
     try:
-        before_res = (
+        before_res = await db.execute(
             supabase.table("sst_suggestions")
             .select("status")
             .eq("id", suggestion_id)
             .limit(1)
-            .execute()
         )
         before_rows = before_res.data or []
         if before_rows:
             previous_status = before_rows[0].get("status", SuggestionStatusValue.pending.value)
 
-        res = (
+        res = await db.execute(
             supabase.table("sst_suggestions")
             .update(update_payload)
             .eq("id", suggestion_id)
-            .execute()
         )
         rows = res.data or []
     except Exception as exc:
@@ -111,26 +169,27 @@ async def update_suggestion(
     if not rows:
         raise HTTPException(status_code=404, detail="Suggestion not found")
 
-    if body.status is not None:
+    if next_status is not None:
         try:
-            granted = apply_suggestion_reward(
+            granted = await db.run(
+                apply_suggestion_reward,
                 suggestion_id=suggestion_id,
                 previous_status=previous_status,
-                next_status=body.status.value,
-                user_id=current_user.id,
+                next_status=next_status,
+                user_id=user_id,
             )
             if granted > 0:
                 logger.info(
                     "reward_granted suggestion=%s user=%s status=%s points=%d",
                     suggestion_id,
-                    current_user.id,
-                    body.status.value,
+                    user_id,
+                    next_status,
                     granted,
                 )
         except Exception:
             logger.exception("Failed to apply suggestion reward (non-fatal)", extra={"suggestion_id": suggestion_id})
 
-    return _row_to_response(rows[0])
+    return rows[0]
 
 
 @router.delete("/suggestions/{suggestion_id}", status_code=204)
@@ -139,16 +198,15 @@ async def delete_suggestion(
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Delete a user-created suggestion. AI suggestions cannot be deleted."""
-    if not ensure_sst_user_exists(current_user):
+    if not await ensure_sst_user_exists(current_user):
         raise HTTPException(status_code=503, detail="Failed to initialize user profile")
 
     try:
-        fetch_res = (
+        fetch_res = await db.execute(
             supabase.table("sst_suggestions")
             .select("id, source, created_by")
             .eq("id", suggestion_id)
             .limit(1)
-            .execute()
         )
         rows = getattr(fetch_res, "data", None) or []
     except Exception as exc:
@@ -165,7 +223,7 @@ async def delete_suggestion(
         raise HTTPException(status_code=403, detail="Only the creator can delete this suggestion")
 
     try:
-        supabase.table("sst_suggestions").delete().eq("id", suggestion_id).execute()
+        await db.execute(supabase.table("sst_suggestions").delete().eq("id", suggestion_id))
     except Exception as exc:
         logger.exception("Failed to delete suggestion", extra={"suggestion_id": suggestion_id})
         raise HTTPException(status_code=503, detail="Failed to delete suggestion") from exc
@@ -177,18 +235,17 @@ async def create_manual_suggestions(
     body: CreateSuggestionsRequest,
     current_user: CurrentUser = Depends(get_current_user),
 ):
-    if not ensure_sst_user_exists(current_user):
+    if not await ensure_sst_user_exists(current_user):
         raise HTTPException(status_code=503, detail="Failed to initialize user profile")
 
     if not body.suggestions:
         return []
 
     try:
-        file_res = (
+        file_res = await db.execute(
             supabase.table("sst_audio_files")
             .select("id")
             .eq("session_id", session_id)
-            .execute()
         )
         valid_file_ids = {f["id"] for f in (file_res.data or [])}
     except Exception as exc:
@@ -219,7 +276,7 @@ async def create_manual_suggestions(
         )
 
     try:
-        insert_res = supabase.table("sst_suggestions").insert(rows_to_insert).execute()
+        insert_res = await db.execute(supabase.table("sst_suggestions").insert(rows_to_insert))
         created_rows = insert_res.data or []
     except Exception:
         # Fallback for environments where source/created_by columns are not migrated yet.
@@ -230,7 +287,7 @@ async def create_manual_suggestions(
             row.pop("created_by", None)
             rows_fallback.append(row)
         try:
-            insert_res = supabase.table("sst_suggestions").insert(rows_fallback).execute()
+            insert_res = await db.execute(supabase.table("sst_suggestions").insert(rows_fallback))
             created_rows = insert_res.data or []
         except Exception as exc:
             logger.exception("Failed to create manual suggestions", extra={"session_id": session_id})
@@ -250,11 +307,10 @@ async def export_suggestions(
         raise HTTPException(status_code=400, detail="Format must be 'csv' or 'json'")
 
     try:
-        file_res = (
+        file_res = await db.execute(
             supabase.table("sst_audio_files")
             .select("id, filename")
             .eq("session_id", session_id)
-            .execute()
         )
         file_rows = file_res.data or []
         file_ids = [f["id"] for f in file_rows]
@@ -279,7 +335,7 @@ async def export_suggestions(
                 # (user labels are inherently "labeled" data regardless of status)
                 status_csv = ",".join(statuses)
                 query = query.or_(f"status.in.({status_csv}),source.eq.user")
-        rows = query.order("audio_id").order("start_time").execute().data or []
+        rows = (await db.execute(query.order("audio_id").order("start_time"))).data or []
     except Exception as exc:
         logger.exception("Export: failed to fetch suggestions")
         raise HTTPException(status_code=503, detail="Failed to export") from exc
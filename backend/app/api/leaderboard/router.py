@@ -6,6 +6,7 @@ from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
+from app.core import db
 from app.core.auth import CurrentUser, ensure_sst_user_exists, get_current_user
 from app.core.supabase_client import supabase
 from app.models.leaderboard import LeaderboardEntry
@@ -18,22 +19,20 @@ logger = logging.getLogger(__name__)
 async def get_leaderboard(scope: str = Query("daily", pattern="^(daily|weekly|all_time)$")):
     try:
         if scope == "all_time":
-            res = (
+            res = await db.execute(
                 supabase.table("sst_users")
                 .select("*")
                 .order("all_time_score", desc=True)
-                .execute()
             )
             rows = res.data or []
         elif scope == "weekly":
-            users_res = supabase.table("sst_users").select("*").execute()
+            users_res = await db.execute(supabase.table("sst_users").select("*"))
             users = users_res.data or []
             since = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-            ev_res = (
+            ev_res = await db.execute(
                 supabase.table("sst_reward_events")
                 .select("user_id,points")
                 .gte("occurred_at", since)
-                .execute()
             )
             weekly_points: dict[str, int] = defaultdict(int)
             for event in (ev_res.data or []):
@@ -44,11 +43,10 @@ async def get_leaderboard(scope: str = Query("daily", pattern="^(daily|weekly|al
                 user["today_score"] = weekly_points.get(user.get("id"), 0)
             rows = sorted(users, key=lambda x: int(x.get("today_score", 0)), reverse=True)
         else:
-            res = (
+            res = await db.execute(
                 supabase.table("sst_users")
                 .select("*")
                 .order("today_score", desc=True)
-                .execute()
             )
             rows = res.data or []
     except Exception as exc:
@@ -63,16 +61,15 @@ async def get_my_score(
     current_user: CurrentUser = Depends(get_current_user),
 ):
     """Get current authenticated user's score."""
-    if not ensure_sst_user_exists(current_user):
+    if not await ensure_sst_user_exists(current_user):
         raise HTTPException(status_code=503, detail="Failed to initialize user profile")
 
     try:
-        res = (
+        res = await db.execute(
             supabase.table("sst_users")
             .select("*")
             .eq("id", current_user.id)
             .limit(1)
-            .execute()
         )
     except Exception as exc:
         logger.exception("Failed to fetch user score", extra={"user_id": current_user.id})
@@ -87,12 +84,11 @@ async def get_my_score(
         row["today_score"] = int(row.get("all_time_score", 0))
     elif scope == "weekly":
         since = (datetime.now(timezone.utc) - timedelta(days=7)).isoformat()
-        ev_res = (
+        ev_res = await db.execute(
             supabase.table("sst_reward_events")
             .select("points")
             .eq("user_id", current_user.id)
             .gte("occurred_at", since)
-            .execute()
         )
         row["today_score"] = sum(int(x.get("points", 0)) for x in (ev_res.data or []))
 
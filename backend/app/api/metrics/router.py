@@ -0,0 +1,131 @@
+"""Prometheus 스크레이프 엔드포인트(/metrics)와 HTTP 요청 지연 미들웨어.
+
+요청 지연은 라우터(tags[0]) 단위로 집계한다 — 경로 파라미터가 포함된 URL을 그대로 라벨로 쓰지 않기 위함.
+요청마다 Supabase 호출 수도 집계해 DB 왕복이 많은(chatty) 라우터를 찾는다.
+분석 큐 길이, 캐시 적중률, 취소 통계처럼 이미 다른 모듈이 보관하는 값은
+function 메트릭으로 등록해 스크레이프 시점에 읽는다.
+프로세스 풀 실행 시 워커 안의 캐시(기저 행렬 캐시)는 워커별로 존재하므로 여기에는 API 프로세스 값만 보인다.
+
+/metrics는 공개 앱에 붙어 있으므로 METRICS_TOKEN이 설정된 경우에만 열리고(없으면 404),
+스크레이퍼는 Authorization: Bearer <METRICS_TOKEN>을 보내야 한다.
+"""
+import hmac
+import time
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY, render_prometheus
+from app.core.supabase_client import begin_call_trace
+from app.services.analysis.basis_cache import get_basis_cache
+from app.services.analysis.executor import get_cancellation_stats
+from app.services.analysis.result_cache import get_result_cache
+from app.services.analysis.scheduler import get_analysis_scheduler
+
+router = APIRouter(tags=["metrics"])
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by router",
+    label_names=("router", "method", "status"),
+)
+HTTP_REQUEST_SUPABASE_CALLS = REGISTRY.histogram(
+    "http_request_supabase_calls",
+    "Supabase calls made while serving one HTTP request",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21),
+    label_names=("router", "method"),
+)
+
+
+def _hit_ratio(cache) -> float:
+    hits, misses = cache.hits, cache.misses
+    return hits / (hits + misses) if hits + misses else 0.0
+
+
+REGISTRY.gauge(
+    "analysis_queue_depth", "Analyses waiting for an execution slot",
+    function=lambda: get_analysis_scheduler().queue_depth,
+)
+REGISTRY.gauge(
+    "analysis_in_flight", "Analyses currently running",
+    function=lambda: get_analysis_scheduler().in_flight,
+)
+REGISTRY.counter(
+    "analysis_result_cache_hits_total", "Result cache hits",
+    function=lambda: get_result_cache().hits,
+)
+REGISTRY.counter(
+    "analysis_result_cache_misses_total", "Result cache misses",
+    function=lambda: get_result_cache().misses,
+)
+REGISTRY.counter(
+    "analysis_result_cache_evictions_total", "Result cache entries evicted for space",
+    function=lambda: get_result_cache().evictions,
+)
+REGISTRY.gauge(
+    "analysis_result_cache_hit_ratio", "Result cache hits / lookups since start",
+    function=lambda: _hit_ratio(get_result_cache()),
+)
+REGISTRY.gauge(
+    "analysis_basis_cache_hit_ratio", "DFT basis cache hits / lookups in this process",
+    function=lambda: _hit_ratio(get_basis_cache()),
+)
+REGISTRY.counter(
+    "analysis_cancelled_runs_total", "Analyses cancelled after submission",
+    function=lambda: get_cancellation_stats()["cancelled_runs"],
+)
+REGISTRY.counter(
+    "analysis_cancelled_wasted_cpu_seconds_total", "CPU time spent on cancelled analyses",
+    function=lambda: get_cancellation_stats()["wasted_cpu_sec"],
+)
+REGISTRY.counter(
+    "analysis_worker_hard_kills_total", "Workers killed for ignoring cancellation",
+    function=lambda: get_cancellation_stats()["hard_kills"],
+)
+
+
+def _router_label(request: Request) -> str:
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    tags = getattr(route, "tags", None)
+    return tags[0] if tags else getattr(route, "path", "unmatched")
+
+
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    calls = begin_call_trace()
+    status = "500"
+    try:
+        response = await call_next(request)
+        status = str(response.status_code)
+        return response
+    finally:
+        router_label = _router_label(request)
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            router=router_label,
+            method=request.method,
+            status=status,
+        )
+        HTTP_REQUEST_SUPABASE_CALLS.observe(len(calls), router=router_label, method=request.method)
+
+
+def require_metrics_token(request: Request) -> None:
+    token = settings.metrics_token
+    if not token:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(credentials.encode(), token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid metrics token", headers={"WWW-Authenticate": "Bearer"})
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def metrics():
+    return PlainTextResponse(render_prometheus(), media_type=CONTENT_TYPE)
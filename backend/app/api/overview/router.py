@@ -2,6 +2,7 @@
 import logging
 from fastapi import APIRouter, HTTPException
 from app.models.overview import OverviewMetrics
+from app.core import db
 from app.core.supabase_client import supabase
 
 router = APIRouter(prefix="/api/overview", tags=["overview"])
@@ -11,7 +12,7 @@ logger = logging.getLogger(__name__)
 @router.get("/metrics", response_model=OverviewMetrics)
 async def get_overview_metrics():
     try:
-        res = supabase.table("sst_sessions").select("*").execute()
+        res = await db.execute(supabase.table("sst_sessions").select("*"))
         sessions = res.data or []
     except Exception as exc:
         logger.exception("Failed to fetch overview metrics")
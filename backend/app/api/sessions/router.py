@@ -1,10 +1,13 @@
-"""세션 API: 세션 목록 조회, 파일 조회, 세션 삭제 (cascade + Supabase Storage 클린업)."""
+"""세션 API: 세션 목록 조회, 파일 조회, 세션 삭제 (cascade + Supabase Storage/특징 저장소 클린업)."""
+import asyncio
 import logging
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List
 from app.core.auth import CurrentUser, get_current_user, get_optional_current_user
 from app.models.sessions import SessionResponse, AudioFileResponse
+from app.core import db
 from app.core.supabase_client import supabase
+from app.services.analysis.feature_store import get_feature_store
 
 router = APIRouter(prefix="/api/sessions", tags=["sessions"])
 logger = logging.getLogger(__name__)
@@ -13,11 +16,10 @@ logger = logging.getLogger(__name__)
 @router.get("", response_model=List[SessionResponse])
 async def list_sessions():
     try:
-        res = (
+        res = await db.execute(
             supabase.table("sst_sessions")
             .select("*")
             .order("created_at", desc=True)
-            .execute()
         )
         rows = res.data or []
     except Exception as exc:
@@ -43,12 +45,11 @@ async def list_sessions():
 @router.get("/{session_id}/files", response_model=List[AudioFileResponse])
 async def get_session_files(session_id: str):
     try:
-        res = (
+        res = await db.execute(
             supabase.table("sst_audio_files")
             .select("*")
             .eq("session_id", session_id)
             .order("created_at", desc=True)
-            .execute()
         )
         rows = res.data or []
     except Exception as exc:
@@ -85,11 +86,10 @@ async def delete_session(
     """
     try:
         # Step 0: Verify session exists and check ownership
-        check_res = (
+        check_res = await db.execute(
             supabase.table("sst_sessions")
             .select("id, user_id")
             .eq("id", session_id)
-            .execute()
         )
         if not (check_res.data or []):
             raise HTTPException(status_code=404, detail="Session not found")
@@ -100,25 +100,24 @@ async def delete_session(
             raise HTTPException(status_code=403, detail="Only the session owner can delete this session")
 
         # Step 1: Get audio file records
-        file_res = (
+        file_res = await db.execute(
             supabase.table("sst_audio_files")
             .select("id, audio_url")
             .eq("session_id", session_id)
-            .execute()
         )
         file_rows = file_res.data or []
         file_ids = [f["id"] for f in file_rows]
 
         # Step 2: Delete suggestions
         if file_ids:
-            supabase.table("sst_suggestions").delete().in_("audio_id", file_ids).execute()
+            await db.execute(supabase.table("sst_suggestions").delete().in_("audio_id", file_ids))
 
         # Step 3: Delete audio files
         if file_ids:
-            supabase.table("sst_audio_files").delete().in_("id", file_ids).execute()
+            await db.execute(supabase.table("sst_audio_files").delete().in_("id", file_ids))
 
         # Step 4: Delete session
-        supabase.table("sst_sessions").delete().eq("id", session_id).execute()
+        await db.execute(supabase.table("sst_sessions").delete().eq("id", session_id))
 
         # Step 5: Remove files from Supabase Storage
         storage_keys = []
@@ -130,10 +129,17 @@ async def delete_session(
                     storage_keys.append(key)
         if storage_keys:
             try:
-                supabase.storage.from_("sst-audio").remove(storage_keys)
+                await db.run(supabase.storage.from_("sst-audio").remove, storage_keys)
             except Exception:
                 logger.warning("Failed to remove storage files: %s", storage_keys)
 
+        # Step 6: Remove stored chunk features (reanalysis cache) for the deleted audio
+        if file_ids:
+            try:
+                await asyncio.to_thread(get_feature_store().delete_many, file_ids)
+            except Exception:
+                logger.warning("Failed to remove stored features: %s", file_ids)
+
     except HTTPException:
         raise
     except Exception as exc:
@@ -1,4 +1,5 @@
 """업로드 API: 멀티파트 파일 업로드, 확장자/크기 검증, 비동기 분석 트리거."""
+import hashlib
 import logging
 import os
 import shutil
@@ -11,11 +12,18 @@ from typing import Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 
+from app.core import db
 from app.core.auth import CurrentUser, get_optional_current_user
 from app.services.job_manager import register_job, set_job_status
 from app.core.config import settings
 from app.core.supabase_client import supabase
 from app.models.upload import UploadJobStatus, UploadResult
+from app.services.analysis.scheduler import (
+    AnalysisQueueFull,
+    AnalysisSchedulerClosed,
+    get_analysis_scheduler,
+)
+from app.services.analysis.engine import suggestion_rows
 from app.services.analysis.service import AnalysisService
 
 router = APIRouter(prefix="/api/upload", tags=["upload"])
@@ -121,8 +129,10 @@ async def _save_file_with_size_limit(
     upload: UploadFile,
     destination_path: str,
     max_bytes: int,
-) -> None:
+) -> str:
+    """업로드를 디스크에 저장하면서 sha256을 계산해 반환 (분석 결과 캐시 키)."""
     total = 0
+    digest = hashlib.sha256()
     try:
         with open(destination_path, "wb") as out:
             while True:
@@ -132,7 +142,9 @@ async def _save_file_with_size_limit(
                 total += len(chunk)
                 if total > max_bytes:
                     raise ValueError("File too large")
+                digest.update(chunk)
                 out.write(chunk)
+        return digest.hexdigest()
     except Exception:
         if os.path.exists(destination_path):
             try:
@@ -142,79 +154,151 @@ async def _save_file_with_size_limit(
         raise
 
 
-async def _run_analysis_jobs(session_id: str, uploaded_records: list[dict]) -> None:
-    """Run analysis on each uploaded file, then remove the temp local copy."""
-    analysis = AnalysisService()
-    for record in uploaded_records:
-        job_id = record.get("job_id")
-        if not job_id:
-            continue
-
-        set_job_status(
+async def _analyze_record(analysis: AnalysisService, session_id: str, record: dict) -> None:
+    """Analyze one uploaded file, store its suggestions, then remove the temp local copy."""
+    job_id = record["job_id"]
+    file_path = _temp_file_path(record)
+    now_iso = datetime.now(timezone.utc).isoformat()
+    try:
+        await set_job_status(
             job_id,
             status=UploadJobStatus.processing,
             progress=40,
             session_id=session_id,
             file_count=1,
+            queue_position=0,
+        )
+        drafts = await analysis.analyze(
+            file_path, content_hash=record.get("content_hash"), audio_id=record["id"],
         )
+        rows = suggestion_rows(record["id"], drafts, now_iso)
+        if rows:
+            await db.execute(supabase.table("sst_suggestions").insert(rows))
 
-        file_path = os.path.join(
-            settings.temp_upload_dir,
-            f"{record['id']}{record.get('ext', '').lower()}",
+        await set_job_status(
+            job_id,
+            status=UploadJobStatus.done,
+            progress=100,
+            session_id=session_id,
+            file_count=1,
         )
-        now_iso = datetime.now(timezone.utc).isoformat()
+    except asyncio.CancelledError:
+        # Scheduler drain on shutdown: don't leave the job stuck in processing
+        logger.warning("Analysis cancelled for file %s", record["id"])
+        await _mark_job_cancelled(job_id, session_id)
+        raise
+    except Exception:
+        logger.exception("Analysis failed for file %s", record["id"])
+        await set_job_status(
+            job_id,
+            status=UploadJobStatus.failed,
+            progress=100,
+            error="Analysis failed",
+            session_id=session_id,
+            file_count=1,
+        )
+    finally:
+        # Clean up temp local file after analysis (success or failure)
+        _remove_temp_file(file_path)
+
+
+async def _mark_job_cancelled(job_id: str, session_id: str) -> None:
+    await set_job_status(
+        job_id,
+        status=UploadJobStatus.failed,
+        progress=100,
+        error="Cancelled during shutdown",
+        session_id=session_id,
+        file_count=1,
+    )
+
+
+def _temp_file_path(record: dict) -> str:
+    return os.path.join(
+        settings.temp_upload_dir,
+        f"{record['id']}{record.get('ext', '').lower()}",
+    )
+
+
+def _remove_temp_file(file_path: str) -> None:
+    if os.path.exists(file_path):
         try:
-            drafts = await analysis.analyze(file_path)
-            suggestion_rows = [
-                {
-                    "id": f"sug-{uuid.uuid4().hex[:8]}",
-                    "audio_id": record["id"],
-                    "label": d.label,
-                    "confidence": d.confidence,
-                    "description": d.description,
-                    "start_time": d.start_time,
-                    "end_time": d.end_time,
-                    "freq_low": d.freq_low,
-                    "freq_high": d.freq_high,
-                    "status": "pending",
-                    "created_at": now_iso,
-                    "updated_at": now_iso,
-                }
-                for d in drafts
-            ]
-            if suggestion_rows:
-                supabase.table("sst_suggestions").insert(suggestion_rows).execute()
-
-            set_job_status(
+            os.remove(file_path)
+        except Exception:
+            logger.warning("Failed to remove temp file: %s", file_path)
+
+
+async def _run_analysis_jobs(session_id: str, uploaded_records: list[dict]) -> None:
+    """Queue each uploaded file on the analysis scheduler, then mark the session completed.
+
+    Files run concurrently within the scheduler's global/per-session limits.
+    When the queue is full the file's job is failed immediately (backpressure).
+    The queued status is written from inside the scheduled task (on_queued) so it can never
+    overwrite a later processing/done status; queue_position is the position at submission.
+    Jobs cancelled by the shutdown drain (queued or running) are marked failed, and the session
+    is still marked completed.
+    """
+    scheduler = get_analysis_scheduler()
+    analysis = AnalysisService()
+    tasks: list[asyncio.Task] = []
+
+    for record in uploaded_records:
+        job_id = record.get("job_id")
+        if not job_id:
+            continue
+
+        async def mark_cancelled(job_id: str = job_id, record: dict = record) -> None:
+            await _mark_job_cancelled(job_id, session_id)
+            _remove_temp_file(_temp_file_path(record))
+
+        async def mark_queued(position: int, job_id: str = job_id) -> None:
+            await set_job_status(
                 job_id,
-                status=UploadJobStatus.done,
-                progress=100,
+                status=UploadJobStatus.queued,
                 session_id=session_id,
                 file_count=1,
+                queue_position=position,
             )
-        except Exception:
-            logger.exception("Analysis failed for file %s", record["id"])
-            set_job_status(
+
+        try:
+            task, _ = scheduler.submit(
+                session_id,
+                lambda record=record: _analyze_record(analysis, session_id, record),
+                on_queued=mark_queued,
+                on_cancelled=mark_cancelled,
+            )
+        except (AnalysisQueueFull, AnalysisSchedulerClosed) as exc:
+            logger.warning("Analysis rejected for file %s: %s", record["id"], exc)
+            await set_job_status(
                 job_id,
                 status=UploadJobStatus.failed,
                 progress=100,
-                error="Analysis failed",
+                error="Analysis queue full" if isinstance(exc, AnalysisQueueFull) else "Server shutting down",
                 session_id=session_id,
                 file_count=1,
             )
-        finally:
-            # Clean up temp local file after analysis (success or failure)
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception:
-                    logger.warning("Failed to remove temp file: %s", file_path)
+            _remove_temp_file(_temp_file_path(record))
+            continue
 
+        tasks.append(task)
+
+    try:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    except asyncio.CancelledError:
+        # Shutdown drain: let each file task record its failed status, then close the session
+        if tasks:
+            await asyncio.wait(tasks)
+        await _mark_session_completed(session_id)
+        raise
+    await _mark_session_completed(session_id)
+
+
+async def _mark_session_completed(session_id: str) -> None:
     # Update session status after all files processed
     try:
-        supabase.table("sst_sessions").update(
-            {"status": "completed"}
-        ).eq("id", session_id).execute()
+        await db.execute(
+            supabase.table("sst_sessions").update({"status": "completed"}).eq("id", session_id)
+        )
     except Exception:
         logger.exception("Failed to update session status after analysis")
 
@@ -224,6 +308,7 @@ def _write_uploads_atomically(
     session_payload: dict,
     uploaded_records: list[dict],
 ):
+    """세션/파일 행 기록 (동기, db.run으로 DB 스레드풀에서 실행)."""
     # Preferred path: single RPC transaction in Postgres.
     try:
         supabase.rpc(
@@ -293,7 +378,7 @@ async def upload_files(
         ext = os.path.splitext(f.filename or "")[1].lower()
         save_path = os.path.join(settings.temp_upload_dir, f"{file_id}{ext}")
         try:
-            await _save_file_with_size_limit(f, save_path, max_bytes)
+            content_hash = await _save_file_with_size_limit(f, save_path, max_bytes)
         except ValueError:
             results.append(
                 UploadResult(
@@ -322,7 +407,7 @@ async def upload_files(
         storage_key = f"{file_id}{ext}"
         content_type = MIME_MAP.get(ext, "application/octet-stream")
         try:
-            audio_url = _upload_to_storage(save_path, storage_key, content_type)
+            audio_url = await db.run(_upload_to_storage, save_path, storage_key, content_type)
         except Exception:
             logger.exception("Failed to upload to Supabase Storage", extra={"file_id": file_id})
             # Clean up temp file on storage upload failure
@@ -339,7 +424,7 @@ async def upload_files(
             continue
 
         job_id = str(uuid.uuid4())
-        register_job(job_id, UploadJobStatus.queued, file_count=1)
+        await register_job(job_id, UploadJobStatus.queued, file_count=1)
 
         uploaded_records.append(
             {
@@ -353,7 +438,7 @@ async def upload_files(
                 "created_at": datetime.now(timezone.utc).isoformat(),
             }
         )
-        analysis_records.append({"id": file_id, "ext": ext, "job_id": job_id})
+        analysis_records.append({"id": file_id, "ext": ext, "job_id": job_id, "content_hash": content_hash})
 
         results.append(
             UploadResult(
@@ -381,16 +466,17 @@ async def upload_files(
         }
 
         try:
-            _write_uploads_atomically(
+            await db.run(
+                _write_uploads_atomically,
                 session_payload=session_payload,
                 uploaded_records=uploaded_records,
             )
 
-            asyncio.create_task(_run_analysis_jobs(session_id, analysis_records))
+            get_analysis_scheduler().track(_run_analysis_jobs(session_id, analysis_records))
         except Exception:
             for item in results:
                 if item.job_id:
-                    set_job_status(
+                    await set_job_status(
                         item.job_id,
                         status=UploadJobStatus.failed,
                         progress=100,
@@ -1,17 +1,41 @@
-"""Supabase auth helpers for API routes."""
+"""Supabase auth helpers for API routes.
+
+Bearer tokens are verified locally when possible: HS256 tokens with SUPABASE_JWT_SECRET,
+asymmetric tokens (RS256/ES256) against the project JWKS. Tokens we cannot verify locally
+(no secret configured, unknown key id, no crypto backend) fall back to supabase.auth.get_user().
+Verified users are kept in a bounded TTL cache keyed by the token hash, never past the token's
+own expiry, so repeated requests with the same token skip verification entirely.
+A revoked-but-unexpired token stays accepted for at most AUTH_TOKEN_CACHE_TTL_SEC.
+"""
 from __future__ import annotations
 
+import hashlib
 import logging
+import time
 from dataclasses import dataclass
 
+import jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from postgrest.types import ReturnMethod
 
+from app.core import db
+from app.core.config import settings
+from app.core.metrics import REGISTRY
 from app.core.supabase_client import supabase
+from app.core.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 security = HTTPBearer(auto_error=False)
 
+AUTH_TOKEN_VERIFICATIONS = REGISTRY.counter(
+    "auth_token_verifications_total",
+    "Bearer token verifications by path (cache, local, remote)",
+    label_names=("path",),
+)
+
+_ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
 
 @dataclass
 class CurrentUser:
@@ -35,18 +59,81 @@ def _extract_user(auth_response: object) -> object | None:
     return None
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials | None = Depends(security),
-) -> CurrentUser:
-    if credentials is None or credentials.scheme.lower() != "bearer":
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
+class _NotLocallyVerifiable(Exception):
+    """The token must be checked by the auth server (no secret, unknown key, unsupported alg)."""
 
-    token = credentials.credentials
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
 
+_token_cache: TTLCache[CurrentUser] = TTLCache(settings.auth_token_cache_size, settings.auth_token_cache_ttl_sec)
+_jwks_client: jwt.PyJWKClient | None = None
+
+
+def get_token_cache() -> TTLCache[CurrentUser]:
+    return _token_cache
+
+
+def _get_jwks_client() -> jwt.PyJWKClient:
+    global _jwks_client
+    if _jwks_client is None:
+        _jwks_client = jwt.PyJWKClient(
+            f"{settings.supabase_url.rstrip('/')}/auth/v1/.well-known/jwks.json",
+            cache_keys=True,
+            lifespan=settings.auth_jwks_cache_sec,
+        )
+    return _jwks_client
+
+
+def _user_from_claims(claims: dict) -> CurrentUser:
+    user_id = claims.get("sub")
+    if not user_id:
+        raise jwt.InvalidTokenError("missing sub claim")
+    metadata = claims.get("user_metadata") or {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return CurrentUser(
+        id=str(user_id),
+        email=claims.get("email"),
+        name=metadata.get("full_name") or metadata.get("name"),
+    )
+
+
+def _verify_locally(token: str, alg: str | None) -> tuple[CurrentUser, float]:
+    """Return (user, exp) for a token whose signature and expiry check out.
+
+    Raises jwt.InvalidTokenError for tokens that are definitely invalid (bad signature,
+    expired, wrong audience) and _NotLocallyVerifiable when the auth server must decide.
+    May fetch the JWKS over the network on first use, so call it off the event loop.
+    """
+    if alg == "HS256" and settings.supabase_jwt_secret:
+        key = settings.supabase_jwt_secret
+    elif alg in _ASYMMETRIC_ALGORITHMS and settings.auth_jwks_enabled and jwt.algorithms.has_crypto:
+        try:
+            key = _get_jwks_client().get_signing_key_from_jwt(token).key
+        except jwt.PyJWKClientError as exc:
+            raise _NotLocallyVerifiable(str(exc)) from exc
+    else:
+        raise _NotLocallyVerifiable(f"alg {alg!r} not verifiable locally")
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=[alg],
+        audience=settings.supabase_jwt_audience,
+        options={"require": ["exp", "sub"]},
+    )
+    return _user_from_claims(claims), float(claims["exp"])
+
+
+def _unverified_expiry(token: str) -> float | None:
     try:
-        auth_response = supabase.auth.get_user(token)
+        exp = jwt.decode(token, options={"verify_signature": False}).get("exp")
+    except jwt.InvalidTokenError:
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+async def _verify_remotely(token: str) -> CurrentUser:
+    try:
+        auth_response = await db.run(supabase.auth.get_user, token)
         user = _extract_user(auth_response)
     except Exception as exc:
         logger.exception("Supabase auth verification failed")
@@ -68,6 +155,47 @@ async def get_current_user(
     return CurrentUser(id=str(user_id), email=email, name=name)
 
 
+async def verify_token(token: str) -> CurrentUser:
+    """Resolve a bearer token to a user: cache, then local JWT verification, then the auth server."""
+    cache_key = hashlib.sha256(token.encode("utf-8")).digest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        AUTH_TOKEN_VERIFICATIONS.inc(path="cache")
+        return cached
+
+    try:
+        alg = jwt.get_unverified_header(token).get("alg")
+        if alg == "HS256":
+            user, exp = _verify_locally(token, alg)  # pure CPU, no need to leave the loop
+        else:
+            user, exp = await db.run(_verify_locally, token, alg)
+        path = "local"
+    except _NotLocallyVerifiable:
+        user = await _verify_remotely(token)
+        exp = _unverified_expiry(token)
+        path = "remote"
+    except jwt.InvalidTokenError as exc:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
+
+    AUTH_TOKEN_VERIFICATIONS.inc(path=path)
+    if exp is not None:
+        _token_cache.set(cache_key, user, exp - time.time())
+    return user
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(security),
+) -> CurrentUser:
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
+
+    token = credentials.credentials
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing bearer token")
+
+    return await verify_token(token)
+
+
 async def get_optional_current_user(
     credentials: HTTPAuthorizationCredentials | None = Depends(security),
 ) -> CurrentUser | None:
@@ -80,24 +208,27 @@ async def get_optional_current_user(
         return None
 
 
-def ensure_sst_user_exists(user: CurrentUser) -> bool:
-    """Ensure sst_users row exists for authenticated user."""
-    try:
-        res = (
-            supabase.table("sst_users")
-            .select("id")
-            .eq("id", user.id)
-            .limit(1)
-            .execute()
-        )
-        rows = getattr(res, "data", None) or []
-        if rows:
-            return True
+_known_users: TTLCache[bool] = TTLCache(settings.sst_user_cache_size, settings.sst_user_cache_ttl_sec)
+
 
-        email = user.email or f"{user.id}@unknown.local"
-        name = user.name or email.split("@")[0]
+def get_known_users_cache() -> TTLCache[bool]:
+    return _known_users
 
-        supabase.table("sst_users").upsert(
+
+async def ensure_sst_user_exists(user: CurrentUser) -> bool:
+    """Ensure sst_users row exists for authenticated user.
+
+    Ids confirmed in this process are remembered for SST_USER_CACHE_TTL_SEC, so steady-state
+    requests make no DB call. On a miss a single insert-if-absent upsert (ignore_duplicates)
+    replaces the old select + upsert pair and never overwrites an existing row's scores.
+    """
+    if _known_users.get(user.id):
+        return True
+
+    email = user.email or f"{user.id}@unknown.local"
+    name = user.name or email.split("@")[0]
+    try:
+        await db.execute(supabase.table("sst_users").upsert(
             {
                 "id": user.id,
                 "name": name,
@@ -108,8 +239,11 @@ def ensure_sst_user_exists(user: CurrentUser) -> bool:
                 "all_time_score": 0,
             },
             on_conflict="id",
-        ).execute()
-        return True
+            ignore_duplicates=True,
+            returning=ReturnMethod.minimal,
+        ))
     except Exception:
         logger.exception("Failed to ensure sst_users row", extra={"user_id": user.id})
         return False
+    _known_users.set(user.id, True)
+    return True
@@ -6,6 +6,24 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_anon_key: str
     supabase_service_role_key: str | None = None
+    supabase_max_concurrency: int = 16
+    supabase_pool_max_connections: int = 32
+    supabase_pool_max_keepalive: int = 16
+    supabase_keepalive_expiry_sec: float = 60.0
+    supabase_http2: bool = True
+    supabase_timeout_sec: float | None = None
+    supabase_connect_timeout_sec: float = 5.0
+    supabase_retry_attempts: int = 2
+    supabase_retry_backoff_sec: float = 0.1
+    supabase_slow_call_ms: int = 500
+    supabase_jwt_secret: str | None = None
+    supabase_jwt_audience: str = "authenticated"
+    auth_jwks_enabled: bool = True
+    auth_jwks_cache_sec: float = 600.0
+    auth_token_cache_size: int = 4096
+    auth_token_cache_ttl_sec: float = 60.0
+    sst_user_cache_size: int = 10000
+    sst_user_cache_ttl_sec: float = 600.0
     allowed_origins: str = "http://localhost:3000"
     max_file_size_mb: int = 1024
     temp_upload_dir: str = "./temp_uploads"
@@ -13,6 +31,19 @@ class Settings(BaseSettings):
     analysis_engine: str = "soundlab_v57"
     analysis_timeout_sec: int = 120
     analysis_config_dir: str = "./config"
+    analysis_basis_cache_mb: int = 256
+    analysis_workers: int = 0
+    analysis_warm_sample_rates: list[int] = [44100, 48000]
+    analysis_max_concurrency: int = 4
+    analysis_per_session_concurrency: int = 2
+    analysis_queue_max: int = 200
+    analysis_drain_timeout_sec: int = 30
+    analysis_cancel_grace_sec: float = 5.0
+    analysis_result_cache_dir: str = "./analysis_cache"
+    analysis_result_cache_mb: int = 512
+    analysis_feature_store_dir: str = "./feature_store"
+    analysis_feature_store_mb: int = 256
+    metrics_token: str | None = None  # 설정 시에만 /metrics 노출 (Authorization: Bearer <token>)
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,62 @@
+"""비동기 Supabase 접근 계층 (bounded thread offload).
+
+supabase-py 동기 클라이언트의 호출(.execute(), storage, auth)은 HTTP 왕복 동안 스레드를 막는다.
+async 핸들러에서 직접 부르면 이벤트 루프 전체가 멈추므로, 라우터와 서비스는 이 모듈을 통해
+전용 스레드풀(크기 SUPABASE_MAX_CONCURRENCY)에서 실행한다. 풀이 가득 차면 이후 호출은
+풀 큐에서 기다리므로 동시 DB 요청 수가 제한된다.
+
+    res = await db.execute(supabase.table("sst_users").select("*").eq("id", user_id))
+    url = await db.run(_upload_to_storage, path, key, content_type)
+
+쿼리 빌더 체인(.table().select().eq()...)은 I/O가 없으므로 호출 스레드에서 만들고 .execute()만 넘긴다.
+여러 쿼리를 묶은 동기 헬퍼는 run()으로 한 번에 넘긴다 (헬퍼 하나가 풀 스레드 하나를 점유).
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.supabase_max_concurrency),
+                thread_name_prefix="supabase",
+            )
+        return _executor
+
+
+async def run(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """동기 Supabase 호출(또는 이를 묶은 헬퍼)을 DB 스레드풀에서 실행.
+
+    호출자의 contextvars를 복사해 넘긴다 (요청 단위 호출 추적이 풀 스레드에서도 이어지도록).
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_get_executor(), functools.partial(context.run, fn, *args, **kwargs))
+
+
+async def execute(query: Any) -> Any:
+    """PostgREST 쿼리 빌더의 .execute()를 DB 스레드풀에서 실행하고 응답(APIResponse)을 반환."""
+    return await run(query.execute)
+
+
+def shutdown_db_executor(wait: bool = True) -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
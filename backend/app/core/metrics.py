@@ -0,0 +1,260 @@
+"""프로세스 내 메트릭 집계 (Counter / Gauge / Histogram) 및 Prometheus 텍스트 출력.
+
+외부 라이브러리 없이 Prometheus와 같은 의미의 메트릭을 제공한다.
+메트릭은 이름으로 한 번만 등록되며(get-or-create), 라벨 값 조합마다 따로 집계된다.
+Counter/Gauge는 function을 주면 수집 시점에 값을 읽는다 (기존 통계 객체/큐 길이 노출용).
+render_prometheus()가 /metrics 응답(text exposition format 0.0.4)을 만든다.
+모든 연산은 스레드 안전하다.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from dataclasses import dataclass
+from typing import Callable, Union
+
+# 밀리초~수십 초 범위의 처리 시간용 기본 bucket (초 단위)
+DEFAULT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# KB~GB 범위의 메모리 크기용 기본 bucket (바이트 단위)
+DEFAULT_BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(11))  # 1 KiB ~ 1 GiB
+
+
+@dataclass
+class HistogramSample:
+    """라벨 조합 하나의 집계 값. bucket_counts는 누적이 아닌 구간별 개수 (마지막은 +Inf 구간)."""
+
+    bucket_counts: list[int]
+    sum: float = 0.0
+    count: int = 0
+
+    def cumulative(self) -> list[int]:
+        total = 0
+        out = []
+        for c in self.bucket_counts:
+            total += c
+            out.append(total)
+        return out
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_TIME_BUCKETS,
+        label_names: tuple[str, ...] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.label_names = label_names
+        self._samples: dict[tuple[str, ...], HistogramSample] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            sample = self._samples.get(key)
+            if sample is None:
+                sample = self._samples[key] = HistogramSample([0] * (len(self.buckets) + 1))
+            sample.bucket_counts[index] += 1
+            sample.sum += value
+            sample.count += 1
+
+    def snapshot(self) -> dict[tuple[str, ...], HistogramSample]:
+        with self._lock:
+            return {
+                key: HistogramSample(list(s.bucket_counts), s.sum, s.count)
+                for key, s in self._samples.items()
+            }
+
+    def quantile(self, q: float, **labels: str) -> float | None:
+        """bucket 경계로 추정한 분위수 (해당 bucket의 상한). 관측값이 없으면 None."""
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        sample = self.snapshot().get(key)
+        if sample is None or sample.count == 0:
+            return None
+        rank = q * sample.count
+        for bound, cumulative in zip(self.buckets + (float("inf"),), sample.cumulative()):
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+class _Value:
+    """Counter/Gauge 공통: 라벨 조합별 단일 값, 또는 수집 시점에 읽는 function."""
+
+    type_name = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        function: Callable[[], float] | None = None,
+    ) -> None:
+        if function is not None and label_names:
+            raise ValueError("function-backed metrics cannot have labels")
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._function = function
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def _add(self, amount: float, labels: dict[str, str]) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        if self._function is not None:
+            return float(self._function())
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def snapshot(self) -> dict[tuple[str, ...], float]:
+        if self._function is not None:
+            return {(): float(self._function())}
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(_Value):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        self._add(amount, labels)
+
+
+class Gauge(_Value):
+    type_name = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(amount, labels)
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self._add(-amount, labels)
+
+
+Metric = Union[Counter, Gauge, Histogram]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls: type, name: str, label_names: tuple[str, ...], factory: Callable[[], Metric]):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            elif type(metric) is not cls or metric.label_names != label_names:
+                raise ValueError(f"metric {name!r} already registered with a different type or labels")
+            return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: tuple[float, ...] = DEFAULT_TIME_BUCKETS,
+        label_names: tuple[str, ...] = (),
+    ) -> Histogram:
+        return self._get_or_create(
+            Histogram, name, label_names, lambda: Histogram(name, documentation, buckets, label_names),
+        )
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        function: Callable[[], float] | None = None,
+    ) -> Counter:
+        return self._get_or_create(
+            Counter, name, label_names, lambda: Counter(name, documentation, label_names, function),
+        )
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        function: Callable[[], float] | None = None,
+    ) -> Gauge:
+        return self._get_or_create(
+            Gauge, name, label_names, lambda: Gauge(name, documentation, label_names, function),
+        )
+
+    def metrics(self) -> list[Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+
+REGISTRY = MetricsRegistry()
+
+
+# ─── Prometheus text exposition ───
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def render_prometheus(registry: MetricsRegistry | None = None) -> str:
+    lines: list[str] = []
+    for metric in (registry or REGISTRY).metrics():
+        try:
+            samples = metric.snapshot()
+        except Exception:
+            # function 메트릭의 수집 실패가 전체 응답을 막지 않도록 건너뛴다
+            continue
+        lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+        if isinstance(metric, Histogram):
+            lines.append(f"# TYPE {metric.name} histogram")
+            for key, sample in sorted(samples.items()):
+                bounds = [_number(b) for b in metric.buckets] + ["+Inf"]
+                for bound, cumulative in zip(bounds, sample.cumulative()):
+                    label_str = _labels(metric.label_names, key, (("le", bound),))
+                    lines.append(f"{metric.name}_bucket{label_str} {cumulative}")
+                label_str = _labels(metric.label_names, key)
+                lines.append(f"{metric.name}_sum{label_str} {_number(sample.sum)}")
+                lines.append(f"{metric.name}_count{label_str} {sample.count}")
+        else:
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for key, value in sorted(samples.items()):
+                lines.append(f"{metric.name}{_labels(metric.label_names, key)} {_number(value)}")
+    return "\n".join(lines) + "\n"
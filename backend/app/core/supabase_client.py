@@ -1,11 +1,301 @@
-"""Supabase client singleton and accessor."""
-from supabase import Client, create_client
+"""Supabase client singleton and accessor.
+
+전송 계층: PostgREST/Storage/Auth 세션은 프로세스에 하나인 풀 transport를 공유한다
+(SUPABASE_POOL_* 연결 수/keep-alive, SUPABASE_HTTP2, SUPABASE_*TIMEOUT_SEC).
+postgrest 클라이언트는 인증 이벤트마다 다시 만들어지지만 연결 풀은 유지되므로 TLS 핸드셰이크를 반복하지 않는다.
+멱등 읽기(GET/HEAD)는 연결 오류와 502/503/504에 대해 지수 백오프 + jitter로 재시도한다 (SUPABASE_RETRY_*).
+
+계측: 모든 요청(= 모든 .execute())은 httpx event hook으로 기록된다.
+- supabase_request_duration_seconds{table, method, status}: table은 REST 경로의 테이블 이름,
+  RPC는 "rpc/<함수>", Storage는 "storage", Auth는 "auth". 연결 오류처럼 응답이 없는 요청은 기록되지 않는다.
+- supabase_response_rows{table, method}: 응답 행 수 (Content-Range 또는 JSON 본문 기준).
+- 호출 로그(method/table/status/rows/ms): 평소 DEBUG, SUPABASE_SLOW_CALL_MS 이상이면 INFO.
+- begin_call_trace()로 시작한 구간(HTTP 요청 하나)의 호출 목록 — 요청당 DB 호출 수 집계용.
+"""
+from __future__ import annotations
+
+import contextvars
+import inspect
+import logging
+import random
+import time
+
+import httpx
+from supabase import Client
+from supabase._sync.auth_client import SyncClient as AuthHttpClient, SyncSupabaseAuthClient
 
 from app.core.config import settings
+from app.core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SUPABASE_REQUEST_SECONDS = REGISTRY.histogram(
+    "supabase_request_duration_seconds",
+    "Supabase REST/Storage request latency by table",
+    label_names=("table", "method", "status"),
+)
+SUPABASE_RESPONSE_ROWS = REGISTRY.histogram(
+    "supabase_response_rows",
+    "Rows returned per Supabase REST call",
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000),
+    label_names=("table", "method"),
+)
+SUPABASE_RETRIES = REGISTRY.counter(
+    "supabase_retries_total",
+    "Idempotent Supabase requests retried",
+    label_names=("method", "reason"),
+)
+
+_START_KEY = "sst_metrics_start"
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# 현재 구간(HTTP 요청)에서 일어난 호출 (table, ms) 목록. DB 스레드풀까지 context로 전달된다.
+_call_trace: contextvars.ContextVar[list[tuple[str, float]] | None] = contextvars.ContextVar(
+    "supabase_call_trace", default=None,
+)
+
+
+def request_target(path: str) -> str:
+    """요청 경로 → 메트릭 table 라벨 (카디널리티를 테이블/함수 수로 제한)."""
+    parts = [p for p in path.split("/") if p]
+    if len(parts) >= 3 and parts[0] == "rest":
+        if parts[2] == "rpc" and len(parts) >= 4:
+            return f"rpc/{parts[3]}"
+        return parts[2]
+    if parts and parts[0] == "storage":
+        return "storage"
+    if parts and parts[0] == "auth":
+        return "auth"
+    return "other"
+
+
+def response_rows(response: httpx.Response) -> int | None:
+    """PostgREST 응답의 행 수. Content-Range("0-24/*", "*/0")를 우선 쓰고, 없으면 JSON 본문을 센다."""
+    content_range = response.headers.get("content-range", "")
+    span = content_range.split("/", 1)[0]
+    if "-" in span:
+        first, _, last = span.partition("-")
+        if first.isdigit() and last.isdigit():
+            return int(last) - int(first) + 1
+    if span == "*" and content_range.endswith("/0"):
+        return 0
+    if "json" not in response.headers.get("content-type", ""):
+        return None
+    try:
+        response.read()
+        body = response.json()
+    except Exception:
+        return None
+    if isinstance(body, list):
+        return len(body)
+    return 1 if isinstance(body, dict) else None
+
+
+def begin_call_trace() -> list[tuple[str, float]]:
+    """현재 context에서 Supabase 호출 기록을 시작하고 (table, ms) 목록을 반환한다."""
+    calls: list[tuple[str, float]] = []
+    _call_trace.set(calls)
+    return calls
+
+
+def _on_request(request: httpx.Request) -> None:
+    request.extensions[_START_KEY] = time.perf_counter()
+
+
+def _on_response(response: httpx.Response) -> None:
+    request = response.request
+    start = request.extensions.get(_START_KEY)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    table = request_target(request.url.path)
+    SUPABASE_REQUEST_SECONDS.observe(
+        elapsed, table=table, method=request.method, status=str(response.status_code),
+    )
+    rows = response_rows(response) if table not in ("storage", "auth", "other") else None
+    if rows is not None:
+        SUPABASE_RESPONSE_ROWS.observe(rows, table=table, method=request.method)
+
+    calls = _call_trace.get()
+    if calls is not None:
+        calls.append((table, elapsed * 1000))  # list.append은 스레드 간에도 원자적
+    elapsed_ms = elapsed * 1000
+    level = logging.INFO if elapsed_ms >= settings.supabase_slow_call_ms else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(level, "supabase_call method=%s table=%s status=%d rows=%s duration_ms=%.1f",
+                   request.method, table, response.status_code, rows, elapsed_ms)
+
+
+def instrument_session(session: httpx.Client) -> httpx.Client:
+    hooks = session.event_hooks
+    if _on_request not in hooks["request"]:
+        hooks["request"].append(_on_request)
+        hooks["response"].append(_on_response)
+    session.event_hooks = hooks
+    return session
+
+
+class RetryTransport(httpx.BaseTransport):
+    """멱등 요청을 연결 오류/일시 장애 응답에 대해 재시도하는 transport 래퍼.
+
+    대기 시간은 full jitter: uniform(0, backoff × 2^시도). 비멱등 요청(POST/PATCH/DELETE, RPC)은 재시도하지 않는다.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport, retries: int, backoff_sec: float) -> None:
+        self._transport = transport
+        self.retries = retries
+        self.backoff_sec = backoff_sec
+
+    def _sleep(self, attempt: int) -> None:
+        time.sleep(random.uniform(0, self.backoff_sec * (2 ** attempt)))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method not in IDEMPOTENT_METHODS:
+            return self._transport.handle_request(request)
+        attempt = 0
+        while True:
+            try:
+                response = self._transport.handle_request(request)
+            except httpx.TransportError as exc:
+                if attempt >= self.retries:
+                    raise
+                reason = type(exc).__name__
+            else:
+                if attempt >= self.retries or response.status_code not in RETRY_STATUSES:
+                    return response
+                response.close()
+                reason = str(response.status_code)
+            SUPABASE_RETRIES.inc(method=request.method, reason=reason)
+            self._sleep(attempt)
+            attempt += 1
+
+    def close(self) -> None:
+        # 여러 세션이 공유하므로 세션 close()로는 닫지 않는다 (close_transport()가 닫음)
+        pass
+
+    def shutdown(self) -> None:
+        self._transport.close()
+
+
+def build_transport() -> RetryTransport:
+    pool = httpx.HTTPTransport(
+        http2=settings.supabase_http2,
+        limits=httpx.Limits(
+            max_connections=settings.supabase_pool_max_connections,
+            max_keepalive_connections=settings.supabase_pool_max_keepalive,
+            keepalive_expiry=settings.supabase_keepalive_expiry_sec,
+        ),
+    )
+    return RetryTransport(pool, settings.supabase_retry_attempts, settings.supabase_retry_backoff_sec)
+
+
+def request_timeout(default: httpx.Timeout | None = None) -> httpx.Timeout:
+    """연결 timeout은 SUPABASE_CONNECT_TIMEOUT_SEC, 나머지는 SUPABASE_TIMEOUT_SEC (없으면 라이브러리 기본값)."""
+    timeout = settings.supabase_timeout_sec
+    if timeout is None:
+        timeout = default.read if default is not None else 30.0
+    return httpx.Timeout(timeout, connect=settings.supabase_connect_timeout_sec)
+
+
+_transport: RetryTransport | None = None
+
+
+def get_transport() -> RetryTransport:
+    global _transport
+    if _transport is None:
+        _transport = build_transport()
+    return _transport
+
+
+def close_transport() -> None:
+    """공유 연결 풀을 닫는다 (앱 종료 시)."""
+    global _transport
+    transport, _transport = _transport, None
+    if transport is not None:
+        transport.shutdown()
+
+
+def pooled_session(session: httpx.Client) -> httpx.Client:
+    """라이브러리가 만든 세션을 같은 설정(base_url/headers)의 공유 풀 세션으로 교체한다."""
+    pooled = type(session)(
+        base_url=session.base_url,
+        headers=session.headers,
+        timeout=request_timeout(session.timeout),
+        transport=get_transport(),
+        follow_redirects=True,
+    )
+    session.close()
+    return instrument_session(pooled)
+
+
+# supabase-py 2.13의 ClientOptions는 httpx 클라이언트를 받지 않으므로 Client의 내부 생성 메서드를 덮어쓴다.
+# requirements.txt에서 supabase/postgrest/storage3 버전을 고정하고, 시작 시 check_client_hooks()로 확인한다.
+_CLIENT_HOOKS = {
+    "_init_postgrest_client": ("rest_url", "headers", "schema", "timeout", "verify", "proxy"),
+    "_init_storage_client": ("storage_url", "headers", "storage_client_timeout", "verify", "proxy"),
+    "_init_supabase_auth_client": ("auth_url", "client_options", "verify", "proxy"),
+}
+
+
+def check_client_hooks() -> None:
+    """덮어쓰는 supabase-py 내부 메서드가 기대한 형태인지 확인한다. 다르면 RuntimeError."""
+    problems = []
+    for name, params in _CLIENT_HOOKS.items():
+        hook = inspect.getattr_static(Client, name, None)
+        if not isinstance(hook, staticmethod):
+            problems.append(f"Client.{name} is missing or not a staticmethod")
+        elif tuple(inspect.signature(hook.__func__).parameters) != params:
+            problems.append(f"Client.{name} signature changed: {inspect.signature(hook.__func__)}")
+    if problems:
+        raise RuntimeError(
+            "Unsupported supabase-py version for the pooled client "
+            "(pin supabase==2.13.0 or update InstrumentedClient): " + "; ".join(problems)
+        )
+
+
+class InstrumentedClient(Client):
+    """postgrest/storage/auth 클라이언트 생성 시 세션을 공유 풀 세션으로 바꾸고 계측 hook을 붙인다.
+
+    postgrest 클라이언트는 인증 이벤트마다 다시 만들어지므로 생성 지점에서 바꾼다.
+    덮어쓰는 메서드는 supabase-py 내부 API다 (check_client_hooks 참고).
+    """
+
+    @staticmethod
+    def _init_postgrest_client(*args, **kwargs):
+        rest = Client._init_postgrest_client(*args, **kwargs)
+        rest.session = pooled_session(rest.session)
+        return rest
+
+    @staticmethod
+    def _init_storage_client(*args, **kwargs):
+        storage = Client._init_storage_client(*args, **kwargs)
+        # storage3의 버킷/파일 API는 session이 아니라 생성 시 받은 _client로 요청하므로 둘 다 바꾼다
+        if getattr(storage, "_client", None) is not storage.session:
+            raise RuntimeError("Unsupported storage3 version: bucket API no longer uses storage.session")
+        storage.session = storage._client = pooled_session(storage.session)
+        return storage
+
+    @staticmethod
+    def _init_supabase_auth_client(auth_url, client_options, verify=True, proxy=None):
+        http_client = AuthHttpClient(
+            timeout=request_timeout(), transport=get_transport(), follow_redirects=True,
+        )
+        return SyncSupabaseAuthClient(
+            url=auth_url,
+            auto_refresh_token=client_options.auto_refresh_token,
+            persist_session=client_options.persist_session,
+            storage=client_options.storage,
+            headers=client_options.headers,
+            flow_type=client_options.flow_type,
+            http_client=instrument_session(http_client),
+        )
+
 
 # Backend should prefer service-role key for trusted server-side operations.
 supabase_key = settings.supabase_service_role_key or settings.supabase_anon_key
-supabase: Client = create_client(settings.supabase_url, supabase_key)
+check_client_hooks()
+supabase: Client = InstrumentedClient.create(settings.supabase_url, supabase_key)
 
 
 def get_supabase() -> Client:
@@ -1,6 +1,7 @@
 """FastAPI 앱 초기화, CORS 설정, 라우터 등록, 정적 파일 마운트."""
 import logging
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -19,11 +20,31 @@ from app.api.labeling.router import router as labeling_router
 from app.api.leaderboard.router import router as leaderboard_router
 from app.api.achievements.router import router as achievements_router
 from app.api.gamification.router import router as gamification_router
+from app.api.metrics.router import record_request_metrics, router as metrics_router
+from app.core.db import shutdown_db_executor
+from app.core.supabase_client import close_transport
+from app.services.analysis.executor import (
+    shutdown_analysis_executor,
+    warm_analysis_executor,
+)
+from app.services.analysis.scheduler import get_analysis_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warm_analysis_executor()
+    yield
+    await get_analysis_scheduler().drain(settings.analysis_drain_timeout_sec)
+    shutdown_analysis_executor()
+    shutdown_db_executor()
+    close_transport()
+
 
 app = FastAPI(
     title="Smart Spectro-Tagging API",
     version="0.1.0",
     description="Backend API for Smart Spectro-Tagging & Anomaly Detection",
+    lifespan=lifespan,
 )
 
 # CORS
@@ -34,6 +55,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(record_request_metrics)
 
 # Routers
 app.include_router(upload_router)
@@ -44,6 +66,7 @@ app.include_router(labeling_router)
 app.include_router(leaderboard_router)
 app.include_router(achievements_router)
 app.include_router(gamification_router)
+app.include_router(metrics_router)
 
 os.makedirs(settings.temp_upload_dir, exist_ok=True)
 
@@ -11,3 +11,5 @@ class JobStatusResponse(CamelModel):
     session_id: Optional[str] = None
     file_count: Optional[int] = None
     error: Optional[str] = None
+    # 제출 시점의 대기 순번 (1부터, 실행 시작 시 0). 대기 중에는 갱신되지 않는다.
+    queue_position: Optional[int] = None
@@ -0,0 +1,96 @@
+"""DFT 기저 행렬 캐시 (bounded LRU + 메모리 계정).
+
+sample rate, 청크 길이, 밴드, stride가 같으면 기저 행렬도 같으므로
+워커 프로세스 단위로 한 번만 만들고 청크/파일/요청 간에 재사용한다.
+캐시된 행렬은 읽기 전용으로 공유된다.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class BasisCache:
+    """총 nbytes 기준으로 용량을 제한하는 스레드 안전 LRU 캐시."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_build(
+        self, key: Hashable, builder: Callable[[], np.ndarray]
+    ) -> tuple[np.ndarray, bool]:
+        """캐시된 행렬을 반환하거나 builder로 생성 후 저장. (행렬, hit 여부) 반환."""
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached, True
+            self.misses += 1
+
+        # 생성은 락 밖에서 수행 (동시 miss 시 중복 생성은 허용)
+        value = builder()
+        value.flags.writeable = False
+
+        with self._lock:
+            if value.nbytes <= self._max_bytes and key not in self._entries:
+                self._entries[key] = value
+                self._bytes += value.nbytes
+                self._evict_locked()
+        return value, False
+
+    def resize(self, max_bytes: int) -> None:
+        with self._lock:
+            self._max_bytes = max_bytes
+            self._evict_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+            }
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self._max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+
+
+_basis_cache = BasisCache()
+
+
+def get_basis_cache() -> BasisCache:
+    return _basis_cache
@@ -0,0 +1,423 @@
+"""분석 일괄 재실행 CLI (config 변경 후 과거 업로드 재처리용).
+
+Usage:
+    python -m app.services.analysis.batch recordings/ "archive/**/*.wav" --output drafts.jsonl
+    python -m app.services.analysis.batch --session SES-20260301120000-ab12 --insert
+    python -m app.services.analysis.batch --session SES-... --config tuned.json --from-features --output -
+
+입력:
+- 디렉터리(하위 포함, ALLOWED_EXTENSIONS 확장자), glob 패턴, 파일 경로. audio id는 파일 이름(확장자 제외)
+  → 업로드 임시 파일 이름(<audio id><ext>)과 같은 규칙
+- --session: sst_audio_files에서 세션의 파일을 조회한다. 각 파일은 분석 직전에 sst-audio 스토리지에서
+  임시 디렉터리로 스트리밍으로 내려받고, 처리가 끝나면 지운다
+
+실행:
+- --workers N (기본 CPU 수): executor와 같은 워커 초기화(init_worker)를 쓰는 spawn 프로세스 풀.
+  0이면 현재 프로세스에서 순서대로 실행
+- --config: 엔진 config에 얕게 병합할 JSON 파일 (API의 config 오버라이드와 같은 방식)
+- --from-features: 특징 저장소에 해당 audio id의 특징이 있으면 디코딩/특징 추출 없이 후처리만 다시 실행
+- --store-features: 전체 분석한 파일의 특징을 특징 저장소에 저장
+
+출력: --output FILE(.jsonl, "-"는 stdout)에 draft마다 한 줄, --insert면 sst_suggestions에 일괄 insert.
+--insert는 audio id마다 기존 pending 제안을 지우고 새 draft로 대체한다 (재실행해도 중복되지 않음).
+끝나면 처리량(files/sec)과 스텝별 wall time(평균/p95)/CPU time(평균)을 stderr에 출력한다.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import functools
+import glob
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable, TextIO
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.analysis.engine import AnalysisOutput, SuggestionDraft, suggestion_rows
+from app.services.analysis.feature_store import StaleFeaturesError, get_feature_store
+
+logger = logging.getLogger(__name__)
+
+_STORAGE_BUCKET = "sst-audio"
+_INSERT_BATCH_ROWS = 500
+_DELETE_BATCH_IDS = 100
+_DOWNLOAD_CHUNK_BYTES = 1 << 20
+_GLOB_CHARS = set("*?[")
+
+
+@dataclass
+class BatchItem:
+    audio_id: str
+    path: str
+    fetch: Callable[[], None] | None = field(default=None, repr=False)  # 원격 파일: 분석 직전에 path로 내려받는다
+
+
+@dataclass
+class BatchReport:
+    files: int = 0
+    failed: int = 0
+    from_features: int = 0
+    drafts: int = 0
+    elapsed_sec: float = 0.0
+    step_ms: dict[str, list[tuple[float, float]]] = field(default_factory=dict)  # (wall, cpu)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.elapsed_sec if self.elapsed_sec > 0 else 0.0
+
+    def add_timings(self, timings: dict[str, dict]) -> None:
+        for step, entry in timings.items():
+            self.step_ms.setdefault(step, []).append((entry["wall_ms"], entry["cpu_ms"]))
+
+    def format(self) -> str:
+        lines = [
+            f"files={self.files} failed={self.failed} from_features={self.from_features} "
+            f"drafts={self.drafts} elapsed={self.elapsed_sec:.1f}s rate={self.files_per_sec:.2f} files/sec",
+        ]
+        for step, values in self.step_ms.items():
+            wall, cpu = np.asarray(values).T
+            lines.append(
+                f"  {step:<24} n={len(wall):<6d} wall mean={wall.mean():9.1f}ms p95={np.percentile(wall, 95):9.1f}ms"
+                f"  cpu mean={cpu.mean():9.1f}ms"
+            )
+        for audio_id, error in self.errors[:20]:
+            lines.append(f"  FAILED {audio_id}: {error}")
+        return "\n".join(lines)
+
+
+# ─── 입력 수집 ───
+
+
+def collect_local_items(inputs: Iterable[str], extensions: Iterable[str] | None = None) -> list[BatchItem]:
+    """디렉터리/glob/파일 경로에서 분석할 파일 목록 (경로 기준 중복 제거, 정렬)."""
+    exts = {e.lower() for e in (extensions or settings.allowed_extensions)}
+    paths: set[str] = set()
+    for spec in inputs:
+        if os.path.isdir(spec):
+            candidates = (str(p) for p in Path(spec).rglob("*") if p.is_file())
+        elif _GLOB_CHARS & set(spec):
+            candidates = glob.glob(spec, recursive=True)
+        else:
+            if not os.path.isfile(spec):
+                raise FileNotFoundError(f"No such file or directory: {spec}")
+            candidates = [spec]
+        paths.update(os.path.abspath(p) for p in candidates if os.path.splitext(p)[1].lower() in exts)
+    return [BatchItem(Path(p).stem, p) for p in sorted(paths)]
+
+
+def _download(storage_key: str, local_path: str) -> None:
+    """스토리지 객체를 메모리에 모으지 않고 청크 단위로 local_path에 쓴다."""
+    from app.core.supabase_client import supabase
+
+    with supabase.storage.session.stream("GET", f"object/{_STORAGE_BUCKET}/{storage_key}") as response:
+        response.raise_for_status()
+        with open(local_path, "wb") as f:
+            for chunk in response.iter_bytes(_DOWNLOAD_CHUNK_BYTES):
+                f.write(chunk)
+
+
+def fetch_session_items(session_ids: Iterable[str], download_dir: str) -> list[BatchItem]:
+    """세션의 오디오 파일 목록. 파일은 download_dir로 분석 직전에 내려받는다 (BatchItem.fetch)."""
+    from app.core.supabase_client import supabase
+
+    items: list[BatchItem] = []
+    for session_id in session_ids:
+        rows = (
+            supabase.table("sst_audio_files")
+            .select("id, filename")
+            .eq("session_id", session_id)
+            .execute()
+            .data
+        ) or []
+        logger.info("batch session=%s files=%d", session_id, len(rows))
+        for row in rows:
+            storage_key = f"{row['id']}{os.path.splitext(row.get('filename') or '')[1].lower()}"
+            local_path = os.path.join(download_dir, storage_key)
+            items.append(BatchItem(row["id"], local_path, functools.partial(_download, storage_key, local_path)))
+    return items
+
+
+# ─── 결과 출력 ───
+
+
+class JsonlSink:
+    """draft마다 {"audio_id", "file", ...SuggestionDraft 필드} 한 줄."""
+
+    def __init__(self, stream: TextIO) -> None:
+        self._stream = stream
+
+    def write(self, item: BatchItem, drafts: list[SuggestionDraft]) -> None:
+        for d in drafts:
+            record = {"audio_id": item.audio_id, "file": item.path, **dataclasses.asdict(d)}
+            self._stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._stream.flush()
+
+    def close(self) -> None:
+        pass
+
+
+class SuggestionInsertSink:
+    """sst_suggestions에 _INSERT_BATCH_ROWS 단위로 insert.
+
+    처음 보는 audio id의 기존 pending 제안은 insert 전에 지운다. 검수된(confirmed/corrected) 제안은 남긴다.
+    """
+
+    def __init__(self, client=None) -> None:
+        if client is None:
+            from app.core.supabase_client import supabase as client
+
+        self._supabase = client
+        self._pending: list[dict] = []
+        self._replace: list[str] = []
+        self._seen: set[str] = set()
+        self.inserted = 0
+        self.replaced = 0
+
+    def write(self, item: BatchItem, drafts: list[SuggestionDraft]) -> None:
+        if item.audio_id not in self._seen:
+            self._seen.add(item.audio_id)
+            self._replace.append(item.audio_id)
+        self._pending.extend(suggestion_rows(item.audio_id, drafts, datetime.now(timezone.utc).isoformat()))
+        if len(self._pending) >= _INSERT_BATCH_ROWS or len(self._replace) >= _DELETE_BATCH_IDS:
+            self._flush()
+
+    def _flush(self) -> None:
+        while self._replace:
+            ids, self._replace = self._replace[:_DELETE_BATCH_IDS], self._replace[_DELETE_BATCH_IDS:]
+            deleted = (
+                self._supabase.table("sst_suggestions")
+                .delete()
+                .in_("audio_id", ids)
+                .eq("status", "pending")
+                .execute()
+                .data
+            ) or []
+            self.replaced += len(deleted)
+        while self._pending:
+            batch, self._pending = self._pending[:_INSERT_BATCH_ROWS], self._pending[_INSERT_BATCH_ROWS:]
+            self._supabase.table("sst_suggestions").insert(batch).execute()
+            self.inserted += len(batch)
+
+    def close(self) -> None:
+        self._flush()
+
+
+class _FanoutSink:
+    def __init__(self, sinks: list) -> None:
+        self._sinks = sinks
+
+    def write(self, item: BatchItem, drafts: list[SuggestionDraft]) -> None:
+        for sink in self._sinks:
+            sink.write(item, drafts)
+
+    def close(self) -> None:
+        for sink in self._sinks:
+            sink.close()
+
+
+# ─── 실행 ───
+
+
+def _discard_download(item: BatchItem) -> None:
+    if item.fetch is not None:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(item.path)
+
+
+def _reanalyze_from_store(engine, items: list[BatchItem], config: dict | None, on_done) -> list[BatchItem]:
+    """저장된 특징으로 후처리만 실행. 특징이 없거나 오래된 파일 목록을 반환 (전체 분석 대상)."""
+    store = get_feature_store()
+    remaining: list[BatchItem] = []
+    for item in items:
+        features = store.load(item.audio_id)
+        if features is None:
+            remaining.append(item)
+            continue
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            drafts = engine.reanalyze_features(features, config)
+        except StaleFeaturesError:
+            remaining.append(item)
+            continue
+        timing = {
+            "wall_ms": (time.perf_counter() - wall_start) * 1000,
+            "cpu_ms": (time.thread_time() - cpu_start) * 1000,
+        }
+        on_done(item, AnalysisOutput(drafts, timings={"reanalyze": timing}), True)
+    return remaining
+
+
+def _iter_pool_results(
+    items: list[BatchItem], config: dict | None, workers: int
+) -> Iterable[tuple[BatchItem, Future]]:
+    from app.services.analysis.executor import init_worker, run_analysis
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=init_worker,
+    ) as pool:
+        # 제출량을 워커 수의 몇 배로 제한하여 수천 개 파일도 메모리에 future를 다 쌓지 않는다
+        pending: dict[Future, BatchItem] = {}
+        queue = iter(items)
+        try:
+            while True:
+                while len(pending) < workers * 4:
+                    item = next(queue, None)
+                    if item is None:
+                        break
+                    # 원격 파일은 제출 직전에 내려받으므로 디스크에는 제출된 만큼만 있다
+                    try:
+                        if item.fetch is not None:
+                            item.fetch()
+                    except Exception as exc:
+                        failed: Future = Future()
+                        failed.set_exception(exc)
+                        yield item, failed
+                        continue
+                    pending[pool.submit(run_analysis, item.path, config)] = item
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future
+        except BaseException:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def run_batch(
+    items: list[BatchItem],
+    sink,
+    config: dict | None = None,
+    workers: int = 0,
+    from_features: bool = False,
+    store_features: bool = False,
+    progress: Callable[[BatchReport], None] | None = None,
+) -> BatchReport:
+    from app.services.analysis.executor import get_worker_engine
+
+    report = BatchReport()
+    store = get_feature_store()
+    start = time.monotonic()
+
+    def on_done(item: BatchItem, output: AnalysisOutput, reused: bool) -> None:
+        _discard_download(item)
+        sink.write(item, output.drafts)
+        report.files += 1
+        report.drafts += len(output.drafts)
+        report.from_features += 1 if reused else 0
+        report.add_timings(output.timings)
+        if store_features and not reused and output.features is not None and store.enabled:
+            store.save(item.audio_id, output.features)
+        if progress is not None:
+            progress(report)
+
+    def on_error(item: BatchItem, exc: BaseException) -> None:
+        _discard_download(item)
+        logger.error("batch audio=%s file=%s failed: %s", item.audio_id, item.path, exc)
+        report.failed += 1
+        report.errors.append((item.audio_id, f"{type(exc).__name__}: {exc}"))
+
+    engine = get_worker_engine()
+    if from_features and store.enabled and engine.supports_reanalysis:
+        items = _reanalyze_from_store(engine, items, config, on_done)
+
+    if workers > 0 and items:
+        for item, future in _iter_pool_results(items, config, workers):
+            try:
+                on_done(item, future.result(), False)
+            except Exception as exc:
+                on_error(item, exc)
+    else:
+        for item in items:
+            try:
+                if item.fetch is not None:
+                    item.fetch()
+                on_done(item, engine.analyze_output_sync(item.path, config), False)
+            except Exception as exc:
+                on_error(item, exc)
+
+    sink.close()
+    report.elapsed_sec = time.monotonic() - start
+    return report
+
+
+def _build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.services.analysis.batch",
+        description="Re-run the analysis engine over local files or uploaded sessions.",
+    )
+    parser.add_argument("inputs", nargs="*", help="directories, glob patterns or audio files")
+    parser.add_argument("--session", action="append", default=[], help="session id to re-analyze (repeatable)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="process pool size, 0 = in-process")
+    parser.add_argument("--config", help="JSON file merged into the engine config")
+    parser.add_argument("--output", help='JSONL file for drafts ("-" = stdout)')
+    parser.add_argument("--insert", action="store_true", help="bulk insert drafts into sst_suggestions")
+    parser.add_argument("--from-features", action="store_true", help="reuse stored chunk features when present")
+    parser.add_argument("--store-features", action="store_true", help="save chunk features of analyzed files")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _build_parser().parse_args(argv)
+    if not args.inputs and not args.session:
+        _build_parser().error("give at least one input path/glob or --session")
+    if not args.output and not args.insert:
+        _build_parser().error("choose --output and/or --insert")
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    config = None
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = json.load(f)
+
+    sinks = []
+    output_file = None
+    if args.output:
+        output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+        sinks.append(JsonlSink(output_file))
+    if args.insert:
+        sinks.append(SuggestionInsertSink())
+    sink = _FanoutSink(sinks)
+
+    def progress(report: BatchReport) -> None:
+        if report.files % 50 == 0:
+            logger.info("batch progress files=%d failed=%d", report.files, report.failed)
+
+    try:
+        with tempfile.TemporaryDirectory(prefix="analysis-batch-") as download_dir:
+            items = collect_local_items(args.inputs) if args.inputs else []
+            if args.session:
+                items += fetch_session_items(args.session, download_dir)
+            logger.info("batch files=%d workers=%d", len(items), args.workers)
+            report = run_batch(
+                items, sink, config,
+                workers=args.workers,
+                from_features=args.from_features,
+                store_features=args.store_features,
+                progress=progress,
+            )
+    finally:
+        if output_file is not None and output_file is not sys.stdout:
+            output_file.close()
+
+    print(report.format(), file=sys.stderr)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
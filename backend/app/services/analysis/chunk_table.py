@@ -0,0 +1,207 @@
+"""청크 결과의 컬럼 저장소.
+
+청크마다 dict를 만드는 대신 컬럼 배열(id, 시작 시각, 상태 코드, note 코드)과
+밴드별 에너지 배열(ctx.energies와 같은 배열을 공유)만 보관한다.
+청크당 14바이트 + 밴드 에너지 8바이트 × 밴드 수로, dict 표현 대비 수십 배 작다.
+
+기존 스텝/테스트 호환을 위해 ChunkView(Sequence)와 ChunkRecord(MutableMapping)를 제공한다.
+ctx.chunks[i]["state"] = "ON" 처럼 쓰면 컬럼 배열이 직접 수정된다.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping, MutableMapping, Sequence
+from typing import Any
+
+import numpy as np
+
+# notes 컬럼의 코드 → chunk["note"] 문자열
+CHUNK_NOTES = (
+    "",
+    "ID_Wide_Start",
+    "Startup_Surge_Start",
+    "ID_Wide_Sustain",
+    "Hysteresis_Sustain",
+    "Gap_Filled",
+    "Trimmed_DropOff",
+    "Noise_Removed",
+)
+NOTE_CODES = {note: code for code, note in enumerate(CHUNK_NOTES)}
+
+_BASE_KEYS = ("id", "time_sec", "time_min", "state", "note")
+_ENERGY_PREFIX = "energy_"
+
+
+class ChunkTable:
+    """청크 컬럼 배열 묶음."""
+
+    __slots__ = ("ids", "time_sec", "states", "notes", "energies", "extras")
+
+    def __init__(
+        self,
+        ids: np.ndarray,
+        time_sec: np.ndarray,
+        states: np.ndarray,
+        notes: np.ndarray,
+        energies: dict[str, np.ndarray],
+    ) -> None:
+        self.ids = ids
+        self.time_sec = time_sec
+        self.states = states  # bool, ON=True
+        self.notes = notes  # uint8, CHUNK_NOTES 인덱스
+        self.energies = energies
+        self.extras: dict[int, dict[str, Any]] = {}  # 컬럼에 없는 키 (호환용)
+
+    @classmethod
+    def empty(cls) -> ChunkTable:
+        return cls.build(0, 0.0, {})
+
+    @classmethod
+    def build(cls, num_chunks: int, chunk_duration: float, energies: dict[str, np.ndarray]) -> ChunkTable:
+        """균일한 청크 길이로 테이블 생성. 상태는 모두 OFF, note는 빈 문자열."""
+        ids = np.arange(num_chunks, dtype=np.int32)
+        return cls(
+            ids=ids,
+            time_sec=ids * float(chunk_duration),
+            states=np.zeros(num_chunks, dtype=bool),
+            notes=np.zeros(num_chunks, dtype=np.uint8),
+            energies=energies,
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[Mapping[str, Any]]) -> ChunkTable:
+        """dict 리스트(기존 ctx.chunks 형식)에서 테이블 생성."""
+        n = len(records)
+        bands = [
+            key[len(_ENERGY_PREFIX):] for key in (records[0] if n else {})
+            if key.startswith(_ENERGY_PREFIX)
+        ]
+        table = cls(
+            ids=np.array([r.get("id", i) for i, r in enumerate(records)], dtype=np.int32),
+            time_sec=np.array([r.get("time_sec", 0.0) for r in records], dtype=np.float64),
+            states=np.array([r.get("state") == "ON" for r in records], dtype=bool),
+            notes=np.array([note_code(r.get("note", "")) for r in records], dtype=np.uint8),
+            energies={
+                band: np.array([r[_ENERGY_PREFIX + band] for r in records], dtype=np.float64)
+                for band in bands
+            },
+        )
+        known = set(_BASE_KEYS) | {_ENERGY_PREFIX + band for band in bands}
+        for i, r in enumerate(records):
+            extra = {k: v for k, v in r.items() if k not in known}
+            if extra:
+                table.extras[i] = extra
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.ids.nbytes + self.time_sec.nbytes + self.states.nbytes + self.notes.nbytes
+            + sum(np.asarray(arr).nbytes for arr in self.energies.values())
+        )
+
+
+def note_code(note: str) -> int:
+    try:
+        return NOTE_CODES[note]
+    except KeyError:
+        raise ValueError(f"Unknown chunk note: {note!r}. Available: {list(CHUNK_NOTES)}") from None
+
+
+class ChunkRecord(MutableMapping):
+    """ChunkTable의 한 행에 대한 dict 호환 view."""
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: ChunkTable, index: int) -> None:
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        table, i = self._table, self._index
+        if table.extras:
+            extra = table.extras.get(i)
+            if extra is not None and key in extra:
+                return extra[key]
+        if key == "state":
+            return "ON" if table.states[i] else "OFF"
+        if key == "note":
+            return CHUNK_NOTES[table.notes[i]]
+        if key == "time_sec":
+            return float(table.time_sec[i])
+        if key == "time_min":
+            return float(table.time_sec[i]) / 60.0
+        if key == "id":
+            return int(table.ids[i])
+        if key.startswith(_ENERGY_PREFIX):
+            band = key[len(_ENERGY_PREFIX):]
+            if band in table.energies:
+                return float(table.energies[band][i])
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        table, i = self._table, self._index
+        if key == "state":
+            table.states[i] = value == "ON"
+        elif key == "note":
+            table.notes[i] = note_code(value)
+        else:
+            table.extras.setdefault(i, {})[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        extra = self._table.extras.get(self._index)
+        if extra is None or key not in extra:
+            raise TypeError(f"column {key!r} cannot be deleted from a chunk record")
+        del extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _BASE_KEYS
+        for band in self._table.energies:
+            yield _ENERGY_PREFIX + band
+        extra = self._table.extras.get(self._index)
+        if extra:
+            known = set(_BASE_KEYS) | {_ENERGY_PREFIX + band for band in self._table.energies}
+            yield from (k for k in extra if k not in known)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ChunkView(Sequence):
+    """ChunkTable을 기존 list[dict] 처럼 읽고 쓰기 위한 view."""
+
+    __slots__ = ("_table",)
+
+    def __init__(self, table: ChunkTable) -> None:
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index):
+        n = len(self._table)
+        if isinstance(index, slice):
+            return [ChunkRecord(self._table, i) for i in range(*index.indices(n))]
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("chunk index out of range")
+        return ChunkRecord(self._table, index)
+
+    def __iter__(self) -> Iterator[ChunkRecord]:
+        table = self._table
+        for i in range(len(table)):
+            yield ChunkRecord(table, i)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return f"ChunkView({len(self)} chunks)"
@@ -0,0 +1,133 @@
+"""로드 시점 anti-aliasing 폴리페이즈 데시메이션.
+
+밴드 중 가장 높은 주파수(freq + bw)가 수백 Hz 수준이므로 44.1/48 kHz 신호를
+정수배 q로 줄여도 분석 정확도는 유지된다. stride 건너뛰기와 달리 저역통과 FIR을 먼저 적용하므로
+에일리어싱이 없다.
+
+config "load_audio" 옵션:
+- decimate: true면 활성화 (기본 false)
+- decimate_target_rate: 최소 목표 sample rate. 없으면 2 × 최고 밴드 주파수 × decimate_margin
+- decimate_margin: 자동 목표 rate의 여유 배수 (기본 2.0, 최고 밴드가 새 Nyquist의 절반 이하)
+
+q는 sample rate와 청크 샘플 수를 모두 나누는 가장 큰 정수로 고른다 (청크 경계가 그대로 유지됨).
+필터는 최고 밴드 주파수까지를 통과대역, (새 rate - 최고 밴드 주파수)부터를 저지대역으로 하는
+Kaiser 창 FIR이다 (감쇠 _STOPBAND_DB). 저지대역 위 성분은 밴드 밖으로만 접히므로 밴드 에너지에 섞이지 않는다.
+resample_poly(x, 1, q)의 기본 필터(20q + 1 탭)보다 짧고, 같은 방식(지연 보정, 양 끝 0 패딩)으로 적용한다.
+decimate_blocks()는 블록 사이에 필터 절반 길이만큼의 문맥을 넘겨 decimate()와 같은 값을 만든다.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterable, Iterator
+
+import numpy as np
+from scipy.signal import firwin, kaiserord, upfirdn
+
+_STOPBAND_DB = 60.0
+
+
+def max_band_frequency(config: dict) -> float:
+    bands = config.get("bands", {})
+    return max((b["freq"] + b["bw"] for b in bands.values()), default=0.0)
+
+
+def decimation_factor(config: dict, sample_rate: int) -> int:
+    """config와 원본 sample rate에 대한 데시메이션 배수 (비활성/불가능하면 1)."""
+    load_cfg = config.get("load_audio", {})
+    if not load_cfg.get("decimate", False) or sample_rate <= 0:
+        return 1
+
+    target_rate = load_cfg.get("decimate_target_rate")
+    if not target_rate:
+        target_rate = 2.0 * max_band_frequency(config) * load_cfg.get("decimate_margin", 2.0)
+    if target_rate <= 0:
+        return 1
+
+    chunk_samples = int(config.get("chunk_duration_sec", 5.0) * sample_rate)
+    for q in range(int(sample_rate // math.ceil(target_rate)), 1, -1):
+        if sample_rate % q == 0 and chunk_samples % q == 0:
+            return q
+    return 1
+
+
+@lru_cache(maxsize=16)
+def _lowpass(sample_rate: int, q: int, passband_hz: float) -> tuple[np.ndarray, int]:
+    """(float32 탭, 절반 길이). 절반 길이는 q의 배수로 올려 블록 경계 계산을 단순화한다."""
+    new_rate = sample_rate / q
+    stopband_hz = max(new_rate - passband_hz, passband_hz + 1.0)
+    numtaps, beta = kaiserord(_STOPBAND_DB, (stopband_hz - passband_hz) / (sample_rate / 2))
+    half_len = math.ceil(((numtaps - 1) / 2) / q) * q
+    taps = firwin(
+        2 * half_len + 1, (passband_hz + stopband_hz) / 2,
+        window=("kaiser", beta), fs=sample_rate,
+    )
+    return taps.astype(np.float32), half_len
+
+
+@dataclass(frozen=True)
+class DecimationPlan:
+    """원본 sample rate에서 q배 데시메이션하는 필터 설정."""
+
+    q: int
+    sample_rate: int
+    passband_hz: float
+    taps: np.ndarray = field(init=False, repr=False, compare=False)
+    half_len: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        taps, half_len = _lowpass(self.sample_rate, self.q, self.passband_hz) if self.q > 1 else (None, 0)
+        object.__setattr__(self, "taps", taps)
+        object.__setattr__(self, "half_len", half_len)
+
+    @property
+    def output_rate(self) -> int:
+        return self.sample_rate // self.q
+
+    @classmethod
+    def from_config(cls, config: dict, sample_rate: int) -> DecimationPlan:
+        return cls(decimation_factor(config, sample_rate), sample_rate, max_band_frequency(config))
+
+
+def _filter_and_pick(x: np.ndarray, plan: DecimationPlan, offset: int, num_out: int) -> np.ndarray:
+    """x를 저역통과한 뒤 offset 샘플부터 q 간격으로 num_out개 (float32)."""
+    y = upfirdn(plan.taps, x.astype(np.float32, copy=False), 1, plan.q)
+    start = (offset + plan.half_len) // plan.q
+    return y[start:start + num_out]
+
+
+def decimate(signal: np.ndarray, plan: DecimationPlan) -> np.ndarray:
+    """전체 신호 데시메이션 (양 끝은 0으로 패딩)."""
+    if plan.q <= 1:
+        return signal
+    return _filter_and_pick(signal, plan, 0, -(-len(signal) // plan.q))
+
+
+def decimate_blocks(blocks: Iterable[np.ndarray], plan: DecimationPlan) -> Iterator[np.ndarray]:
+    """블록 스트림 데시메이션. decimate(전체 신호)와 같은 값을 블록 단위로 생성.
+
+    마지막을 제외한 블록 길이는 q의 배수이고 필터 절반 길이 이상이어야 한다.
+    오른쪽 문맥을 위해 한 블록을 지연시켜 내보낸다.
+    """
+    if plan.q <= 1:
+        yield from blocks
+        return
+
+    half_len = plan.half_len
+    left = np.zeros(0, dtype=np.float32)
+    pending: np.ndarray | None = None
+    for block in blocks:
+        if pending is not None:
+            yield _decimate_segment(left, pending, block[:half_len], plan)
+            left = np.concatenate([left, pending])[-half_len:]
+        pending = block
+    if pending is not None:
+        yield _decimate_segment(left, pending, pending[:0], plan)
+
+
+def _decimate_segment(
+    left: np.ndarray, cur: np.ndarray, right: np.ndarray, plan: DecimationPlan
+) -> np.ndarray:
+    x = np.concatenate([left, cur, right])
+    return _filter_and_pick(x, plan, len(left), -(-len(cur) // plan.q))
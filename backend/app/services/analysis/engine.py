@@ -1,6 +1,11 @@
 """분석 엔진 ABC 인터페이스 및 SuggestionDraft 출력 타입 정의."""
+from __future__ import annotations
+
+import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+from app.services.analysis.feature_store import ChunkFeatures
 
 
 @dataclass
@@ -16,7 +21,59 @@ class SuggestionDraft:
     metadata: dict | None = None
 
 
+def suggestion_rows(audio_id: str, drafts: list[SuggestionDraft], now_iso: str) -> list[dict]:
+    """sst_suggestions insert용 row 목록 (status=pending)."""
+    return [
+        {
+            "id": f"sug-{uuid.uuid4().hex[:8]}",
+            "audio_id": audio_id,
+            "label": d.label,
+            "confidence": d.confidence,
+            "description": d.description,
+            "start_time": d.start_time,
+            "end_time": d.end_time,
+            "freq_low": d.freq_low,
+            "freq_high": d.freq_high,
+            "status": "pending",
+            "created_at": now_iso,
+            "updated_at": now_iso,
+        }
+        for d in drafts
+    ]
+
+
+@dataclass
+class AnalysisOutput:
+    """분석 결과 전체: 제안 목록 + 청크별 밴드 에너지 (결과 캐시/특징 저장소 저장 단위)."""
+
+    drafts: list[SuggestionDraft]
+    features: ChunkFeatures | None = None
+    timings: dict[str, dict] = field(default_factory=dict)  # ctx.metadata["timings"] (캐시에는 저장하지 않음)
+
+
 class AnalysisEngine(ABC):
+    # True인 엔진만 reanalyze_features()를 구현한다. 호출자는 특징 저장소 재분석 전에 이 값을 확인한다.
+    supports_reanalysis: bool = False
+
     @abstractmethod
     async def analyze(self, file_path: str, config: dict | None = None) -> list[SuggestionDraft]:
         ...
+
+    async def analyze_output(self, file_path: str, config: dict | None = None) -> AnalysisOutput:
+        """제안과 청크 에너지를 함께 반환. 기본 구현은 에너지 없이 analyze()를 감싼다."""
+        return AnalysisOutput(await self.analyze(file_path, config))
+
+    def cache_key(self, config: dict | None = None) -> str | None:
+        """결과 캐시용 설정 해시. None이면 이 엔진의 결과는 캐시하지 않는다."""
+        return None
+
+    def reanalyze_features(self, features: ChunkFeatures, config: dict | None = None) -> list[SuggestionDraft]:
+        """저장된 청크 특징에서 후처리 스텝만 다시 실행 (동기, CPU 비용이 작음).
+
+        supports_reanalysis가 True인 엔진만 구현한다. 특징이 현재 config와 맞지 않으면 StaleFeaturesError.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support re-analysis from stored features")
+
+    def config_path(self) -> str | None:
+        """엔진이 읽는 설정 파일 경로. 레지스트리가 변경 감지(hot reload)에 사용한다."""
+        return None
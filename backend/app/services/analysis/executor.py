@@ -0,0 +1,328 @@
+"""분석 실행기: CPU-bound 파이프라인을 전용 스레드풀 또는 프로세스 풀에서 실행.
+
+ANALYSIS_WORKERS > 0 이면 spawn 방식 ProcessPoolExecutor를 만든다.
+각 워커는 초기화 시 파이프라인을 한 번 import 하고 레지스트리 캐시의 SoundLabV57Engine
+(+ 기저 캐시)을 warm 상태로 유지하며, 요청마다 파일 경로와 config 오버라이드만 전달받는다.
+ANALYSIS_WORKERS = 0 이면 ANALYSIS_MAX_CONCURRENCY 크기의 전용 스레드풀을 사용한다.
+
+취소 (await 중인 코루틴이 cancel 되었을 때, 예: AnalysisService 타임아웃):
+1. cancel_event를 설정 → 파이프라인이 스텝/블록 사이에서 AnalysisCancelled로 중단 (협조적)
+2. 프로세스 풀에서 ANALYSIS_CANCEL_GRACE_SEC 안에 끝나지 않으면 그 풀을 은퇴시킨다 (새 작업은 새 풀로).
+   은퇴한 풀의 다른 작업이 모두 끝난 뒤에 멈추지 않는 워커를 SIGKILL 하므로, 워커 kill로 풀이 깨져도
+   관계없는 작업은 실패하지 않는다. 그동안은 은퇴한 풀의 워커만큼 프로세스가 더 떠 있다.
+   kill 대상 pid는 작업 id로 찾고, 워커는 작업이 끝나면 같은 lock 안에서 항목을 지우므로
+   다른 작업을 실행 중인 워커를 죽이지 않는다.
+취소된 실행이 낭비한 CPU 시간은 get_cancellation_stats()로 집계된다.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING
+
+from app.core.config import settings
+from app.services.analysis.engine import AnalysisOutput
+from app.services.analysis.pipeline import AnalysisCancelled, CancelEvent
+
+if TYPE_CHECKING:
+    from app.services.analysis.soundlab_v57 import SoundLabV57Engine
+
+logger = logging.getLogger(__name__)
+
+_executor_lock = threading.Lock()
+_process_pool: ProcessPoolExecutor | None = None
+_thread_pool: ThreadPoolExecutor | None = None
+_manager = None
+_running_pids = None  # Manager dict: task_id → worker pid
+_running_lock = None  # Manager Lock: _running_pids 등록/삭제와 kill을 직렬화
+
+# 풀별 실행 중인 future, 그리고 취소 후에도 멈추지 않아 kill을 기다리는 (future, task_id, submitted_at)
+_jobs_lock = threading.Lock()
+_pool_jobs: dict[ProcessPoolExecutor, set[Future]] = {}
+_stuck_jobs: dict[ProcessPoolExecutor, list[tuple[Future, str, float]]] = {}
+
+_cancellation_stats = {
+    "cancelled_runs": 0,
+    "wasted_cpu_sec": 0.0,
+    "hard_kills": 0,
+    "hard_killed_wall_sec": 0.0,
+    "pool_restarts": 0,
+}
+_stats_lock = threading.Lock()
+
+# 프로세스 풀 워커가 사용하는 엔진 (레지스트리 캐시에서 조회하므로 설정 변경 시 hot reload 된다)
+_WORKER_ENGINE = "soundlab_v57"
+
+
+def get_worker_engine() -> SoundLabV57Engine:
+    """워커가 쓰는 엔진 (레지스트리 캐시의 warm 인스턴스). 일괄 재실행 CLI도 같은 엔진을 쓴다."""
+    from app.services.analysis.registry import get_engine
+
+    return get_engine(_WORKER_ENGINE)
+
+
+def init_worker() -> None:
+    """워커 프로세스 초기화: 로깅 설정, 엔진 생성, 기저 캐시 예열."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s [worker %(process)d] %(message)s",
+    )
+    built = get_worker_engine().warm_up(settings.analysis_warm_sample_rates)
+    logger.info("analysis worker ready pid=%d warmed_bases=%d", os.getpid(), built)
+
+
+def _warm_in_process() -> None:
+    try:
+        built = get_worker_engine().warm_up(settings.analysis_warm_sample_rates)
+        logger.info("analysis engine warmed in-process warmed_bases=%d", built)
+    except Exception:
+        logger.warning("in-process analysis warm-up failed", exc_info=True)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def run_analysis(
+    file_path: str,
+    config: dict | None = None,
+    cancel_event: CancelEvent | None = None,
+    task_id: str | None = None,
+    running_pids=None,
+    running_lock=None,
+) -> AnalysisOutput:
+    """워커 프로세스에서 실행되는 분석 진입점."""
+    engine = get_worker_engine()
+    tracked = running_pids is not None and running_lock is not None and task_id is not None
+    if tracked:
+        with running_lock:
+            running_pids[task_id] = os.getpid()
+    try:
+        return engine.analyze_output_sync(file_path, config, cancel_event)
+    finally:
+        if tracked:
+            with running_lock:
+                running_pids.pop(task_id, None)
+
+
+def get_analysis_executor() -> ProcessPoolExecutor | None:
+    """프로세스 풀 싱글턴. ANALYSIS_WORKERS가 0이면 None."""
+    global _process_pool, _manager, _running_pids, _running_lock
+    if settings.analysis_workers <= 0:
+        return None
+    with _executor_lock:
+        if _process_pool is None:
+            mp_context = multiprocessing.get_context("spawn")
+            if _manager is None:
+                _manager = mp_context.Manager()
+                _running_pids = _manager.dict()
+                _running_lock = _manager.Lock()
+            _process_pool = ProcessPoolExecutor(
+                max_workers=settings.analysis_workers,
+                mp_context=mp_context,
+                initializer=init_worker,
+            )
+            logger.info("analysis process pool started workers=%d", settings.analysis_workers)
+        return _process_pool
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _executor_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(
+                max_workers=max(1, settings.analysis_max_concurrency),
+                thread_name_prefix="analysis",
+            )
+        return _thread_pool
+
+
+def warm_analysis_executor() -> None:
+    """워커를 미리 띄워 첫 요청이 import/초기화 비용을 내지 않도록 한다."""
+    executor = get_analysis_executor()
+    if executor is None:
+        # 스레드풀 모드: 같은 프로세스의 엔진을 백그라운드에서 예열 (기저 행렬 / Goertzel JIT)
+        _get_thread_pool().submit(_warm_in_process)
+        return
+    for _ in range(settings.analysis_workers):
+        executor.submit(_ping)
+
+
+def shutdown_analysis_executor(wait: bool = True) -> None:
+    global _process_pool, _thread_pool, _manager, _running_pids, _running_lock
+    with _executor_lock:
+        process_pool, _process_pool = _process_pool, None
+        thread_pool, _thread_pool = _thread_pool, None
+        manager, _manager, _running_pids, _running_lock = _manager, None, None, None
+    with _jobs_lock:
+        _pool_jobs.clear()
+        _stuck_jobs.clear()
+    if process_pool is not None:
+        process_pool.shutdown(wait=wait, cancel_futures=True)
+        logger.info("analysis process pool stopped")
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=wait, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
+
+
+def get_cancellation_stats() -> dict:
+    with _stats_lock:
+        return dict(_cancellation_stats)
+
+
+def _restart_process_pool(broken: ProcessPoolExecutor) -> None:
+    """풀을 버린다. 다음 get_analysis_executor() 호출 시 새로 생성된다.
+
+    이미 제출된 작업은 취소하지 않는다 (깨진 풀의 작업은 BrokenProcessPool로 끝나고,
+    은퇴한 풀의 작업은 끝까지 실행된다).
+    """
+    global _process_pool
+    with _executor_lock:
+        if _process_pool is not broken:
+            return
+        _process_pool = None
+    broken.shutdown(wait=False)
+    with _stats_lock:
+        _cancellation_stats["pool_restarts"] += 1
+    logger.warning("analysis process pool discarded; a new pool will be started on demand")
+
+
+def _record_cancelled_run(future: Future) -> None:
+    if future.cancelled():
+        return  # 시작 전에 취소되어 낭비 없음
+    exc = future.exception()
+    with _stats_lock:
+        _cancellation_stats["cancelled_runs"] += 1
+        if isinstance(exc, AnalysisCancelled):
+            _cancellation_stats["wasted_cpu_sec"] += exc.cpu_sec
+    if isinstance(exc, AnalysisCancelled):
+        logger.info("cancelled analysis stopped cooperatively wasted_cpu_sec=%.2f", exc.cpu_sec)
+
+
+def _track_job(pool: ProcessPoolExecutor, future: Future) -> None:
+    with _jobs_lock:
+        _pool_jobs.setdefault(pool, set()).add(future)
+    future.add_done_callback(lambda f: _job_finished(pool, f))
+
+
+def _job_finished(pool: ProcessPoolExecutor, future: Future) -> None:
+    with _jobs_lock:
+        jobs = _pool_jobs.get(pool)
+        if jobs is not None:
+            jobs.discard(future)
+            if not jobs:
+                del _pool_jobs[pool]
+        waiting = pool in _stuck_jobs
+    if waiting:
+        _kill_stuck_when_drained(pool)
+
+
+def _kill_stuck_when_drained(pool: ProcessPoolExecutor) -> None:
+    """은퇴한 풀에 멈추지 않는 작업만 남았으면 그 워커들을 kill 한다."""
+    with _jobs_lock:
+        stuck = [entry for entry in _stuck_jobs.get(pool, []) if not entry[0].done()]
+        stuck_futures = {entry[0] for entry in stuck}
+        if any(f not in stuck_futures for f in _pool_jobs.get(pool, ())):
+            return  # 관계없는 작업이 아직 실행 중
+        _stuck_jobs.pop(pool, None)
+    for future, task_id, submitted_at in stuck:
+        _kill_worker(task_id, submitted_at)
+
+
+def _kill_worker(task_id: str, submitted_at: float) -> None:
+    running_pids, running_lock = _running_pids, _running_lock
+    if running_pids is None or running_lock is None:
+        return
+    # 워커는 작업이 끝나면 같은 lock 안에서 항목을 지우므로, 찾은 pid는 아직 이 작업을 실행 중이다
+    with running_lock:
+        pid = running_pids.get(task_id)
+        if not pid:
+            return
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            return
+        running_pids.pop(task_id, None)
+    wall_sec = time.monotonic() - submitted_at
+    with _stats_lock:
+        _cancellation_stats["hard_kills"] += 1
+        _cancellation_stats["hard_killed_wall_sec"] += wall_sec
+    logger.warning(
+        "analysis worker pid=%d ignored cancellation; killed after %.1fs (task=%s)",
+        pid, wall_sec, task_id,
+    )
+
+
+def _hard_kill(future: Future, task_id: str, pool: ProcessPoolExecutor, submitted_at: float) -> None:
+    """취소 유예 시간이 지나도 끝나지 않은 작업: 풀을 은퇴시키고, 풀의 다른 작업이 끝나면 워커를 kill."""
+    if future.done():
+        return
+    with _jobs_lock:
+        _stuck_jobs.setdefault(pool, []).append((future, task_id, submitted_at))
+    logger.warning(
+        "analysis task=%s ignored cancellation for %.1fs; retiring its process pool",
+        task_id, settings.analysis_cancel_grace_sec,
+    )
+    _restart_process_pool(pool)
+    _kill_stuck_when_drained(pool)
+
+
+async def _await_cancellable(
+    future: Future,
+    cancel_event: CancelEvent,
+    on_cancel=None,
+) -> AnalysisOutput:
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        cancel_event.set()
+        future.add_done_callback(_record_cancelled_run)
+        if on_cancel is not None:
+            on_cancel()
+        raise
+
+
+async def run_analysis_async(
+    engine: SoundLabV57Engine, file_path: str, config: dict | None = None
+) -> AnalysisOutput:
+    """엔진 분석을 실행기에 제출하고 취소 가능한 형태로 기다린다."""
+    pool = get_analysis_executor()
+    if pool is None:
+        cancel_event = threading.Event()
+        future = _get_thread_pool().submit(engine.analyze_output_sync, file_path, config, cancel_event)
+        return await _await_cancellable(future, cancel_event)
+
+    loop = asyncio.get_running_loop()
+    for attempt in range(2):
+        task_id = uuid.uuid4().hex
+        cancel_event = _manager.Event()
+        submitted_at = time.monotonic()
+        future = pool.submit(
+            run_analysis, file_path, config, cancel_event, task_id, _running_pids, _running_lock,
+        )
+        _track_job(pool, future)
+
+        def schedule_hard_kill(future=future, task_id=task_id, pool=pool, submitted_at=submitted_at):
+            loop.call_later(
+                settings.analysis_cancel_grace_sec, _hard_kill, future, task_id, pool, submitted_at,
+            )
+
+        try:
+            return await _await_cancellable(future, cancel_event, schedule_hard_kill)
+        except BrokenProcessPool:
+            # 워커가 죽어(OOM 등) 풀이 깨진 경우 새 풀에서 한 번 재시도
+            if attempt:
+                raise
+            logger.warning("analysis process pool broken; retrying file=%s on a new pool", file_path)
+            _restart_process_pool(pool)
+            pool = get_analysis_executor()
+    raise RuntimeError("unreachable")
@@ -0,0 +1,245 @@
+"""청크별 밴드 에너지 저장소 (오디오 id 기준).
+
+FeatureExtractionStep의 출력(밴드별 에너지 배열, sample rate, 청크 길이)을
+오디오 id마다 .npz 파일 하나로 보관한다. threshold/state_machine/gap_fill/trim/noise_removal
+파라미터만 바꿔 다시 분석할 때는 디코딩과 특징 추출 없이 저장된 에너지에서 시작한다
+(AnalysisPipeline.run_from_features, AnalysisService.reanalyze).
+
+저장 시 에너지에 영향을 주는 config 항목(chunk_duration_sec, bands, feature_extraction, load_audio)의
+해시를 함께 기록한다. 이 항목이 바뀐 config로 재분석하면 StaleFeaturesError를 발생시킨다.
+용량(ANALYSIS_FEATURE_STORE_MB)을 넘으면 결과 캐시와 같이 마지막 사용 시각(mtime)이 오래된 항목부터 지운다.
+ANALYSIS_FEATURE_STORE_DIR가 빈 문자열이거나 ANALYSIS_FEATURE_STORE_MB가 0이면 저장소를 사용하지 않는다.
+세션이 삭제되면 그 세션 오디오의 항목도 지운다 (delete_many, sessions 라우터).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+_SUFFIX = ".npz"
+_ENERGY_PREFIX = "energy_"
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+# 결과(에너지/제안)에 영향을 주지 않는 (실행 방식만 바꾸는) 설정은 해시에서 제외.
+# 고속 구현(method)은 차등 하네스(tests/differential)로 기준 구현과 같은 결과임을 검증한다.
+_EXECUTION_ONLY_KEYS = {
+    "pipeline": ("mode", "trace_memory"),
+    "feature_extraction": ("method", "batch_chunks"),
+    "load_audio": ("streaming", "block_chunks"),
+    "postprocess": ("method",),
+}
+
+
+class StaleFeaturesError(ValueError):
+    """저장된 특징이 현재 config와 다른 특징 추출 설정으로 만들어짐."""
+
+
+def output_config(config: dict) -> dict:
+    """실행 방식만 바꾸는 항목을 뺀 config (결과 캐시/특징 저장소 키용)."""
+    out = dict(config)
+    for section, skip in _EXECUTION_ONLY_KEYS.items():
+        if isinstance(config.get(section), dict):
+            out[section] = {k: v for k, v in config[section].items() if k not in skip}
+    return out
+
+
+def feature_config_key(config: dict) -> str:
+    """특징 추출 결과를 결정하는 config 부분의 해시."""
+    config = output_config(config)
+    relevant: dict = {"chunk_duration_sec": config.get("chunk_duration_sec", 5.0), "bands": config.get("bands", {})}
+    for section in ("feature_extraction", "load_audio"):
+        relevant[section] = config.get(section, {})
+    payload = json.dumps(relevant, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def npz_entries(directory: str) -> list[tuple[int, int, str]]:
+    """directory의 .npz 항목 (mtime_ns, 크기, 경로), 오래된 순."""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(_SUFFIX)]
+    except FileNotFoundError:
+        return []
+    entries = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime_ns, st.st_size, path))
+    entries.sort()
+    return entries
+
+
+def evict_oldest(directory: str, max_bytes: int, keep: str | None = None) -> tuple[int, int]:
+    """directory의 .npz 항목을 mtime이 오래된 순서로 지워 max_bytes 이하로 만든다.
+
+    다른 프로세스의 변경도 반영하도록 매번 디렉터리를 스캔한다. (남은 바이트, 지운 개수)를 반환.
+    """
+    entries = npz_entries(directory)
+    total = sum(size for _, size, _ in entries)
+    evicted = 0
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    return total, evicted
+
+
+@dataclass
+class ChunkFeatures:
+    energies: dict[str, np.ndarray]
+    sample_rate: int
+    chunk_duration_sec: float
+    config_key: str
+
+    @property
+    def num_chunks(self) -> int:
+        return len(next(iter(self.energies.values()))) if self.energies else 0
+
+    def check_config(self, config: dict) -> None:
+        if feature_config_key(config) != self.config_key:
+            raise StaleFeaturesError(
+                "stored features were extracted with different bands/feature_extraction/load_audio settings; "
+                "run a full analysis instead"
+            )
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        """np.savez에 넘길 배열 dict (결과 캐시와 같은 형식을 공유)."""
+        arrays = {
+            _ENERGY_PREFIX + band: np.asarray(values, dtype=np.float64)
+            for band, values in self.energies.items()
+        }
+        arrays["sample_rate"] = np.int64(self.sample_rate)
+        arrays["chunk_duration_sec"] = np.float64(self.chunk_duration_sec)
+        arrays["config_key"] = np.array(self.config_key)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, data) -> ChunkFeatures:
+        """np.load 결과(NpzFile)에서 복원."""
+        return cls(
+            energies={
+                name[len(_ENERGY_PREFIX):]: data[name]
+                for name in data.files if name.startswith(_ENERGY_PREFIX)
+            },
+            sample_rate=int(data["sample_rate"]),
+            chunk_duration_sec=float(data["chunk_duration_sec"]),
+            config_key=str(data["config_key"]),
+        )
+
+
+class FeatureStore:
+    """디렉터리 하나에 오디오 id별 .npz로 저장. max_bytes를 넘으면 LRU(mtime)로 지운다 (None이면 제한 없음)."""
+
+    def __init__(self, directory: str, max_bytes: int | None = None) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: int | None = None  # 첫 쓰기 때 디렉터리를 스캔해 계산
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._directory) and (self._max_bytes is None or self._max_bytes > 0)
+
+    def _path(self, audio_id: str) -> str:
+        if not _SAFE_ID.match(audio_id):
+            raise ValueError(f"Invalid audio id for feature store: {audio_id!r}")
+        return os.path.join(self._directory, audio_id + _SUFFIX)
+
+    def save(self, audio_id: str, features: ChunkFeatures) -> None:
+        if not self.enabled:
+            return
+        path = self._path(audio_id)
+        os.makedirs(self._directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **features.to_arrays())
+            size = os.path.getsize(tmp_path)
+            if self._max_bytes is not None and size > self._max_bytes:
+                os.remove(tmp_path)
+                return
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if self._max_bytes is None:
+            return
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in npz_entries(self._directory))
+            else:
+                self._bytes += size - replaced
+            if self._bytes > self._max_bytes:
+                self._bytes, evicted = evict_oldest(self._directory, self._max_bytes, keep=path)
+                self.evictions += evicted
+
+    def load(self, audio_id: str) -> ChunkFeatures | None:
+        if not self.enabled:
+            return None
+        path = self._path(audio_id)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                features = ChunkFeatures.from_arrays(data)
+            os.utime(path)  # LRU: 사용 시각 갱신
+        except FileNotFoundError:
+            return None
+        return features
+
+    def delete(self, audio_id: str) -> bool:
+        if not self.enabled:
+            return False
+        try:
+            os.remove(self._path(audio_id))
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._bytes = None  # 다음 저장 때 다시 스캔
+        return True
+
+    def delete_many(self, audio_ids: list[str]) -> int:
+        """여러 오디오의 항목을 지우고 지운 개수를 반환 (잘못된 id는 건너뜀)."""
+        deleted = 0
+        for audio_id in audio_ids:
+            try:
+                deleted += self.delete(audio_id)
+            except ValueError:
+                continue
+        return deleted
+
+
+_feature_store: FeatureStore | None = None
+_feature_store_lock = threading.Lock()
+
+
+def get_feature_store() -> FeatureStore:
+    global _feature_store
+    with _feature_store_lock:
+        if _feature_store is None:
+            # 앱 설정은 여기서 읽는다: ChunkFeatures는 엔진/파이프라인이 import하므로 모듈은 설정 없이 로드되어야 함
+            from app.core.config import settings
+
+            _feature_store = FeatureStore(
+                settings.analysis_feature_store_dir,
+                settings.analysis_feature_store_mb * 1024 * 1024,
+            )
+        return _feature_store
@@ -0,0 +1,231 @@
+"""ffmpeg stdout 파이프 디코더 (soundfile이 읽지 못하는 MP3/M4A/AAC 등).
+
+ffmpeg이 float32 PCM WAV를 stdout으로 내보내면 헤더를 직접 파싱한 뒤
+재사용하는 블록 버퍼로 PCM을 읽는다. 임시 WAV 파일을 만들지 않으므로
+디코딩 크기만큼의 디스크 여유 공간/쓰기-읽기 I/O가 필요 없다.
+
+config "load_audio" 옵션:
+- ffmpeg_downmix: true면 ffmpeg이 mono로 다운믹스 (-ac 1). false면 numpy로 채널 평균 (기본)
+- ffmpeg_sample_rate: 지정 시 ffmpeg이 해당 sample rate로 리샘플링 (-ar). 기본은 원본 유지
+"""
+from __future__ import annotations
+
+import logging
+import shutil
+import struct
+import subprocess
+import threading
+from typing import BinaryIO, Iterator
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 전체 디코딩(_read_audio 폴백)의 최대 시간. 스트리밍 모드는 분석 취소/타임아웃이 담당한다.
+FFMPEG_TIMEOUT_SEC = 120
+_READ_FRAMES = 65536
+_INITIAL_SECONDS = 60  # read_all 결과 배열의 초기 크기 (이후 1.5배씩 증가)
+_STDERR_LIMIT = 8192
+
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def find_ffmpeg() -> str | None:
+    return shutil.which("ffmpeg")
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        part = stream.read(size - len(data))
+        if not part:
+            break
+        data += part
+    return data
+
+
+def parse_wav_header(stream: BinaryIO) -> tuple[int, int]:
+    """float32 WAV 헤더를 읽어 (sample_rate, channels)를 반환하고 data 청크 시작 위치에서 멈춘다.
+
+    파이프 출력은 RIFF/data 크기가 채워지지 않으므로 크기 필드는 무시한다.
+    """
+    riff = _read_exact(stream, 12)
+    if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+        raise ValueError("ffmpeg output is not a WAV stream")
+
+    fmt: tuple[int, int, int, int] | None = None
+    while True:
+        header = _read_exact(stream, 8)
+        if len(header) < 8:
+            raise ValueError("WAV stream ended before the data chunk")
+        chunk_id, chunk_size = header[:4], struct.unpack("<I", header[4:])[0]
+        if chunk_id == b"data":
+            break
+        body = _read_exact(stream, chunk_size + (chunk_size & 1))
+        if chunk_id == b"fmt ":
+            format_tag, channels, sample_rate = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            fmt = (format_tag, channels, sample_rate, bits)
+
+    if fmt is None:
+        raise ValueError("WAV stream has no fmt chunk")
+    format_tag, channels, sample_rate, bits = fmt
+    if format_tag not in (_WAVE_FORMAT_IEEE_FLOAT, _WAVE_FORMAT_EXTENSIBLE) or bits != 32:
+        raise ValueError(f"expected float32 PCM from ffmpeg, got format={format_tag:#x} bits={bits}")
+    return sample_rate, channels
+
+
+def build_command(ffmpeg_path: str, file_path: str, load_cfg: dict) -> list[str]:
+    cmd = [
+        ffmpeg_path, "-nostdin", "-hide_banner", "-loglevel", "error",
+        "-i", file_path,
+        "-map", "0:a:0", "-vn", "-map_metadata", "-1",
+        "-acodec", "pcm_f32le",
+    ]
+    if load_cfg.get("ffmpeg_downmix", False):
+        cmd += ["-ac", "1"]
+    sample_rate = load_cfg.get("ffmpeg_sample_rate")
+    if sample_rate:
+        cmd += ["-ar", str(int(sample_rate))]
+    cmd += ["-f", "wav", "pipe:1"]
+    return cmd
+
+
+class FfmpegPcmStream:
+    """ffmpeg 디코딩 프로세스 하나. open() 후 sample_rate/channels가 정해진다.
+
+    with 문 또는 close()로 종료하며, 끝까지 읽기 전에 닫으면 ffmpeg을 종료시킨다.
+    """
+
+    def __init__(self, file_path: str, load_cfg: dict | None = None, ffmpeg_path: str | None = None) -> None:
+        self.file_path = file_path
+        self._load_cfg = load_cfg or {}
+        self._ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        self._proc: subprocess.Popen | None = None
+        self._stderr = bytearray()
+        self._stderr_thread: threading.Thread | None = None
+        self._timed_out = False
+        self.sample_rate = 0
+        self.channels = 0
+
+    def open(self) -> FfmpegPcmStream:
+        if not self._ffmpeg_path:
+            raise RuntimeError(f"Cannot read {self.file_path}: soundfile failed and ffmpeg not found")
+        self._proc = subprocess.Popen(
+            build_command(self._ffmpeg_path, self.file_path, self._load_cfg),
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        )
+        # 오류 메시지가 많은 파일에서 stderr 파이프가 가득 차 멈추지 않도록 별도 스레드로 비운다
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, daemon=True)
+        self._stderr_thread.start()
+        try:
+            self.sample_rate, self.channels = parse_wav_header(self._proc.stdout)
+        except ValueError as e:
+            self._finish(kill=True)
+            raise RuntimeError(f"ffmpeg failed to decode {self.file_path}: {self._error_text() or e}") from None
+        return self
+
+    def __enter__(self) -> FfmpegPcmStream:
+        return self.open()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _drain_stderr(self) -> None:
+        for line in self._proc.stderr:
+            if len(self._stderr) < _STDERR_LIMIT:
+                self._stderr.extend(line)
+
+    def _error_text(self) -> str:
+        return self._stderr.decode("utf-8", "replace").strip()
+
+    def iter_blocks(self, block_frames: int = _READ_FRAMES) -> Iterator[np.ndarray]:
+        """mono float32 블록을 생성 (마지막 블록 외에는 block_frames 길이).
+
+        PCM은 블록 하나 크기의 버퍼에 readinto로 읽고, 블록마다 mono 사본만 내보낸다.
+        """
+        channels = self.channels
+        frame_bytes = 4 * channels
+        buf = bytearray(block_frames * frame_bytes)
+        view = memoryview(buf)
+        stdout = self._proc.stdout
+        while True:
+            filled = 0
+            while filled < len(buf):
+                n = stdout.readinto(view[filled:])
+                if not n:
+                    break
+                filled += n
+            frames = filled // frame_bytes
+            if frames:
+                pcm = np.frombuffer(buf, dtype="<f4", count=frames * channels)
+                if channels > 1:
+                    yield pcm.reshape(frames, channels).mean(axis=1, dtype=np.float32)
+                else:
+                    yield pcm.astype(np.float32, copy=True)
+            if filled < len(buf):
+                break
+        self._finish(kill=False)
+
+    def read_all(self) -> np.ndarray:
+        """남은 PCM을 전부 읽어 하나의 mono 배열로 반환.
+
+        파이프 출력은 길이를 알 수 없으므로 결과 배열 하나를 제자리(realloc)로 1.5배씩 늘려 채우고
+        끝에서 잘라낸다. 블록을 모아 concatenate하면 최고 메모리가 신호 크기의 두 배가 된다.
+        """
+        out = np.empty(max(_READ_FRAMES, self.sample_rate * _INITIAL_SECONDS), dtype=np.float32)
+        filled = 0
+        for block in self.iter_blocks():
+            end = filled + len(block)
+            if end > len(out):
+                out.resize(max(end, len(out) * 3 // 2), refcheck=False)
+            out[filled:end] = block
+            filled = end
+        out.resize(filled, refcheck=False)
+        return out
+
+    def close(self) -> None:
+        if self._proc is not None:
+            self._finish(kill=True)
+
+    def kill_on_timeout(self) -> None:
+        """다른 스레드(타이머)에서 호출: ffmpeg을 종료시켜 읽기를 끝낸다."""
+        self._timed_out = True
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+
+    def _finish(self, kill: bool) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        if kill and proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        returncode = proc.wait()
+        if self._stderr_thread is not None:
+            self._stderr_thread.join(timeout=5)
+        if self._timed_out:
+            raise RuntimeError(f"ffmpeg timed out after {FFMPEG_TIMEOUT_SEC}s decoding {self.file_path}")
+        if not kill and returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed to decode {self.file_path} (exit {returncode}): {self._error_text()}"
+            )
+
+
+def decode_with_ffmpeg(file_path: str, load_cfg: dict | None = None) -> tuple[int, np.ndarray]:
+    """파일 전체를 mono float32로 디코딩. FFMPEG_TIMEOUT_SEC를 넘으면 ffmpeg을 종료한다."""
+    with FfmpegPcmStream(file_path, load_cfg) as stream:
+        timer = threading.Timer(FFMPEG_TIMEOUT_SEC, stream.kill_on_timeout)
+        timer.daemon = True
+        timer.start()
+        try:
+            data = stream.read_all()
+        finally:
+            timer.cancel()
+        logger.info(
+            "ffmpeg decoded %s via pipe sr=%d channels=%d samples=%d",
+            file_path, stream.sample_rate, stream.channels, len(data),
+        )
+        return stream.sample_rate, data
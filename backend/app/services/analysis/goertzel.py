@@ -0,0 +1,97 @@
+"""Goertzel 밴드 에너지 컴파일 커널 (선택 의존성 numba).
+
+SoundLab 원본은 calculate_band_energy()를 Numba JIT로 실행했다. numba가 설치되어 있으면
+모든 청크 × 밴드 주파수 bin에 대해 Goertzel 점화식을 컴파일된 루프로 계산한다:
+
+    s[k] = x[k] + 2cos(ω') s[k-1] - s[k-2],   |X(ω)|² = s1² + s2² - 2cos(ω') s1 s2
+
+stride는 ω' = ω × stride로 반영한다 (stride 간격 샘플의 DFT와 같음). 기저 행렬이 필요 없으므로
+메모리를 거의 쓰지 않고, nogil이라 스레드풀 실행에서도 병렬로 돈다.
+결과는 reference/batched와 같은 값을 점화식 누적 오차 범위(GOERTZEL_RTOL) 안에서 낸다.
+
+numba는 requirements.txt에 선택 의존성으로 적혀 있다 (기본 설치에 포함되지 않음).
+numba가 없으면 available()이 False이며 warm_up()이 경고를 남기고, FeatureExtractionStep은 같은 값을 내는 NumPy 경로(batched)를 쓴다.
+JIT 컴파일은 첫 호출에 일어나므로 warm_up()을 워커 시작 시 호출한다 (cache=True로 디스크 캐시도 사용).
+"""
+from __future__ import annotations
+
+import logging
+import time
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # 선택 의존성
+    numba = None
+
+logger = logging.getLogger(__name__)
+
+# Goertzel 점화식(청크 길이만큼 누적)과 DFT 상관 합산의 상대 오차 허용치
+GOERTZEL_RTOL = 1e-7
+
+
+def _goertzel_band_energies(frames: np.ndarray, coeffs: np.ndarray, stride: int) -> np.ndarray:
+    """(청크 수 × 청크 샘플 수) 프레임의 청크별 밴드 에너지 (bin 크기 합 / (M/2)).
+
+    coeffs[f] = 2cos(ω_f × stride). numba가 있으면 이 함수가 그대로 컴파일된다.
+    """
+    num_chunks, chunk_samples = frames.shape
+    num_freqs = coeffs.shape[0]
+    num_strided = (chunk_samples + stride - 1) // stride
+    out = np.zeros(num_chunks, dtype=np.float64)
+    if num_strided == 0:
+        return out
+    norm_factor = num_strided / 2.0
+    s1 = np.empty(num_freqs, dtype=np.float64)
+    s2 = np.empty(num_freqs, dtype=np.float64)
+    for c in range(num_chunks):
+        s1[:] = 0.0
+        s2[:] = 0.0
+        for k in range(0, chunk_samples, stride):
+            x = np.float64(frames[c, k])
+            for f in range(num_freqs):
+                s0 = x + coeffs[f] * s1[f] - s2[f]
+                s2[f] = s1[f]
+                s1[f] = s0
+        total = 0.0
+        for f in range(num_freqs):
+            power = s1[f] * s1[f] + s2[f] * s2[f] - coeffs[f] * s1[f] * s2[f]
+            total += np.sqrt(max(power, 0.0)) / norm_factor
+        out[c] = total
+    return out
+
+
+if numba is not None:
+    _kernel = numba.njit(cache=True, nogil=True)(_goertzel_band_energies)
+else:
+    _kernel = None
+
+
+def available() -> bool:
+    return _kernel is not None
+
+
+def goertzel_coefficients(freqs: np.ndarray, sample_rate: int, stride: int) -> np.ndarray:
+    return 2.0 * np.cos(2.0 * np.pi * freqs * stride / sample_rate)
+
+
+def band_energies(frames: np.ndarray, coeffs: np.ndarray, stride: int) -> np.ndarray:
+    """컴파일 커널로 청크별 밴드 에너지. available()이 False면 호출하지 않는다."""
+    if _kernel is None:
+        raise RuntimeError("numba is not installed; use the batched NumPy path")
+    return _kernel(np.ascontiguousarray(frames), coeffs, stride)
+
+
+def warm_up() -> bool:
+    """작은 입력으로 JIT 컴파일을 미리 수행. 컴파일 커널을 쓸 수 있으면 True."""
+    if _kernel is None:
+        logger.warning('numba is not installed; feature_extraction method "compiled" uses the NumPy path '
+                       "(install numba, see requirements.txt)")
+        return False
+    start = time.perf_counter()
+    for dtype in (np.float32, np.float64):
+        _kernel(np.zeros((1, 16), dtype=dtype), np.zeros(2, dtype=np.float64), 2)
+    logger.info("goertzel kernel compiled numba=%s duration_ms=%d",
+                numba.__version__, round((time.perf_counter() - start) * 1000))
+    return True
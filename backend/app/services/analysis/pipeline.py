@@ -4,19 +4,69 @@ Analysis Pipeline Framework (Sprint 12.3)
 파이프라인 스텝 조합 패턴:
 - AnalysisContext: 스텝 간 공유되는 분석 상태
 - PipelineStep: 각 분석 스텝의 베이스 클래스
+- ChunkStep: 청크 블록 단위로도 실행 가능한 스텝 (스트리밍 모드용)
 - AnalysisPipeline: 스텝을 순서대로 실행하는 파이프라인
+
+취소: run()에 cancel_event(is_set()을 가진 객체)를 넘기면 스텝 사이와 청크 블록 사이에서
+확인하여 AnalysisCancelled를 발생시킨다. 예외에는 그때까지 사용한 CPU 시간이 담긴다.
+
+실행 모드 (config "pipeline.mode"):
+- "batch": 모든 스텝이 완전히 채워진 ctx를 순서대로 변환 (기본값)
+- "streaming": 첫 스텝(블록 소스)이 청크 블록을 생성하고, 이어지는 ChunkStep들이
+  블록마다 처리한다. 신호는 보관하지 않고 청크별 밴드 에너지만 남긴 뒤
+  나머지 전역 스텝(threshold, state_machine 등)을 실행한다.
+
+계측: 스텝마다 ctx.metadata["timings"][스텝 클래스 이름]에
+wall_ms, cpu_ms(thread CPU), calls를 기록하고,
+config "pipeline.trace_memory"가 true면 tracemalloc으로 잰 스텝 중 최대 할당량 alloc_peak_kb도 기록한다.
+프로세스 최대 RSS(ru_maxrss)는 프로세스 수명 전체의 최댓값이라 스텝별 증가분으로는 의미가 없으므로
+실행마다 한 번 ctx.metadata["rss_peak_kb"]에 절댓값으로 남긴다. 스텝별 메모리는 alloc_peak_kb를 본다.
+스트리밍 모드에서 블록 소스의 값은 블록을 읽는(디코딩) 구간, ChunkStep은 begin/블록 처리/finish의 합이다.
+실행이 끝나면 한 줄 구조화 로그(pipeline ... timings=JSON)를 남기고, 집계는 observe_step_timings()가 맡는다.
+
+run_from_features(): 저장된 청크별 밴드 에너지(feature_store.py)에서 시작하여
+마지막 ChunkStep(특징 추출)까지를 건너뛰고 후처리 스텝만 실행한다.
 """
 from __future__ import annotations
 
+import json
 import logging
+import sys
+import time
+import tracemalloc
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterator, Protocol
 
 import numpy as np
 
+from app.core.metrics import DEFAULT_BYTES_BUCKETS, REGISTRY
+from app.services.analysis.chunk_table import ChunkTable, ChunkView
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
 logger = logging.getLogger(__name__)
 
+_MODES = ("batch", "streaming")
+
+
+class CancelEvent(Protocol):
+    """threading.Event 또는 multiprocessing Manager Event 프록시."""
+
+    def is_set(self) -> bool:
+        ...
+
+
+class AnalysisCancelled(Exception):
+    """cancel_event가 설정되어 파이프라인이 중단됨."""
+
+    def __init__(self, message: str = "analysis cancelled", cpu_sec: float = 0.0) -> None:
+        super().__init__(message, cpu_sec)
+        self.cpu_sec = cpu_sec
+
 
 @dataclass
 class AnalysisContext:
@@ -28,10 +78,12 @@ class AnalysisContext:
     # LoadAudioStep이 채움
     sample_rate: int = 0
     signal: np.ndarray | None = None
+    # 스트리밍 모드: 청크 경계에 맞춘 mono 블록 (signal 대신 사용)
+    signal_blocks: Iterator[np.ndarray] | None = None
 
-    # FeatureExtractionStep이 채움
-    chunks: list[dict] = field(default_factory=list)
-    energies: dict[str, list[float]] = field(default_factory=dict)
+    # FeatureExtractionStep이 채움. 청크 결과는 컬럼 배열로 보관 (chunks는 dict 호환 view)
+    chunk_table: ChunkTable = field(default_factory=ChunkTable.empty, repr=False)
+    energies: dict[str, np.ndarray] = field(default_factory=dict)
 
     # ThresholdStep이 채움
     thresholds: dict[str, float] = field(default_factory=dict)
@@ -39,6 +91,133 @@ class AnalysisContext:
     # 엔진 메타데이터 (로깅/디버깅용)
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    # ChunkStep의 실행 단위 임시 상태 (스텝 인스턴스는 실행 간에 공유되므로 ctx에 보관)
+    scratch: dict[str, Any] = field(default_factory=dict)
+
+    # 협조적 취소 신호 (AnalysisPipeline.run이 설정)
+    cancel_event: CancelEvent | None = None
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise AnalysisCancelled()
+
+    @property
+    def chunks(self) -> ChunkView:
+        """청크별 결과의 list[dict] 호환 view. 값을 쓰면 chunk_table 컬럼이 수정된다."""
+        return ChunkView(self.chunk_table)
+
+    @chunks.setter
+    def chunks(self, records: list[dict]) -> None:
+        self.chunk_table = ChunkTable.from_records(records)
+
+    @property
+    def num_chunks(self) -> int:
+        return len(self.chunk_table)
+
+    @property
+    def chunk_samples(self) -> int:
+        """청크 하나의 샘플 수 (sample_rate가 정해진 뒤에만 유효)."""
+        return int(self.config.get("chunk_duration_sec", 5.0) * self.sample_rate)
+
+
+def as_frames(block: np.ndarray, chunk_samples: int) -> np.ndarray:
+    """1차원 블록을 (청크 수 × 청크 샘플 수) view로 변환. 남는 샘플은 버린다."""
+    num_chunks = len(block) // chunk_samples
+    return block[: num_chunks * chunk_samples].reshape(num_chunks, chunk_samples)
+
+
+def iter_frame_blocks(ctx: AnalysisContext) -> Iterator[np.ndarray]:
+    """ctx의 신호(전체 또는 블록 스트림)를 프레임 행렬 단위로 생성.
+
+    전체 신호도 load_audio.block_chunks 단위 view로 나눠 블록 사이에서 취소를 확인할 수 있게 한다.
+    """
+    chunk_samples = ctx.chunk_samples
+    if chunk_samples <= 0:
+        return
+    if ctx.signal is not None:
+        frames = as_frames(ctx.signal, chunk_samples)
+        block_chunks = max(1, int(ctx.config.get("load_audio", {}).get("block_chunks", 16)))
+        for start in range(0, len(frames), block_chunks):
+            yield frames[start:start + block_chunks]
+        return
+    if ctx.signal_blocks is not None:
+        for block in ctx.signal_blocks:
+            yield as_frames(block, chunk_samples)
+        ctx.signal_blocks = None
+
+
+# ─── 스텝 계측 ───
+
+STEP_WALL_SECONDS = REGISTRY.histogram(
+    "analysis_step_wall_seconds", "Wall time per analysis pipeline step", label_names=("step",),
+)
+STEP_CPU_SECONDS = REGISTRY.histogram(
+    "analysis_step_cpu_seconds", "Thread CPU time per analysis pipeline step", label_names=("step",),
+)
+STEP_ALLOC_PEAK_BYTES = REGISTRY.histogram(
+    "analysis_step_alloc_peak_bytes", "Peak traced allocation per step (pipeline.trace_memory)",
+    buckets=DEFAULT_BYTES_BUCKETS, label_names=("step",),
+)
+
+# ru_maxrss 단위: Linux는 KB, macOS는 바이트
+_MAXRSS_DIVISOR = 1024 if sys.platform == "darwin" else 1
+
+
+def _peak_rss_kb() -> int:
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // _MAXRSS_DIVISOR
+
+
+def _step_start() -> tuple[float, float, int]:
+    """(wall, cpu, tracemalloc 현재 바이트) 시작점."""
+    traced = 0
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        traced = tracemalloc.get_traced_memory()[0]
+    return time.perf_counter(), time.thread_time(), traced
+
+
+def _add_timing(ctx: AnalysisContext, step_name: str, start: tuple[float, float, int]) -> None:
+    wall_start, cpu_start, traced_start = start
+    entry = ctx.metadata.setdefault("timings", {}).setdefault(
+        step_name, {"wall_ms": 0.0, "cpu_ms": 0.0, "calls": 0},
+    )
+    entry["wall_ms"] = round(entry["wall_ms"] + (time.perf_counter() - wall_start) * 1000, 3)
+    entry["cpu_ms"] = round(entry["cpu_ms"] + (time.thread_time() - cpu_start) * 1000, 3)
+    entry["calls"] += 1
+    if tracemalloc.is_tracing():
+        alloc_kb = max(0, tracemalloc.get_traced_memory()[1] - traced_start) // 1024
+        entry["alloc_peak_kb"] = max(entry.get("alloc_peak_kb", 0), alloc_kb)
+
+
+def _start_memory_tracing(config: dict) -> bool:
+    """pipeline.trace_memory가 켜져 있고 아직 추적 중이 아니면 tracemalloc을 시작. 시작했으면 True."""
+    if not config.get("pipeline", {}).get("trace_memory", False) or tracemalloc.is_tracing():
+        return False
+    tracemalloc.start()
+    return True
+
+
+def _log_timings(ctx: AnalysisContext, mode: str) -> None:
+    timings = ctx.metadata.get("timings", {})
+    logger.info(
+        "pipeline file=%s mode=%s wall_ms=%.1f cpu_sec=%.3f rss_peak_kb=%d timings=%s",
+        ctx.file_path, mode, sum(t["wall_ms"] for t in timings.values()), ctx.metadata["cpu_sec"],
+        ctx.metadata["rss_peak_kb"],
+        json.dumps(timings, separators=(",", ":")),
+        extra={"timings": timings},
+    )
+
+
+def observe_step_timings(timings: dict[str, dict]) -> None:
+    """ctx.metadata["timings"]를 프로세스 내 히스토그램에 집계 (워커 결과는 받은 쪽 프로세스에서 호출)."""
+    for step_name, entry in timings.items():
+        STEP_WALL_SECONDS.observe(entry["wall_ms"] / 1000, step=step_name)
+        STEP_CPU_SECONDS.observe(entry["cpu_ms"] / 1000, step=step_name)
+        if "alloc_peak_kb" in entry:
+            STEP_ALLOC_PEAK_BYTES.observe(entry["alloc_peak_kb"] * 1024, step=step_name)
+
 
 class PipelineStep(ABC):
     """각 분석 스텝의 베이스 클래스.
@@ -52,17 +231,166 @@ class PipelineStep(ABC):
         ...
 
 
+class ChunkStep(PipelineStep):
+    """청크 블록 단위로 처리할 수 있는 스텝.
+
+    begin() → process_block() × 블록 수 → finish() 순서로 호출된다.
+    batch 모드의 execute()는 ctx의 신호를 블록으로 나눠 같은 순서로 호출한다.
+    """
+
+    def begin(self, ctx: AnalysisContext) -> None:
+        pass
+
+    @abstractmethod
+    def process_block(self, ctx: AnalysisContext, frames: np.ndarray) -> None:
+        ...
+
+    def finish(self, ctx: AnalysisContext) -> AnalysisContext:
+        return ctx
+
+    def execute(self, ctx: AnalysisContext) -> AnalysisContext:
+        self.begin(ctx)
+        for frames in iter_frame_blocks(ctx):
+            ctx.raise_if_cancelled()
+            self.process_block(ctx, frames)
+        return self.finish(ctx)
+
+
 class AnalysisPipeline:
     """스텝을 순서대로 실행하는 파이프라인."""
 
     def __init__(self, steps: list[PipelineStep]):
         self._steps = steps
 
-    def run(self, file_path: str, config: dict) -> AnalysisContext:
-        ctx = AnalysisContext(file_path=file_path, config=config)
-        for step in self._steps:
+    def run(
+        self,
+        file_path: str,
+        config: dict,
+        cancel_event: CancelEvent | None = None,
+    ) -> AnalysisContext:
+        mode = config.get("pipeline", {}).get("mode", "batch")
+        if mode not in _MODES:
+            raise ValueError(f"Unknown pipeline mode: {mode!r}. Available: {list(_MODES)}")
+
+        ctx = AnalysisContext(file_path=file_path, config=config, cancel_event=cancel_event)
+        cpu_start = time.thread_time()
+        started_tracing = _start_memory_tracing(config)
+        try:
+            if mode == "streaming":
+                ctx = self._run_streaming(ctx)
+            else:
+                ctx = self._run_steps(ctx, self._steps)
+            ctx.raise_if_cancelled()
+        except AnalysisCancelled:
+            cpu_sec = time.thread_time() - cpu_start
+            logger.info("pipeline file=%s cancelled cpu_sec=%.2f", file_path, cpu_sec)
+            raise AnalysisCancelled(cpu_sec=cpu_sec) from None
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        ctx.metadata["cpu_sec"] = round(time.thread_time() - cpu_start, 3)
+        ctx.metadata["rss_peak_kb"] = _peak_rss_kb()
+        _log_timings(ctx, mode)
+        return ctx
+
+    def run_from_features(
+        self,
+        file_path: str,
+        config: dict,
+        energies: dict[str, np.ndarray],
+        sample_rate: int,
+        cancel_event: CancelEvent | None = None,
+    ) -> AnalysisContext:
+        """이미 추출된 청크별 밴드 에너지로 후처리 스텝만 실행."""
+        last_chunk_step = max(
+            (i for i, step in enumerate(self._steps) if isinstance(step, ChunkStep)), default=None,
+        )
+        if last_chunk_step is None:
+            raise ValueError("run_from_features requires a feature extraction step in the pipeline")
+
+        chunk_duration = config.get("chunk_duration_sec", 5.0)
+        energies = {band: np.asarray(values, dtype=np.float64) for band, values in energies.items()}
+        num_chunks = len(next(iter(energies.values()))) if energies else 0
+
+        ctx = AnalysisContext(
+            file_path=file_path, config=config, sample_rate=sample_rate, cancel_event=cancel_event,
+        )
+        ctx.energies = energies
+        ctx.chunk_table = ChunkTable.build(num_chunks, chunk_duration, energies)
+        ctx.metadata["num_chunks"] = num_chunks
+        ctx.metadata["chunk_duration_sec"] = chunk_duration
+        ctx.metadata["from_features"] = True
+
+        cpu_start = time.thread_time()
+        started_tracing = _start_memory_tracing(config)
+        try:
+            ctx = self._run_steps(ctx, self._steps[last_chunk_step + 1:])
+        except AnalysisCancelled:
+            raise AnalysisCancelled(cpu_sec=time.thread_time() - cpu_start) from None
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+        ctx.metadata["cpu_sec"] = round(time.thread_time() - cpu_start, 3)
+        ctx.metadata["rss_peak_kb"] = _peak_rss_kb()
+        _log_timings(ctx, "features")
+        return ctx
+
+    def _run_steps(self, ctx: AnalysisContext, steps: list[PipelineStep]) -> AnalysisContext:
+        for step in steps:
+            ctx.raise_if_cancelled()
             step_name = type(step).__name__
             logger.debug("pipeline step=%s start", step_name)
+            start = _step_start()
             ctx = step.execute(ctx)
+            _add_timing(ctx, step_name, start)
             logger.debug("pipeline step=%s done", step_name)
         return ctx
+
+    def _run_streaming(self, ctx: AnalysisContext) -> AnalysisContext:
+        source = self._steps[0] if self._steps else None
+        if source is None or not hasattr(source, "open_blocks"):
+            raise ValueError("streaming mode requires a block source (e.g. load_audio) as the first step")
+
+        chunk_steps: list[ChunkStep] = []
+        for step in self._steps[1:]:
+            if not isinstance(step, ChunkStep):
+                break
+            chunk_steps.append(step)
+        global_steps = self._steps[1 + len(chunk_steps):]
+
+        logger.debug(
+            "pipeline streaming source=%s chunk_steps=%s",
+            type(source).__name__, [type(s).__name__ for s in chunk_steps],
+        )
+        source_name = type(source).__name__
+        start = _step_start()
+        blocks = iter(source.open_blocks(ctx))
+        _add_timing(ctx, source_name, start)
+        for step in chunk_steps:
+            start = _step_start()
+            step.begin(ctx)
+            _add_timing(ctx, type(step).__name__, start)
+
+        chunk_samples = ctx.chunk_samples
+        num_blocks = 0
+        while True:
+            start = _step_start()
+            block = next(blocks, None)
+            _add_timing(ctx, source_name, start)
+            if block is None:
+                break
+            ctx.raise_if_cancelled()
+            frames = as_frames(block, chunk_samples)
+            for step in chunk_steps:
+                start = _step_start()
+                step.process_block(ctx, frames)
+                _add_timing(ctx, type(step).__name__, start)
+            num_blocks += 1
+
+        for step in chunk_steps:
+            start = _step_start()
+            ctx = step.finish(ctx)
+            _add_timing(ctx, type(step).__name__, start)
+        ctx.metadata["stream_blocks"] = num_blocks
+
+        return self._run_steps(ctx, global_steps)
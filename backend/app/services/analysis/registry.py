@@ -1,16 +1,110 @@
-"""분석 엔진 레지스트리: 이름으로 엔진 클래스를 조회하는 팩토리."""
+"""분석 엔진 레지스트리: 이름으로 엔진 인스턴스를 조회하는 팩토리.
+
+엔진은 프로세스당 한 번만 생성되어 재사용된다 (폴백 엔진 포함).
+엔진의 config_path()가 있으면 조회할 때마다 파일의 (mtime, size)를 확인하고,
+바뀌었으면 내용 해시를 비교하여 실제로 달라진 경우에만 엔진을 다시 만든다 (hot reload).
+새 설정으로 엔진 생성에 실패하면 기존 엔진을 계속 사용한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass
+
 from app.services.analysis.engine import AnalysisEngine
 from app.services.analysis.soundlab_v57 import SoundLabV57Engine
 from app.services.analysis.rule_fallback import RuleFallbackEngine
 
+logger = logging.getLogger(__name__)
+
 _ENGINES: dict[str, type[AnalysisEngine]] = {
     "soundlab_v57": SoundLabV57Engine,
     "rule_fallback": RuleFallbackEngine,
 }
 
 
+@dataclass
+class _CachedEngine:
+    engine: AnalysisEngine
+    stat_key: tuple[int, int] | None  # (mtime_ns, size)
+    digest: str | None
+
+
+_cache: dict[str, _CachedEngine] = {}
+_cache_lock = threading.Lock()
+
+
+def _stat_key(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _file_digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _build(name: str, cls: type[AnalysisEngine]) -> _CachedEngine:
+    engine = cls()
+    path = engine.config_path()
+    if path is None:
+        return _CachedEngine(engine, None, None)
+    return _CachedEngine(engine, _stat_key(path), _file_digest(path))
+
+
+def _refresh(name: str, cls: type[AnalysisEngine], cached: _CachedEngine) -> _CachedEngine:
+    """설정 파일이 바뀌었으면 엔진을 다시 만든다."""
+    path = cached.engine.config_path()
+    if path is None:
+        return cached
+
+    stat_key = _stat_key(path)
+    if stat_key == cached.stat_key:
+        return cached
+
+    digest = _file_digest(path)
+    if digest == cached.digest:
+        # touch 등으로 mtime만 바뀐 경우
+        cached.stat_key = stat_key
+        return cached
+
+    try:
+        rebuilt = _build(name, cls)
+    except Exception:
+        logger.exception("engine=%s config reload failed (%s); keeping previous engine", name, path)
+        cached.stat_key = stat_key
+        cached.digest = digest
+        return cached
+
+    logger.info("engine=%s config changed (%s); engine reloaded", name, path)
+    return rebuilt
+
+
 def get_engine(name: str) -> AnalysisEngine:
     cls = _ENGINES.get(name)
     if not cls:
         raise ValueError(f"Unknown analysis engine: {name}. Available: {list(_ENGINES.keys())}")
-    return cls()
+
+    with _cache_lock:
+        cached = _cache.get(name)
+        if cached is None:
+            cached = _build(name, cls)
+            logger.info("engine=%s created", name)
+        else:
+            cached = _refresh(name, cls, cached)
+        _cache[name] = cached
+        return cached.engine
+
+
+def clear_engine_cache() -> None:
+    """캐시된 엔진을 모두 버린다 (테스트/설정 디렉터리 변경용)."""
+    with _cache_lock:
+        _cache.clear()
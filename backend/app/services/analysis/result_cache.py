@@ -0,0 +1,154 @@
+"""분석 결과 디스크 캐시 (파일 내용 해시 기준).
+
+같은 녹음이 다시 업로드되면(실패한 세션 재시도 등) 파이프라인을 다시 돌리지 않고
+저장된 결과를 반환한다. 키는 (업로드 내용 sha256, 엔진 이름, 엔진 config 해시)이며
+항목 하나는 .npz 파일 하나다 (drafts JSON + ChunkFeatures 배열, feature_store.py와 같은 형식).
+
+용량(ANALYSIS_RESULT_CACHE_MB)을 넘으면 마지막 사용 시각(mtime)이 오래된 항목부터 지운다.
+조회 성공 시 mtime을 갱신하므로 LRU로 동작한다. 0이면 캐시를 사용하지 않는다.
+쓰기는 임시 파일 + os.replace로 원자적이며, 여러 프로세스가 같은 디렉터리를 공유해도 된다.
+"""
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.analysis.engine import AnalysisOutput, SuggestionDraft
+from app.services.analysis.feature_store import ChunkFeatures, evict_oldest, npz_entries
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".npz"
+_DRAFTS_KEY = "drafts"
+
+
+def result_key(content_hash: str, engine_name: str, config_key: str) -> str:
+    return hashlib.sha256(f"{content_hash}\0{engine_name}\0{config_key}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """디렉터리 하나에 저장하는 크기 제한 LRU 결과 캐시."""
+
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes: int | None = None  # 첫 쓰기 때 디렉터리를 스캔해 계산
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + _SUFFIX)
+
+    def get(self, key: str) -> AnalysisOutput | None:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                drafts = [SuggestionDraft(**d) for d in json.loads(str(data[_DRAFTS_KEY]))]
+                features = ChunkFeatures.from_arrays(data) if "sample_rate" in data.files else None
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except Exception:
+            logger.warning("result cache entry %s unreadable; discarding", key, exc_info=True)
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return AnalysisOutput(drafts, features)
+
+    def put(self, key: str, output: AnalysisOutput) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        arrays = output.features.to_arrays() if output.features is not None else {}
+        arrays[_DRAFTS_KEY] = np.array(json.dumps([dataclasses.asdict(d) for d in output.drafts]))
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            size = os.path.getsize(tmp_path)
+            if size > self._max_bytes:
+                os.remove(tmp_path)
+                return
+            path = self._path(key)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_bytes()
+            else:
+                self._bytes += size - replaced
+            if self._bytes > self._max_bytes:
+                self._evict_locked(keep=path)
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in npz_entries(self._directory):
+                self._remove(path)
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bytes": self._bytes if self._bytes is not None else self._scan_bytes(),
+                "max_bytes": self._max_bytes,
+            }
+
+    def _scan_bytes(self) -> int:
+        return sum(size for _, size, _ in npz_entries(self._directory))
+
+    def _evict_locked(self, keep: str) -> None:
+        """오래된 항목부터 삭제. 다른 프로세스의 변경을 반영하기 위해 디렉터리를 다시 스캔한다."""
+        self._bytes, evicted = evict_oldest(self._directory, self._max_bytes, keep=keep)
+        self.evictions += evicted
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+_result_cache: ResultCache | None = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    with _result_cache_lock:
+        if _result_cache is None:
+            _result_cache = ResultCache(
+                settings.analysis_result_cache_dir,
+                settings.analysis_result_cache_mb * 1024 * 1024,
+            )
+        return _result_cache
@@ -0,0 +1,180 @@
+"""AnalysisScheduler — 프로세스 내 분석 작업 스케줄러.
+
+- 전역 동시 실행 수 / 세션별 동시 실행 수 제한 (FIFO semaphore)
+- 대기 작업 수 상한 (초과 시 AnalysisQueueFull로 거절)
+- 모든 작업/조정 태스크를 추적하여 종료 시 graceful drain
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class AnalysisQueueFull(Exception):
+    """대기 작업 수가 상한에 도달하여 새 작업을 받을 수 없음."""
+
+
+class AnalysisSchedulerClosed(Exception):
+    """drain 중이거나 종료된 스케줄러에 작업을 제출함."""
+
+
+class AnalysisScheduler:
+    def __init__(
+        self,
+        max_concurrency: int,
+        per_session_concurrency: int,
+        max_queue: int,
+    ) -> None:
+        self._max_concurrency = max(1, max_concurrency)
+        self._per_session_concurrency = max(1, per_session_concurrency)
+        self._max_queue = max(0, max_queue)
+        self._global_sem: asyncio.Semaphore | None = None
+        self._session_sems: dict[str, asyncio.Semaphore] = {}
+        self._session_refs: dict[str, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._waiting = 0
+        self._running = 0
+        self._closed = False
+
+    @property
+    def queue_depth(self) -> int:
+        """제출되었지만 아직 실행 슬롯을 얻지 못한 작업 수."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        return self._running
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def submit(
+        self,
+        session_id: str,
+        job: Callable[[], Awaitable[T]],
+        on_queued: Callable[[int], Awaitable[None]] | None = None,
+        on_cancelled: Callable[[], Awaitable[None]] | None = None,
+    ) -> tuple[asyncio.Task, int]:
+        """작업을 대기열에 넣고 (태스크, 대기 순번)을 반환.
+
+        순번은 1부터 시작하며 제출 시점의 대기 작업 수 기준이다 (이후 갱신되지 않는 초기 순번).
+        on_queued(순번)는 같은 태스크 안에서 실행 슬롯을 기다리기 전에 await되므로,
+        대기 상태 기록이 작업 자신의 상태 기록(processing/done)보다 항상 먼저 일어난다.
+        on_cancelled()는 작업이 시작되기 전에 취소된 경우(예: drain)에만 await된다.
+        실행 중 취소는 작업 자신이 CancelledError로 받는다.
+        """
+        if self._closed:
+            raise AnalysisSchedulerClosed("Analysis scheduler is shutting down")
+        if self._waiting >= self._max_queue:
+            raise AnalysisQueueFull(
+                f"Analysis queue full ({self._waiting}/{self._max_queue} waiting)"
+            )
+
+        self._waiting += 1
+        position = self._waiting
+        self._session_refs[session_id] = self._session_refs.get(session_id, 0) + 1
+        task = self.track(self._run(session_id, job, position, on_queued, on_cancelled))
+        return task, position
+
+    def track(self, coro: Awaitable[T]) -> asyncio.Task:
+        """백그라운드 태스크를 생성하고 drain 대상에 포함."""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def drain(self, timeout: float) -> None:
+        """새 작업 수락을 중단하고 진행 중인 작업을 timeout까지 기다린 뒤 나머지를 취소."""
+        self._closed = True
+        pending = [t for t in self._tasks if not t.done()]
+        if not pending:
+            return
+
+        logger.info(
+            "analysis scheduler draining tasks=%d waiting=%d running=%d timeout=%.0fs",
+            len(pending), self._waiting, self._running, timeout,
+        )
+        _, still_pending = await asyncio.wait(pending, timeout=timeout)
+        for task in still_pending:
+            task.cancel()
+        if still_pending:
+            logger.warning("analysis scheduler cancelled %d tasks after drain timeout", len(still_pending))
+            await asyncio.gather(*still_pending, return_exceptions=True)
+
+    async def _run(
+        self,
+        session_id: str,
+        job: Callable[[], Awaitable[T]],
+        position: int,
+        on_queued: Callable[[int], Awaitable[None]] | None,
+        on_cancelled: Callable[[], Awaitable[None]] | None,
+    ) -> T:
+        started = False
+        try:
+            if on_queued is not None:
+                try:
+                    await on_queued(position)
+                except Exception:
+                    logger.exception("analysis on_queued callback failed session=%s", session_id)
+            async with self._session_sem(session_id):
+                async with self._get_global_sem():
+                    self._waiting -= 1
+                    self._running += 1
+                    started = True
+                    try:
+                        return await job()
+                    finally:
+                        self._running -= 1
+        except asyncio.CancelledError:
+            if not started and on_cancelled is not None:
+                try:
+                    await on_cancelled()
+                except Exception:
+                    logger.exception("analysis on_cancelled callback failed session=%s", session_id)
+            raise
+        finally:
+            if not started:
+                self._waiting -= 1
+            self._release_session(session_id)
+
+    def _get_global_sem(self) -> asyncio.Semaphore:
+        if self._global_sem is None:
+            self._global_sem = asyncio.Semaphore(self._max_concurrency)
+        return self._global_sem
+
+    def _session_sem(self, session_id: str) -> asyncio.Semaphore:
+        sem = self._session_sems.get(session_id)
+        if sem is None:
+            sem = asyncio.Semaphore(self._per_session_concurrency)
+            self._session_sems[session_id] = sem
+        return sem
+
+    def _release_session(self, session_id: str) -> None:
+        refs = self._session_refs.get(session_id, 0) - 1
+        if refs <= 0:
+            self._session_refs.pop(session_id, None)
+            self._session_sems.pop(session_id, None)
+        else:
+            self._session_refs[session_id] = refs
+
+
+_scheduler: AnalysisScheduler | None = None
+
+
+def get_analysis_scheduler() -> AnalysisScheduler:
+    global _scheduler
+    if _scheduler is None:
+        from app.core.config import settings
+
+        _scheduler = AnalysisScheduler(
+            max_concurrency=settings.analysis_max_concurrency,
+            per_session_concurrency=settings.analysis_per_session_concurrency,
+            max_queue=settings.analysis_queue_max,
+        )
+    return _scheduler
@@ -4,6 +4,8 @@
 - 타임아웃 시 자동 fallback
 - 예외 시 자동 fallback
 - 구조화 로깅 (엔진명, 파일, 소요시간, suggestion 수)
+- content_hash가 주어지면 결과 캐시 조회/저장 (result_cache.py, 폴백 결과는 저장하지 않음)
+- audio_id가 주어지면 청크 특징을 특징 저장소에 보관 → reanalyze()로 후처리만 다시 실행 (feature_store.py)
 """
 from __future__ import annotations
 
@@ -12,13 +14,21 @@ import logging
 import time
 
 from app.core.config import settings
-from app.services.analysis.engine import SuggestionDraft
+from app.core.metrics import REGISTRY
+from app.services.analysis.engine import AnalysisOutput, SuggestionDraft
+from app.services.analysis.feature_store import get_feature_store
+from app.services.analysis.pipeline import observe_step_timings
 from app.services.analysis.registry import get_engine
+from app.services.analysis.result_cache import get_result_cache, result_key
 
 logger = logging.getLogger(__name__)
 
 _FALLBACK_ENGINE = "rule_fallback"
 
+FALLBACK_TOTAL = REGISTRY.counter(
+    "analysis_fallback_total", "Analyses that fell back to the rule engine", label_names=("reason",),
+)
+
 
 class AnalysisService:
     def __init__(self) -> None:
@@ -27,22 +37,40 @@ class AnalysisService:
         self._timeout_sec = settings.analysis_timeout_sec
 
     async def analyze(
-        self, file_path: str, config: dict | None = None
+        self,
+        file_path: str,
+        config: dict | None = None,
+        content_hash: str | None = None,
+        audio_id: str | None = None,
     ) -> list[SuggestionDraft]:
         start = time.monotonic()
+        cache_key = self._result_key(content_hash, config)
+        if cache_key is not None:
+            cached = await asyncio.to_thread(get_result_cache().get, cache_key)
+            if cached is not None:
+                logger.info(
+                    "engine=%s file=%s cache_hit duration_ms=%d suggestions=%d",
+                    self._engine_name, file_path, round((time.monotonic() - start) * 1000), len(cached.drafts),
+                )
+                await self._store_features(audio_id, cached)
+                return cached.drafts
 
         try:
-            drafts = await asyncio.wait_for(
-                self._engine.analyze(file_path, config),
+            output = await asyncio.wait_for(
+                self._engine.analyze_output(file_path, config),
                 timeout=self._timeout_sec,
             )
             elapsed_ms = round((time.monotonic() - start) * 1000)
 
             logger.info(
                 "engine=%s file=%s duration_ms=%d suggestions=%d",
-                self._engine_name, file_path, elapsed_ms, len(drafts),
+                self._engine_name, file_path, elapsed_ms, len(output.drafts),
             )
-            return drafts
+            observe_step_timings(output.timings)
+            if cache_key is not None:
+                await self._store_result(cache_key, output)
+            await self._store_features(audio_id, output)
+            return output.drafts
 
         except asyncio.TimeoutError:
             elapsed_ms = round((time.monotonic() - start) * 1000)
@@ -50,6 +78,7 @@ class AnalysisService:
                 "engine=%s file=%s TIMEOUT after %dms, falling back to %s",
                 self._engine_name, file_path, elapsed_ms, _FALLBACK_ENGINE,
             )
+            FALLBACK_TOTAL.inc(reason="timeout")
             return await self._run_fallback(file_path, config)
 
         except Exception:
@@ -58,8 +87,52 @@ class AnalysisService:
                 "engine=%s file=%s FAILED after %dms, falling back to %s",
                 self._engine_name, file_path, elapsed_ms, _FALLBACK_ENGINE,
             )
+            FALLBACK_TOTAL.inc(reason="error")
             return await self._run_fallback(file_path, config)
 
+    def _result_key(self, content_hash: str | None, config: dict | None) -> str | None:
+        if not content_hash or not get_result_cache().enabled:
+            return None
+        config_key = self._engine.cache_key(config)
+        if config_key is None:
+            return None
+        return result_key(content_hash, self._engine_name, config_key)
+
+    async def _store_result(self, cache_key: str, output: AnalysisOutput) -> None:
+        try:
+            await asyncio.to_thread(get_result_cache().put, cache_key, output)
+        except Exception:
+            logger.warning("engine=%s failed to store result cache entry", self._engine_name, exc_info=True)
+
+    async def _store_features(self, audio_id: str | None, output: AnalysisOutput) -> None:
+        if audio_id is None or output.features is None or not get_feature_store().enabled:
+            return
+        try:
+            await asyncio.to_thread(get_feature_store().save, audio_id, output.features)
+        except Exception:
+            logger.warning("engine=%s audio=%s failed to store chunk features", self._engine_name, audio_id, exc_info=True)
+
+    async def reanalyze(
+        self, audio_id: str, config: dict | None = None
+    ) -> list[SuggestionDraft] | None:
+        """저장된 청크 특징으로 후처리 스텝만 다시 실행. 엔진이 재분석을 지원하지 않거나 저장된 특징이 없으면 None.
+
+        config의 특징 추출 관련 항목이 저장 당시와 다르면 StaleFeaturesError.
+        """
+        if not self._engine.supports_reanalysis:
+            return None
+        start = time.monotonic()
+        features = await asyncio.to_thread(get_feature_store().load, audio_id)
+        if features is None:
+            return None
+        drafts = await asyncio.to_thread(self._engine.reanalyze_features, features, config)
+        logger.info(
+            "engine=%s audio=%s reanalyze duration_ms=%d chunks=%d suggestions=%d",
+            self._engine_name, audio_id, round((time.monotonic() - start) * 1000),
+            features.num_chunks, len(drafts),
+        )
+        return drafts
+
     async def _run_fallback(
         self, file_path: str, config: dict | None = None
     ) -> list[SuggestionDraft]:
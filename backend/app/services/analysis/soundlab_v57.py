@@ -5,26 +5,37 @@ JSON 설정 파일에서 파이프라인을 조립하고,
 """
 from __future__ import annotations
 
-import asyncio
+import hashlib
 import json
 import logging
 import os
-from typing import Optional
+
+import numpy as np
 
 from app.core.config import settings
-from app.services.analysis.engine import AnalysisEngine, SuggestionDraft
-from app.services.analysis.pipeline import AnalysisContext
+from app.services.analysis import goertzel
+from app.services.analysis.basis_cache import get_basis_cache
+from app.services.analysis.chunk_table import NOTE_CODES
+from app.services.analysis.engine import AnalysisEngine, AnalysisOutput, SuggestionDraft
+from app.services.analysis.executor import run_analysis_async
+from app.services.analysis.feature_store import ChunkFeatures, feature_config_key, output_config
+from app.services.analysis.pipeline import AnalysisContext, CancelEvent
 from app.services.analysis.steps import build_pipeline
+from app.services.analysis.steps.chunk_state import band_values, on_runs
+from app.services.analysis.steps.feature_extraction import warm_basis_cache
 
 logger = logging.getLogger(__name__)
 
 _CONFIG_FILENAME = "analysis_v57.json"
 
 
+def _config_path() -> str:
+    return os.path.join(settings.analysis_config_dir, _CONFIG_FILENAME)
+
+
 def _load_json_config() -> dict:
     """JSON 설정 파일 로드."""
-    config_path = os.path.join(settings.analysis_config_dir, _CONFIG_FILENAME)
-    with open(config_path, "r", encoding="utf-8") as f:
+    with open(_config_path(), "r", encoding="utf-8") as f:
         return json.load(f)
 
 
@@ -55,24 +66,23 @@ def _segments_to_drafts(ctx: AnalysisContext) -> list[SuggestionDraft]:
     bands = config.get("bands", {})
     chunk_duration = config.get("chunk_duration_sec", 5.0)
     threshold_id = ctx.thresholds.get("id_wide", 0.0)
-    energies_id = ctx.energies.get("id_wide", [])
-    chunks = ctx.chunks
+    table = ctx.chunk_table
+    energies_id = band_values(ctx, "id_wide", len(table))
+    surge_code = NOTE_CODES["Startup_Surge_Start"]
 
     drafts: list[SuggestionDraft] = []
+    run_starts, run_ends = on_runs(table.states)
 
-    seg_start: Optional[int] = None
-    seg_energies: list[float] = []
-    seg_notes: set[str] = set()
-
-    def flush_segment(start_idx: int, end_idx: int) -> None:
-        start_time = chunks[start_idx]["time_sec"]
-        end_time = chunks[end_idx]["time_sec"] + chunk_duration
+    for start_idx, end_idx in zip(run_starts.tolist(), run_ends.tolist()):
+        start_time = float(table.time_sec[start_idx])
+        end_time = float(table.time_sec[end_idx - 1]) + chunk_duration
 
+        seg_energies = energies_id[start_idx:end_idx].tolist()
         max_energy = max(seg_energies) if seg_energies else 0
         confidence = _compute_confidence(max_energy, threshold_id)
 
         # 라벨/밴드 결정
-        if "Startup_Surge_Start" in seg_notes:
+        if np.any(table.notes[start_idx:end_idx] == surge_code):
             band_type = "surge_60"
         else:
             band_type = "id_wide"
@@ -104,25 +114,6 @@ def _segments_to_drafts(ctx: AnalysisContext) -> list[SuggestionDraft]:
             },
         ))
 
-    for i, chunk in enumerate(chunks):
-        if chunk["state"] == "ON":
-            if seg_start is None:
-                seg_start = i
-                seg_energies = []
-                seg_notes = set()
-            energy = energies_id[i] if i < len(energies_id) else 0
-            seg_energies.append(energy)
-            if chunk.get("note"):
-                seg_notes.add(chunk["note"])
-        else:
-            if seg_start is not None:
-                flush_segment(seg_start, i - 1)
-                seg_start = None
-
-    # 마지막 세그먼트
-    if seg_start is not None:
-        flush_segment(seg_start, len(chunks) - 1)
-
     return drafts
 
 
@@ -130,22 +121,76 @@ class SoundLabV57Engine(AnalysisEngine):
     """SoundLab V5.7 분석 엔진.
 
     JSON config에서 파이프라인을 조립하여 실행.
-    CPU-bound 작업은 스레드풀에서 실행하여 이벤트 루프 차단 방지.
+    CPU-bound 작업은 프로세스 풀(ANALYSIS_WORKERS > 0) 또는 스레드풀에서 실행하여
+    이벤트 루프 차단 방지.
     """
 
+    supports_reanalysis = True
+
     def __init__(self) -> None:
         self._config = _load_json_config()
         self._pipeline = build_pipeline(self._config)
+        get_basis_cache().resize(settings.analysis_basis_cache_mb * 1024 * 1024)
+
+    def config_path(self) -> str:
+        return _config_path()
+
+    def warm_up(self, sample_rates: list[int]) -> int:
+        """첫 요청 전에 특징 추출 준비를 끝낸다. 새로 만든 기저 행렬 개수를 반환.
+
+        "compiled" 방식이면 Goertzel 커널을 JIT 컴파일하고 (기저 행렬 불필요),
+        그 외에는 주어진 sample rate들의 기저 행렬을 미리 생성한다.
+        """
+        if self._config.get("feature_extraction", {}).get("method") == "compiled" and goertzel.warm_up():
+            return 0
+        return sum(warm_basis_cache(self._config, sr) for sr in sample_rates)
+
+    def cache_key(self, config: dict | None = None) -> str:
+        """병합된 config 중 결과를 바꾸는 항목의 해시 (키 순서, 실행 방식과 무관)."""
+        merged_config = output_config({**self._config, **(config or {})})
+        payload = json.dumps(merged_config, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def analyze_output_sync(
+        self,
+        file_path: str,
+        config: dict | None = None,
+        cancel_event: CancelEvent | None = None,
+    ) -> AnalysisOutput:
+        """현재 스레드/프로세스에서 파이프라인을 실행 (executor 워커용)."""
+        merged_config = {**self._config, **(config or {})}
+        ctx = self._pipeline.run(file_path, merged_config, cancel_event)
+        features = ChunkFeatures(
+            energies={band: np.asarray(values, dtype=np.float64) for band, values in ctx.energies.items()},
+            sample_rate=ctx.sample_rate,
+            chunk_duration_sec=ctx.metadata.get("chunk_duration_sec", merged_config.get("chunk_duration_sec", 5.0)),
+            config_key=feature_config_key(merged_config),
+        )
+        return AnalysisOutput(_segments_to_drafts(ctx), features, ctx.metadata.get("timings", {}))
 
-    async def analyze(
-        self, file_path: str, config: dict | None = None
+    def reanalyze_features(
+        self, features: ChunkFeatures, config: dict | None = None
     ) -> list[SuggestionDraft]:
         merged_config = {**self._config, **(config or {})}
+        features.check_config(merged_config)
+        ctx = self._pipeline.run_from_features("", merged_config, features.energies, features.sample_rate)
+        return _segments_to_drafts(ctx)
+
+    def analyze_sync(
+        self,
+        file_path: str,
+        config: dict | None = None,
+        cancel_event: CancelEvent | None = None,
+    ) -> list[SuggestionDraft]:
+        return self.analyze_output_sync(file_path, config, cancel_event).drafts
 
-        loop = asyncio.get_event_loop()
-        ctx = await loop.run_in_executor(
-            None, self._pipeline.run, file_path, merged_config
-        )
+    async def analyze_output(
+        self, file_path: str, config: dict | None = None
+    ) -> AnalysisOutput:
+        # 프로세스 풀 워커는 자체 warm 엔진을 가지므로 파일 경로와 오버라이드만 전달된다
+        return await run_analysis_async(self, file_path, config)
 
-        drafts = _segments_to_drafts(ctx)
-        return drafts
+    async def analyze(
+        self, file_path: str, config: dict | None = None
+    ) -> list[SuggestionDraft]:
+        return (await self.analyze_output(file_path, config)).drafts
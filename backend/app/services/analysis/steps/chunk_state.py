@@ -0,0 +1,52 @@
+"""후처리 스텝(state_machine, gap_fill, trim, noise_removal) 공용 헬퍼.
+
+후처리 방식 (config "postprocess.method"):
+- "reference": ctx.chunks(dict 호환 view)를 파이썬 루프로 수정하는 원본 포팅
+- "vectorized": ctx.chunk_table의 states(bool, ON=True) / notes(uint8, CHUNK_NOTES 인덱스) 컬럼 위에서
+  run-length 인코딩과 np.diff 기반 경계 검출로 계산한다.
+
+두 방식 모두 같은 컬럼 배열을 수정하므로 스텝별로 섞어 써도 세그먼트 출력은 동일하다.
+"""
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.analysis.pipeline import AnalysisContext
+
+POSTPROCESS_METHODS = ("reference", "vectorized")
+
+
+def postprocess_method(ctx: AnalysisContext) -> str:
+    method = ctx.config.get("postprocess", {}).get("method", "reference")
+    if method not in POSTPROCESS_METHODS:
+        raise ValueError(
+            f"Unknown postprocess method: {method!r}. Available: {list(POSTPROCESS_METHODS)}"
+        )
+    return method
+
+
+def state_arrays(ctx: AnalysisContext) -> tuple[np.ndarray, np.ndarray]:
+    """(states, notes) 컬럼 배열. in-place로 수정하면 ctx.chunks에 바로 반영된다."""
+    return ctx.chunk_table.states, ctx.chunk_table.notes
+
+
+def band_values(ctx: AnalysisContext, band_key: str, n: int) -> np.ndarray:
+    """밴드 에너지를 길이 n의 float64 배열로 (모자라면 0.0으로 채움, reference의 기본값과 동일)."""
+    values = np.asarray(ctx.energies.get(band_key, []), dtype=np.float64)[:n]
+    if len(values) < n:
+        values = np.concatenate([values, np.zeros(n - len(values), dtype=np.float64)])
+    return values
+
+
+def on_runs(states: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """연속 ON 구간의 (시작 인덱스, 끝 인덱스+1) 배열."""
+    edges = np.diff(np.concatenate(([0], states.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def ranges_mask(n: int, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """[starts[k], ends[k]) 구간들의 합집합 마스크 (구간은 겹치지 않아야 함)."""
+    marks = np.zeros(n + 1, dtype=np.int32)
+    np.add.at(marks, starts, 1)
+    np.add.at(marks, ends, -1)
+    return np.cumsum(marks[:-1]) > 0
@@ -2,15 +2,55 @@
 
 Ported from SoundLab/frontend/src/core/magi.py calculate_band_energy()
 Numba JIT 대신 numpy 벡터 연산으로 구현.
+
+추출 방식 (config "feature_extraction.method"):
+- "reference": 청크/밴드/주파수마다 DFT 상관을 계산하는 원본 포팅 (calculate_band_energy)
+- "batched": 밴드별 cos/sin 기저 행렬을 한 번 만들고 (청크 × 주파수 bin) 행렬곱으로
+  여러 청크를 한 번에 계산 (calculate_band_energies_batched).
+  기저 행렬은 basis_cache에 캐싱되어 청크/파일/요청 간에 재사용된다.
+- "compiled": numba가 설치되어 있으면 Goertzel 점화식 컴파일 커널 (goertzel.py, 상대 오차 GOERTZEL_RTOL 이내),
+  없으면 "batched"와 같은 NumPy 경로. 실제 사용한 커널은 ctx.metadata["feature_extraction_kernel"]에 기록된다.
+
+reference/batched는 동일한 주파수 격자와 stride를 사용하며, 합산 순서 차이로 인한
+부동소수점 오차만 존재한다 (상대 오차 BATCHED_RTOL 이내).
+
+stride는 원본 sample rate 기준이다. LoadAudioStep이 q배 데시메이션을 했다면
+실제 stride는 max(1, stride // q)로 줄어든다 (저역통과 후 데시메이션이 stride 건너뛰기를 대신함).
 """
 import logging
 
 import numpy as np
 
-from app.services.analysis.pipeline import AnalysisContext, PipelineStep
+from app.services.analysis import goertzel
+from app.services.analysis.basis_cache import get_basis_cache
+from app.services.analysis.chunk_table import ChunkTable
+from app.services.analysis.decimation import decimation_factor
+from app.services.analysis.pipeline import AnalysisContext, ChunkStep
 
 logger = logging.getLogger(__name__)
 
+# "batched" 결과가 "reference" 결과와 일치해야 하는 상대 허용 오차.
+# float64 누적 순서(BLAS dot vs gemm, 파이썬 += vs np.sum) 차이만 반영한다.
+BATCHED_RTOL = 1e-9
+
+_METHODS = ("reference", "batched", "compiled")
+
+
+def effective_stride(fe_cfg: dict, decimation: int) -> int:
+    """데시메이션 배수를 반영한 stride."""
+    return max(1, int(fe_cfg.get("stride", 8)) // max(1, decimation))
+
+
+def _band_frequencies(center_freq: float, bandwidth: float, step: float) -> np.ndarray:
+    """calculate_band_energy()의 while 루프와 동일한 주파수 격자를 생성."""
+    freqs: list[float] = []
+    end_f = center_freq + bandwidth
+    current_f = center_freq - bandwidth
+    while current_f <= end_f + 1e-9:
+        freqs.append(current_f)
+        current_f += step
+    return np.array(freqs, dtype=np.float64)
+
 
 def calculate_band_energy(
     samples: np.ndarray,
@@ -54,56 +94,201 @@ def calculate_band_energy(
     return total_energy
 
 
-class FeatureExtractionStep(PipelineStep):
-    def execute(self, ctx: AnalysisContext) -> AnalysisContext:
-        config = ctx.config
-        signal = ctx.signal
-        sample_rate = ctx.sample_rate
+def build_dft_basis(
+    chunk_samples: int,
+    sample_rate: int,
+    center_freq: float,
+    bandwidth: float,
+    step: float = 0.5,
+    stride: int = 8,
+) -> np.ndarray:
+    """밴드 하나의 DFT 기저 행렬 (2F × M): 위쪽 F행은 cos, 아래쪽 F행은 sin.
 
-        chunk_duration = config.get("chunk_duration_sec", 5.0)
-        bands = config.get("bands", {})
+    F = 밴드 내 주파수 bin 수, M = stride 적용 후 청크 샘플 수.
+    """
+    indices = np.arange(0, chunk_samples, stride)
+    freqs = _band_frequencies(center_freq, bandwidth, step)
+    omegas = (2.0 * np.pi * freqs) / sample_rate
+    angles = np.outer(omegas, indices)
+    return np.concatenate([np.cos(angles), np.sin(angles)])
 
-        chunk_samples = int(chunk_duration * sample_rate)
-        num_chunks = len(signal) // chunk_samples if chunk_samples > 0 else 0
 
-        # 밴드별 에너지 배열 초기화
-        for band_key in bands:
-            ctx.energies[band_key] = []
+def calculate_band_energies_batched(
+    frames: np.ndarray,
+    basis: np.ndarray,
+    stride: int = 8,
+) -> np.ndarray:
+    """(청크 수 × 청크 샘플 수) 프레임 행렬의 밴드 에너지를 한 번에 계산.
 
-        # 청크별 결과 초기화
-        ctx.chunks = []
+    basis는 build_dft_basis()의 결과이며 청크 길이/stride가 같아야 한다.
+    반환값은 청크별 밴드 에너지 (num_chunks,).
+    """
+    num_chunks, chunk_samples = frames.shape
+    if num_chunks == 0 or chunk_samples == 0:
+        return np.zeros(num_chunks, dtype=np.float64)
 
-        for i in range(num_chunks):
-            start = i * chunk_samples
-            end = start + chunk_samples
-            chunk = signal[start:end]
+    strided = frames[:, ::stride]
+    norm_factor = strided.shape[1] / 2.0
+    num_freqs = basis.shape[0] // 2
 
-            chunk_result = {
-                "id": i,
-                "time_sec": i * chunk_duration,
-                "time_min": (i * chunk_duration) / 60.0,
-                "state": "OFF",
-                "note": "",
-            }
+    proj = strided.astype(np.float64) @ basis.T
+    real_part = proj[:, :num_freqs]
+    imag_part = proj[:, num_freqs:]
+    mags = np.sqrt(real_part * real_part + imag_part * imag_part) / norm_factor
+    return mags.sum(axis=1)
+
+
+def _extract_reference(
+    frames: np.ndarray, sample_rate: int, bands: dict, step: float, stride: int,
+) -> dict[str, np.ndarray]:
+    energies: dict[str, np.ndarray] = {}
+    for band_key, band_cfg in bands.items():
+        energies[band_key] = np.array([
+            calculate_band_energy(
+                frame, sample_rate, band_cfg["freq"], band_cfg["bw"], step, stride,
+            )
+            for frame in frames
+        ], dtype=np.float64)
+    return energies
+
+
+def _get_band_basis(
+    chunk_samples: int,
+    sample_rate: int,
+    band_cfg: dict,
+    step: float,
+    stride: int,
+) -> tuple[np.ndarray, bool]:
+    freq, bw = band_cfg["freq"], band_cfg["bw"]
+    key = (sample_rate, chunk_samples, freq, bw, step, stride)
+    return get_basis_cache().get_or_build(
+        key,
+        lambda: build_dft_basis(chunk_samples, sample_rate, freq, bw, step, stride),
+    )
+
+
+def warm_basis_cache(config: dict, source_rate: int) -> int:
+    """config의 밴드에 대한 기저 행렬을 미리 캐시에 올린다. 새로 만든 개수를 반환.
+
+    source_rate는 파일의 원본 sample rate이며, 데시메이션 설정이 있으면 분석 rate로 변환한다.
+    """
+    fe_cfg = config.get("feature_extraction", {})
+    step = fe_cfg.get("freq_step_hz", 0.5)
+    q = decimation_factor(config, source_rate)
+    sample_rate = source_rate // q
+    stride = effective_stride(fe_cfg, q)
+    chunk_samples = int(config.get("chunk_duration_sec", 5.0) * sample_rate)
+    built = 0
+    for band_cfg in config.get("bands", {}).values():
+        _, hit = _get_band_basis(chunk_samples, sample_rate, band_cfg, step, stride)
+        built += 0 if hit else 1
+    return built
 
-            for band_key, band_cfg in bands.items():
-                freq = band_cfg["freq"]
-                bw = band_cfg["bw"]
-                energy = calculate_band_energy(chunk, sample_rate, freq, bw)
-                ctx.energies[band_key].append(energy)
-                chunk_result[f"energy_{band_key}"] = energy
 
-            ctx.chunks.append(chunk_result)
+def _extract_compiled(
+    frames: np.ndarray, sample_rate: int, bands: dict, step: float, stride: int,
+) -> dict[str, np.ndarray]:
+    energies: dict[str, np.ndarray] = {}
+    for band_key, band_cfg in bands.items():
+        freqs = _band_frequencies(band_cfg["freq"], band_cfg["bw"], step)
+        coeffs = goertzel.goertzel_coefficients(freqs, sample_rate, stride)
+        energies[band_key] = goertzel.band_energies(frames, coeffs, stride)
+    return energies
 
-        # list → numpy array 변환 (후속 스텝 편의)
-        for band_key in bands:
-            ctx.energies[band_key] = np.array(ctx.energies[band_key])
+
+def _extract_batched(
+    frames: np.ndarray,
+    sample_rate: int,
+    bands: dict,
+    step: float,
+    stride: int,
+    batch_chunks: int,
+    cache_stats: dict[str, int],
+) -> dict[str, np.ndarray]:
+    num_chunks, chunk_samples = frames.shape
+    energies: dict[str, np.ndarray] = {}
+    for band_key, band_cfg in bands.items():
+        basis, hit = _get_band_basis(chunk_samples, sample_rate, band_cfg, step, stride)
+        cache_stats["hits" if hit else "misses"] += 1
+        out = np.empty(num_chunks, dtype=np.float64)
+        for start in range(0, num_chunks, batch_chunks):
+            end = min(start + batch_chunks, num_chunks)
+            out[start:end] = calculate_band_energies_batched(frames[start:end], basis, stride)
+        energies[band_key] = out
+    return energies
+
+
+class FeatureExtractionStep(ChunkStep):
+    def begin(self, ctx: AnalysisContext) -> None:
+        fe_cfg = ctx.config.get("feature_extraction", {})
+        method = fe_cfg.get("method", "reference")
+        if method not in _METHODS:
+            raise ValueError(
+                f"Unknown feature_extraction method: {method!r}. Available: {list(_METHODS)}"
+            )
+        bands = ctx.config.get("bands", {})
+        if method == "compiled":
+            kernel = "numba" if goertzel.available() else "numpy"
+        else:
+            kernel = "numpy"
+        ctx.scratch["feature_extraction"] = {
+            "method": method,
+            "kernel": kernel,
+            "step": fe_cfg.get("freq_step_hz", 0.5),
+            "stride": effective_stride(fe_cfg, ctx.metadata.get("decimation_factor", 1)),
+            "batch_chunks": max(1, int(fe_cfg.get("batch_chunks", 64))),
+            "cache_stats": {"hits": 0, "misses": 0},
+            "parts": {band_key: [] for band_key in bands},
+        }
+
+    def process_block(self, ctx: AnalysisContext, frames: np.ndarray) -> None:
+        state = ctx.scratch["feature_extraction"]
+        bands = ctx.config.get("bands", {})
+        if state["kernel"] == "numba":
+            block_energies = _extract_compiled(
+                frames, ctx.sample_rate, bands, state["step"], state["stride"],
+            )
+        elif state["method"] in ("batched", "compiled"):
+            block_energies = _extract_batched(
+                frames, ctx.sample_rate, bands, state["step"], state["stride"],
+                state["batch_chunks"], state["cache_stats"],
+            )
+        else:
+            block_energies = _extract_reference(
+                frames, ctx.sample_rate, bands, state["step"], state["stride"],
+            )
+        for band_key, arr in block_energies.items():
+            state["parts"][band_key].append(arr)
+
+    def finish(self, ctx: AnalysisContext) -> AnalysisContext:
+        state = ctx.scratch.pop("feature_extraction")
+        chunk_duration = ctx.config.get("chunk_duration_sec", 5.0)
+        bands = ctx.config.get("bands", {})
+        method = state["method"]
+
+        energies = {
+            band_key: np.concatenate(arrs) if arrs else np.zeros(0, dtype=np.float64)
+            for band_key, arrs in state["parts"].items()
+        }
+        num_chunks = len(next(iter(energies.values()))) if energies else 0
+
+        # 청크별 결과는 컬럼 배열로 구성 (밴드 에너지는 ctx.energies와 같은 배열을 공유)
+        ctx.energies = energies
+        ctx.chunk_table = ChunkTable.build(num_chunks, chunk_duration, energies)
 
         ctx.metadata["num_chunks"] = num_chunks
         ctx.metadata["chunk_duration_sec"] = chunk_duration
+        ctx.metadata["feature_extraction_method"] = method
+        ctx.metadata["feature_extraction_kernel"] = state["kernel"]
+        if method != "reference" and state["kernel"] == "numpy":
+            ctx.metadata["basis_cache"] = {
+                **state["cache_stats"],
+                "entries": len(get_basis_cache()),
+                "bytes": get_basis_cache().bytes,
+            }
 
         logger.info(
-            "feature_extraction chunks=%d bands=%s",
-            num_chunks, list(bands.keys()),
+            "feature_extraction method=%s kernel=%s chunks=%d bands=%s",
+            method, state["kernel"], num_chunks, list(bands.keys()),
         )
         return ctx
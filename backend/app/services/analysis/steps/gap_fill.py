@@ -1,14 +1,65 @@
 """GapFillStep: 짧은 갭 채우기 (≤N분).
 
 Ported from SoundLab/frontend/src/core/analysis.py Step 4.
+
+vectorized: 연속한 ON 청크 인덱스 쌍의 간격을 한 번에 계산하고,
+조건을 만족하는 갭 구간을 마스크로 채운다.
 """
 import logging
 
+import numpy as np
+
+from app.services.analysis.chunk_table import NOTE_CODES
 from app.services.analysis.pipeline import AnalysisContext, PipelineStep
+from app.services.analysis.steps.chunk_state import (
+    postprocess_method,
+    ranges_mask,
+    state_arrays,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _execute_reference(ctx: AnalysisContext, max_gap_min: float, chunk_duration: float) -> int:
+    chunks = ctx.chunks
+    filled_count = 0
+    last_on = -1
+
+    for i, chunk in enumerate(chunks):
+        if chunk["state"] == "ON":
+            if last_on != -1:
+                gap_min = (
+                    chunk["time_min"]
+                    - chunks[last_on]["time_min"]
+                    - (chunk_duration / 60.0)
+                )
+                if 0 < gap_min <= max_gap_min:
+                    for k in range(last_on + 1, i):
+                        chunks[k]["state"] = "ON"
+                        chunks[k]["note"] = "Gap_Filled"
+                        filled_count += 1
+            last_on = i
+
+    return filled_count
+
+
+def _execute_vectorized(ctx: AnalysisContext, max_gap_min: float, chunk_duration: float) -> int:
+    states, notes = state_arrays(ctx)
+    on_idx = np.flatnonzero(states)
+    if len(on_idx) < 2:
+        return 0
+
+    time_min = ctx.chunk_table.time_sec[on_idx] / 60.0
+    gap_min = time_min[1:] - time_min[:-1] - (chunk_duration / 60.0)
+    fill = (gap_min > 0) & (gap_min <= max_gap_min)
+    starts, ends = on_idx[:-1][fill] + 1, on_idx[1:][fill]
+
+    filled = np.flatnonzero(ranges_mask(len(states), starts, ends))
+    states[filled] = True
+    notes[filled] = NOTE_CODES["Gap_Filled"]
+    return len(filled)
+
+
 class GapFillStep(PipelineStep):
     def execute(self, ctx: AnalysisContext) -> AnalysisContext:
         config = ctx.config
@@ -16,24 +67,10 @@ class GapFillStep(PipelineStep):
         max_gap_min = gap_cfg.get("max_gap_minutes", 2.0)
         chunk_duration = config.get("chunk_duration_sec", 5.0)
 
-        chunks = ctx.chunks
-        filled_count = 0
-        last_on = -1
-
-        for i, chunk in enumerate(chunks):
-            if chunk["state"] == "ON":
-                if last_on != -1:
-                    gap_min = (
-                        chunk["time_min"]
-                        - chunks[last_on]["time_min"]
-                        - (chunk_duration / 60.0)
-                    )
-                    if 0 < gap_min <= max_gap_min:
-                        for k in range(last_on + 1, i):
-                            chunks[k]["state"] = "ON"
-                            chunks[k]["note"] = "Gap_Filled"
-                            filled_count += 1
-                last_on = i
+        if postprocess_method(ctx) == "vectorized":
+            filled_count = _execute_vectorized(ctx, max_gap_min, chunk_duration)
+        else:
+            filled_count = _execute_reference(ctx, max_gap_min, chunk_duration)
 
         ctx.metadata["gap_filled_chunks"] = filled_count
 
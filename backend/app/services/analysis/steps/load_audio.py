@@ -1,20 +1,33 @@
-"""LoadAudioStep: 멀티포맷 오디오 로딩 (WAV/FLAC/OGG + MP3/M4A ffmpeg 폴백), stereo→mono, float32 변환."""
+"""LoadAudioStep: 멀티포맷 오디오 로딩 (WAV/FLAC/OGG + MP3/M4A ffmpeg 폴백), stereo→mono, float32 변환.
+
+ffmpeg 폴백은 임시 WAV 파일 없이 stdout 파이프에서 float32 PCM을 직접 읽는다 (ffmpeg_pipe.py).
+
+스트리밍 모드 (config "load_audio.streaming"):
+전체 신호를 메모리에 올리지 않고 soundfile.blocks(또는 ffmpeg 파이프)로 청크 경계에 맞춘 mono 블록을
+ctx.signal_blocks 제너레이터로 제공한다. FeatureExtractionStep이 블록 단위로 소비하므로
+피크 메모리는 block_chunks 개 청크 분량으로 제한된다.
+
+데시메이션 (config "load_audio.decimate", decimation.py 참고):
+로드 직후 anti-aliasing 폴리페이즈 필터로 sample rate를 정수배 q만큼 낮춘다.
+ctx.sample_rate는 낮춘 rate가 되고, 원본 rate와 q는 metadata에 기록된다.
+스트리밍 모드에서도 블록 사이 필터 문맥을 이어 전체 로딩과 같은 결과를 만든다.
+"""
 import logging
 import os
-import shutil
-import subprocess
-import tempfile
+from typing import Iterator
 
 import numpy as np
 import soundfile as sf
 
+from app.services.analysis.decimation import DecimationPlan, decimate, decimate_blocks
+from app.services.analysis.ffmpeg_pipe import FfmpegPcmStream, decode_with_ffmpeg, find_ffmpeg
 from app.services.analysis.pipeline import AnalysisContext, PipelineStep
 
 logger = logging.getLogger(__name__)
 
 
-def _read_audio(file_path: str) -> tuple[int, np.ndarray]:
-    """Read audio file via soundfile, with ffmpeg fallback for MP3/M4A/AAC."""
+def _read_audio(file_path: str, load_cfg: dict | None = None) -> tuple[int, np.ndarray]:
+    """Read audio file via soundfile, with ffmpeg pipe fallback for MP3/M4A/AAC."""
     # soundfile handles WAV, FLAC, OGG, AIFF natively
     try:
         data, sample_rate = sf.read(file_path, dtype="float32")
@@ -22,39 +35,93 @@ def _read_audio(file_path: str) -> tuple[int, np.ndarray]:
     except Exception:
         logger.info("soundfile cannot read %s, trying ffmpeg fallback", file_path)
 
-    # ffmpeg fallback for MP3, M4A, AAC, etc.
-    ffmpeg_path = shutil.which("ffmpeg")
-    if not ffmpeg_path:
-        raise RuntimeError(
-            f"Cannot read {file_path}: soundfile failed and ffmpeg not found"
-        )
+    # ffmpeg fallback for MP3, M4A, AAC, etc. (mono float32, no temp file)
+    return decode_with_ffmpeg(file_path, load_cfg)
+
+
+def _iter_mono_blocks(file_path: str, block_frames: int) -> Iterator[np.ndarray]:
+    """soundfile에서 block_frames 길이의 float32 mono 블록을 순서대로 생성 (마지막 블록은 더 짧을 수 있음)."""
+    for block in sf.blocks(file_path, blocksize=block_frames, dtype="float32", always_2d=True):
+        if block.shape[1] > 1:
+            yield block.mean(axis=1)
+        else:
+            yield np.ascontiguousarray(block[:, 0])
 
-    tmp_wav = None
+
+def _iter_ffmpeg_blocks(stream: FfmpegPcmStream, block_frames: int) -> Iterator[np.ndarray]:
+    """ffmpeg 파이프에서 _iter_mono_blocks()와 같은 블록을 생성. 중간에 멈추면 ffmpeg을 종료한다."""
     try:
-        fd, tmp_wav = tempfile.mkstemp(suffix=".wav")
-        os.close(fd)
-        subprocess.run(
-            [ffmpeg_path, "-y", "-i", file_path,
-             "-f", "wav", "-acodec", "pcm_s16le", tmp_wav],
-            capture_output=True, check=True, timeout=120,
-        )
-        data, sample_rate = sf.read(tmp_wav, dtype="float32")
-        return sample_rate, data
+        yield from stream.iter_blocks(block_frames)
     finally:
-        if tmp_wav and os.path.exists(tmp_wav):
-            try:
-                os.remove(tmp_wav)
-            except OSError:
-                pass
+        stream.close()
+
+
+def _chunk_aligned(blocks: Iterator[np.ndarray], chunk_samples: int) -> Iterator[np.ndarray]:
+    """블록을 청크 경계에 맞춘다. 마지막 불완전 청크는 버린다 (전체 로딩 시 num_chunks 계산과 동일)."""
+    for block in blocks:
+        usable = (len(block) // chunk_samples) * chunk_samples
+        if usable > 0:
+            yield block[:usable]
+
+
+def _block_chunks(load_cfg: dict) -> int:
+    return max(1, int(load_cfg.get("block_chunks", 16)))
+
+
+def _iter_signal_blocks(signal: np.ndarray, block_frames: int, chunk_samples: int) -> Iterator[np.ndarray]:
+    """이미 로드된 신호를 스트리밍 블록과 같은 모양(청크 경계 정렬)으로 분할."""
+    usable = (len(signal) // chunk_samples) * chunk_samples
+    for start in range(0, usable, block_frames):
+        yield signal[start:min(start + block_frames, usable)]
 
 
 class LoadAudioStep(PipelineStep):
     def execute(self, ctx: AnalysisContext) -> AnalysisContext:
-        file_path = ctx.file_path
+        self._record_file_size(ctx)
+
+        load_cfg = ctx.config.get("load_audio", {})
+        if load_cfg.get("streaming", False):
+            blocks = self._open_stream(ctx, load_cfg)
+            if blocks is None:
+                blocks = self._open_ffmpeg_stream(ctx, load_cfg)
+            if blocks is not None:
+                ctx.signal_blocks = blocks
+                return ctx
+
+        self._load_whole(ctx)
+        return ctx
+
+    def open_blocks(self, ctx: AnalysisContext) -> Iterator[np.ndarray]:
+        """스트리밍 파이프라인 모드의 블록 소스.
+
+        soundfile로 읽을 수 없는 포맷은 ffmpeg 파이프에서 블록 단위로 읽고,
+        ffmpeg도 없으면 전체 로딩 후 같은 크기의 블록으로 나눈다.
+        """
+        self._record_file_size(ctx)
 
-        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        load_cfg = ctx.config.get("load_audio", {})
+        blocks = self._open_stream(ctx, load_cfg)
+        if blocks is not None:
+            return blocks
 
-        sample_rate, data = _read_audio(file_path)
+        blocks = self._open_ffmpeg_stream(ctx, load_cfg)
+        if blocks is not None:
+            return blocks
+
+        self._load_whole(ctx)
+        signal, ctx.signal = ctx.signal, None
+        chunk_samples = ctx.chunk_samples
+        if chunk_samples <= 0:
+            return iter(())
+        return _iter_signal_blocks(signal, chunk_samples * _block_chunks(load_cfg), chunk_samples)
+
+    def _record_file_size(self, ctx: AnalysisContext) -> None:
+        size_mb = os.path.getsize(ctx.file_path) / (1024 * 1024)
+        ctx.metadata["file_size_mb"] = round(size_mb, 1)
+
+    def _load_whole(self, ctx: AnalysisContext) -> None:
+        file_path = ctx.file_path
+        sample_rate, data = _read_audio(file_path, ctx.config.get("load_audio", {}))
 
         # Stereo → Mono
         if len(data.shape) > 1:
@@ -64,12 +131,68 @@ class LoadAudioStep(PipelineStep):
         if data.dtype != np.float32:
             data = data.astype(np.float32)
 
-        ctx.sample_rate = sample_rate
-        ctx.signal = data
-        ctx.metadata["file_size_mb"] = round(size_mb, 1)
+        plan = self._set_sample_rate(ctx, sample_rate)
+        ctx.signal = decimate(data, plan)
 
         logger.info(
-            "load_audio file=%s size_mb=%.1f sr=%d samples=%d",
-            file_path, size_mb, sample_rate, len(data),
+            "load_audio file=%s size_mb=%.1f sr=%d samples=%d decimation=%d",
+            file_path, ctx.metadata["file_size_mb"], ctx.sample_rate, len(ctx.signal), plan.q,
         )
-        return ctx
+
+    def _set_sample_rate(self, ctx: AnalysisContext, source_rate: int) -> DecimationPlan:
+        """데시메이션 설정을 정하고 ctx.sample_rate를 분석 rate로 설정."""
+        plan = DecimationPlan.from_config(ctx.config, source_rate)
+        ctx.sample_rate = plan.output_rate
+        if plan.q > 1:
+            ctx.metadata["source_sample_rate"] = source_rate
+            ctx.metadata["decimation_factor"] = plan.q
+        return plan
+
+    def _open_stream(self, ctx: AnalysisContext, load_cfg: dict) -> Iterator[np.ndarray] | None:
+        """soundfile로 읽을 수 있으면 블록 제너레이터를 반환, 아니면 None."""
+        try:
+            info = sf.info(ctx.file_path)
+        except Exception:
+            logger.info(
+                "load_audio soundfile streaming unavailable for %s", ctx.file_path,
+            )
+            return None
+
+        plan = self._set_sample_rate(ctx, info.samplerate)
+        chunk_samples = ctx.chunk_samples
+        if chunk_samples <= 0:
+            return None
+        block_chunks = _block_chunks(load_cfg)
+
+        ctx.metadata["num_frames"] = info.frames
+        ctx.metadata["streaming"] = True
+
+        logger.info(
+            "load_audio file=%s size_mb=%.1f sr=%d frames=%d streaming block_chunks=%d decimation=%d",
+            ctx.file_path, ctx.metadata["file_size_mb"], info.samplerate, info.frames, block_chunks, plan.q,
+        )
+        blocks = _iter_mono_blocks(ctx.file_path, chunk_samples * plan.q * block_chunks)
+        return _chunk_aligned(decimate_blocks(blocks, plan), chunk_samples)
+
+    def _open_ffmpeg_stream(self, ctx: AnalysisContext, load_cfg: dict) -> Iterator[np.ndarray] | None:
+        """ffmpeg 파이프 블록 제너레이터를 반환. ffmpeg이 없으면 None."""
+        if not find_ffmpeg():
+            return None
+
+        stream = FfmpegPcmStream(ctx.file_path, load_cfg).open()
+        plan = self._set_sample_rate(ctx, stream.sample_rate)
+        chunk_samples = ctx.chunk_samples
+        if chunk_samples <= 0:
+            stream.close()
+            return iter(())
+        block_chunks = _block_chunks(load_cfg)
+
+        ctx.metadata["streaming"] = True
+        ctx.metadata["decoder"] = "ffmpeg"
+
+        logger.info(
+            "load_audio file=%s size_mb=%.1f sr=%d channels=%d streaming(ffmpeg) block_chunks=%d decimation=%d",
+            ctx.file_path, ctx.metadata["file_size_mb"], stream.sample_rate, stream.channels, block_chunks, plan.q,
+        )
+        blocks = _iter_ffmpeg_blocks(stream, chunk_samples * plan.q * block_chunks)
+        return _chunk_aligned(decimate_blocks(blocks, plan), chunk_samples)
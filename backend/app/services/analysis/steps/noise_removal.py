@@ -1,14 +1,67 @@
 """NoiseRemovalStep: 짧은 세그먼트 필터링.
 
 Ported from SoundLab/frontend/src/core/analysis.py Step 6.
+
+vectorized: ON 구간을 run-length로 구해 길이가 min_dur_chunks 미만인 구간을 한 번에 OFF로 바꾼다.
 """
 import logging
 
+import numpy as np
+
+from app.services.analysis.chunk_table import NOTE_CODES
 from app.services.analysis.pipeline import AnalysisContext, PipelineStep
+from app.services.analysis.steps.chunk_state import (
+    on_runs,
+    postprocess_method,
+    ranges_mask,
+    state_arrays,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _execute_reference(ctx: AnalysisContext, min_dur_chunks: int) -> int:
+    chunks = ctx.chunks
+    removed_count = 0
+    on_start = -1
+
+    for i, chunk in enumerate(chunks):
+        if chunk["state"] == "ON":
+            if on_start == -1:
+                on_start = i
+        else:
+            if on_start != -1:
+                seg_len = i - on_start
+                if seg_len < min_dur_chunks:
+                    for k in range(on_start, i):
+                        chunks[k]["state"] = "OFF"
+                        chunks[k]["note"] = "Noise_Removed"
+                        removed_count += 1
+                on_start = -1
+
+    # 마지막 세그먼트 체크
+    if on_start != -1:
+        seg_len = len(chunks) - on_start
+        if seg_len < min_dur_chunks:
+            for k in range(on_start, len(chunks)):
+                chunks[k]["state"] = "OFF"
+                chunks[k]["note"] = "Noise_Removed"
+                removed_count += 1
+
+    return removed_count
+
+
+def _execute_vectorized(ctx: AnalysisContext, min_dur_chunks: int) -> int:
+    states, notes = state_arrays(ctx)
+    run_starts, run_ends = on_runs(states)
+    short = (run_ends - run_starts) < min_dur_chunks
+    removed = np.flatnonzero(ranges_mask(len(states), run_starts[short], run_ends[short]))
+
+    states[removed] = False
+    notes[removed] = NOTE_CODES["Noise_Removed"]
+    return len(removed)
+
+
 class NoiseRemovalStep(PipelineStep):
     def execute(self, ctx: AnalysisContext) -> AnalysisContext:
         config = ctx.config
@@ -18,32 +71,10 @@ class NoiseRemovalStep(PipelineStep):
         min_dur_min = nr_cfg.get("min_segment_duration_minutes", 1.0)
         min_dur_chunks = int(min_dur_min * 60.0 / chunk_duration)
 
-        chunks = ctx.chunks
-        removed_count = 0
-        on_start = -1
-
-        for i, chunk in enumerate(chunks):
-            if chunk["state"] == "ON":
-                if on_start == -1:
-                    on_start = i
-            else:
-                if on_start != -1:
-                    seg_len = i - on_start
-                    if seg_len < min_dur_chunks:
-                        for k in range(on_start, i):
-                            chunks[k]["state"] = "OFF"
-                            chunks[k]["note"] = "Noise_Removed"
-                            removed_count += 1
-                    on_start = -1
-
-        # 마지막 세그먼트 체크
-        if on_start != -1:
-            seg_len = len(chunks) - on_start
-            if seg_len < min_dur_chunks:
-                for k in range(on_start, len(chunks)):
-                    chunks[k]["state"] = "OFF"
-                    chunks[k]["note"] = "Noise_Removed"
-                    removed_count += 1
+        if postprocess_method(ctx) == "vectorized":
+            removed_count = _execute_vectorized(ctx, min_dur_chunks)
+        else:
+            removed_count = _execute_reference(ctx, min_dur_chunks)
 
         ctx.metadata["noise_removed_chunks"] = removed_count
 
@@ -1,71 +1,130 @@
 """StateMachineStep: ON/OFF 상태 전이.
 
 Ported from SoundLab/frontend/src/core/analysis.py Step 3.
+
+vectorized: 청크마다 전이 함수 f_i(OFF)=start_i, f_i(ON)=keep_i 는
+상수(ON/OFF), 항등, 반전 중 하나다. 상태는 "마지막 상수 전이의 값 XOR 그 이후 반전 횟수의 홀짝"이므로
+누적 최대값/누적합으로 순차 루프 없이 계산한다.
 """
 import logging
 
+import numpy as np
+
+from app.services.analysis.chunk_table import NOTE_CODES
 from app.services.analysis.pipeline import AnalysisContext, PipelineStep
+from app.services.analysis.steps.chunk_state import (
+    band_values,
+    postprocess_method,
+    state_arrays,
+)
 
 logger = logging.getLogger(__name__)
 
 
-class StateMachineStep(PipelineStep):
-    def execute(self, ctx: AnalysisContext) -> AnalysisContext:
-        config = ctx.config
-        threshold_cfg = config.get("threshold", {})
-        hysteresis = threshold_cfg.get("hysteresis_factor", 0.8)
+def _execute_reference(ctx: AnalysisContext, hysteresis: float) -> int:
+    threshold_id = ctx.thresholds.get("id_wide", 0.0)
+    threshold_surge_60 = ctx.thresholds.get("surge_60", 0.0)
+    threshold_surge_120 = ctx.thresholds.get("surge_120", 0.0)
 
-        threshold_id = ctx.thresholds.get("id_wide", 0.0)
-        threshold_surge_60 = ctx.thresholds.get("surge_60", 0.0)
-        threshold_surge_120 = ctx.thresholds.get("surge_120", 0.0)
+    energies_id = ctx.energies.get("id_wide", [])
+    energies_60 = ctx.energies.get("surge_60", [])
+    energies_120 = ctx.energies.get("surge_120", [])
 
-        energies_id = ctx.energies.get("id_wide", [])
-        energies_60 = ctx.energies.get("surge_60", [])
-        energies_120 = ctx.energies.get("surge_120", [])
+    current_state = "OFF"
+    on_count = 0
 
-        current_state = "OFF"
-        on_count = 0
+    for i, chunk in enumerate(ctx.chunks):
+        val_id = energies_id[i] if i < len(energies_id) else 0.0
+        val_60 = energies_60[i] if i < len(energies_60) else 0.0
+        val_120 = energies_120[i] if i < len(energies_120) else 0.0
 
-        for i, chunk in enumerate(ctx.chunks):
-            val_id = energies_id[i] if i < len(energies_id) else 0.0
-            val_60 = energies_60[i] if i < len(energies_60) else 0.0
-            val_120 = energies_120[i] if i < len(energies_120) else 0.0
+        is_id_active = val_id > threshold_id
+        is_surge = (val_60 > threshold_surge_60) and (val_120 > threshold_surge_120)
 
-            is_id_active = val_id > threshold_id
-            is_surge = (val_60 > threshold_surge_60) and (val_120 > threshold_surge_120)
-
-            if current_state == "OFF":
-                if is_id_active:
-                    current_state = "ON"
-                    chunk["state"] = "ON"
-                    chunk["note"] = "ID_Wide_Start"
-                    on_count += 1
-                elif is_surge:
-                    current_state = "ON"
-                    chunk["state"] = "ON"
-                    chunk["note"] = "Startup_Surge_Start"
-                    on_count += 1
-                else:
-                    chunk["state"] = "OFF"
+        if current_state == "OFF":
+            if is_id_active:
+                current_state = "ON"
+                chunk["state"] = "ON"
+                chunk["note"] = "ID_Wide_Start"
+                on_count += 1
+            elif is_surge:
+                current_state = "ON"
+                chunk["state"] = "ON"
+                chunk["note"] = "Startup_Surge_Start"
+                on_count += 1
+            else:
+                chunk["state"] = "OFF"
+        else:
+            # Currently ON
+            if is_id_active:
+                chunk["state"] = "ON"
+                chunk["note"] = "ID_Wide_Sustain"
+                on_count += 1
             else:
-                # Currently ON
-                if is_id_active:
+                if val_id < threshold_id * hysteresis:
+                    current_state = "OFF"
+                    chunk["state"] = "OFF"
+                else:
                     chunk["state"] = "ON"
-                    chunk["note"] = "ID_Wide_Sustain"
+                    chunk["note"] = "Hysteresis_Sustain"
                     on_count += 1
-                else:
-                    if val_id < threshold_id * hysteresis:
-                        current_state = "OFF"
-                        chunk["state"] = "OFF"
-                    else:
-                        chunk["state"] = "ON"
-                        chunk["note"] = "Hysteresis_Sustain"
-                        on_count += 1
+
+    return on_count
+
+
+def _execute_vectorized(ctx: AnalysisContext, hysteresis: float) -> int:
+    states, notes = state_arrays(ctx)
+    n = len(states)
+    if n == 0:
+        return 0
+
+    threshold_id = ctx.thresholds.get("id_wide", 0.0)
+    val_id = band_values(ctx, "id_wide", n)
+    val_60 = band_values(ctx, "surge_60", n)
+    val_120 = band_values(ctx, "surge_120", n)
+
+    is_id_active = val_id > threshold_id
+    is_surge = (val_60 > ctx.thresholds.get("surge_60", 0.0)) & (val_120 > ctx.thresholds.get("surge_120", 0.0))
+    start = is_id_active | is_surge                                   # OFF → ?
+    keep = is_id_active | ~(val_id < threshold_id * hysteresis)       # ON → ?
+
+    # 상수 전이(start == keep) 이후의 반전(start & ~keep) 횟수 홀짝으로 상태 결정
+    idx = np.arange(n)
+    last_const = np.maximum.accumulate(np.where(start == keep, idx, -1))
+    flips = np.cumsum(start & ~keep)
+    has_const = last_const >= 0
+    safe_last = np.where(has_const, last_const, 0)
+    base = has_const & start[safe_last]
+    parity = (flips - np.where(has_const, flips[safe_last], 0)) & 1
+    on = base ^ parity.astype(bool)
+
+    prev_on = np.concatenate(([False], on[:-1]))
+    new_notes = np.where(
+        prev_on,
+        np.where(is_id_active, NOTE_CODES["ID_Wide_Sustain"], NOTE_CODES["Hysteresis_Sustain"]),
+        np.where(is_id_active, NOTE_CODES["ID_Wide_Start"], NOTE_CODES["Startup_Surge_Start"]),
+    )
+
+    states[:] = on
+    notes[on] = new_notes[on]
+    return int(on.sum())
+
+
+class StateMachineStep(PipelineStep):
+    def execute(self, ctx: AnalysisContext) -> AnalysisContext:
+        config = ctx.config
+        threshold_cfg = config.get("threshold", {})
+        hysteresis = threshold_cfg.get("hysteresis_factor", 0.8)
+
+        if postprocess_method(ctx) == "vectorized":
+            on_count = _execute_vectorized(ctx, hysteresis)
+        else:
+            on_count = _execute_reference(ctx, hysteresis)
 
         ctx.metadata["on_chunks_after_state_machine"] = on_count
 
         logger.info(
             "state_machine on_count=%d total=%d hysteresis=%.2f",
-            on_count, len(ctx.chunks), hysteresis,
+            on_count, ctx.num_chunks, hysteresis,
         )
         return ctx
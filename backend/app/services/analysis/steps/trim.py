@@ -1,14 +1,96 @@
 """TrimStep: 드롭오프 구간 안전 제거 (Smart Trimming).
 
 Ported from SoundLab/frontend/src/core/analysis.py Step 5.
+
+vectorized: 모든 청크의 드롭 조건을 한 번에 계산하고, ON 구간마다 안전 버퍼 이후
+처음 조건을 만족하는 청크부터 구간 끝까지를 OFF로 바꾼다.
 """
 import logging
 
+import numpy as np
+
+from app.services.analysis.chunk_table import NOTE_CODES
 from app.services.analysis.pipeline import AnalysisContext, PipelineStep
+from app.services.analysis.steps.chunk_state import (
+    band_values,
+    on_runs,
+    postprocess_method,
+    ranges_mask,
+    state_arrays,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _execute_reference(
+    ctx: AnalysisContext, chunks_safety: int, drop_ratio: float, drop_threshold_factor: float,
+) -> int:
+    threshold_id = ctx.thresholds.get("id_wide", 0.0)
+    energies_id = ctx.energies.get("id_wide", [])
+    chunks = ctx.chunks
+
+    trimmed_count = 0
+    seg_start = -1
+
+    for i in range(len(chunks)):
+        if chunks[i]["state"] == "ON":
+            if seg_start == -1:
+                seg_start = i
+
+            if i > seg_start + chunks_safety and i > 0:
+                prev_val = energies_id[i - 1] if (i - 1) < len(energies_id) else 0
+                curr_val = energies_id[i] if i < len(energies_id) else 0
+                ratio = (curr_val / prev_val) if prev_val > 0 else 1.0
+
+                if ratio < drop_ratio and curr_val < threshold_id * drop_threshold_factor:
+                    for k in range(i, len(chunks)):
+                        if chunks[k]["state"] == "OFF":
+                            break
+                        chunks[k]["state"] = "OFF"
+                        chunks[k]["note"] = "Trimmed_DropOff"
+                        trimmed_count += 1
+                    seg_start = -1
+        else:
+            seg_start = -1
+
+    return trimmed_count
+
+
+def _execute_vectorized(
+    ctx: AnalysisContext, chunks_safety: int, drop_ratio: float, drop_threshold_factor: float,
+) -> int:
+    states, notes = state_arrays(ctx)
+    n = len(states)
+    run_starts, run_ends = on_runs(states)
+    if len(run_starts) == 0:
+        return 0
+
+    curr = band_values(ctx, "id_wide", n)
+    prev = np.concatenate(([0.0], curr[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(prev > 0, curr / np.where(prev > 0, prev, 1.0), 1.0)
+    drop = (ratio < drop_ratio) & (curr < ctx.thresholds.get("id_wide", 0.0) * drop_threshold_factor)
+
+    # 각 청크가 속한 ON 구간 번호와 그 시작 인덱스
+    idx = np.arange(n)
+    is_run_start = np.zeros(n, dtype=bool)
+    is_run_start[run_starts] = True
+    run_id = np.cumsum(is_run_start) - 1
+    seg_start = run_starts[np.maximum(run_id, 0)]
+    eligible = states & drop & (idx > seg_start + chunks_safety) & (idx > 0)
+
+    cut_idx = np.flatnonzero(eligible)
+    if len(cut_idx) == 0:
+        return 0
+    # 구간마다 첫 번째 드롭 지점부터 구간 끝까지
+    cut_runs, first = np.unique(run_id[cut_idx], return_index=True)
+    trimmed = np.flatnonzero(ranges_mask(n, cut_idx[first], run_ends[cut_runs]))
+
+    states[trimmed] = False
+    notes[trimmed] = NOTE_CODES["Trimmed_DropOff"]
+    return len(trimmed)
+
+
 class TrimStep(PipelineStep):
     def execute(self, ctx: AnalysisContext) -> AnalysisContext:
         config = ctx.config
@@ -19,34 +101,11 @@ class TrimStep(PipelineStep):
         drop_ratio = trim_cfg.get("drop_ratio", 0.5)
         drop_threshold_factor = trim_cfg.get("drop_threshold_factor", 0.5)
 
-        threshold_id = ctx.thresholds.get("id_wide", 0.0)
-        energies_id = ctx.energies.get("id_wide", [])
-        chunks = ctx.chunks
-
         chunks_safety = int(safety_buffer_sec / chunk_duration)
-        trimmed_count = 0
-        seg_start = -1
-
-        for i in range(len(chunks)):
-            if chunks[i]["state"] == "ON":
-                if seg_start == -1:
-                    seg_start = i
-
-                if i > seg_start + chunks_safety and i > 0:
-                    prev_val = energies_id[i - 1] if (i - 1) < len(energies_id) else 0
-                    curr_val = energies_id[i] if i < len(energies_id) else 0
-                    ratio = (curr_val / prev_val) if prev_val > 0 else 1.0
-
-                    if ratio < drop_ratio and curr_val < threshold_id * drop_threshold_factor:
-                        for k in range(i, len(chunks)):
-                            if chunks[k]["state"] == "OFF":
-                                break
-                            chunks[k]["state"] = "OFF"
-                            chunks[k]["note"] = "Trimmed_DropOff"
-                            trimmed_count += 1
-                        seg_start = -1
-            else:
-                seg_start = -1
+        if postprocess_method(ctx) == "vectorized":
+            trimmed_count = _execute_vectorized(ctx, chunks_safety, drop_ratio, drop_threshold_factor)
+        else:
+            trimmed_count = _execute_reference(ctx, chunks_safety, drop_ratio, drop_threshold_factor)
 
         ctx.metadata["trimmed_chunks"] = trimmed_count
 
@@ -2,6 +2,7 @@
 import logging
 from datetime import datetime, timezone
 
+from app.core import db
 from app.core.supabase_client import supabase
 from app.models.jobs import JobStatusResponse
 from app.models.upload import UploadJobStatus
@@ -9,7 +10,7 @@ from app.models.upload import UploadJobStatus
 logger = logging.getLogger(__name__)
 
 
-def register_job(
+async def register_job(
     job_id: str,
     status: UploadJobStatus = UploadJobStatus.queued,
     session_id: str | None = None,
@@ -29,7 +30,7 @@ def register_job(
         row["file_count"] = file_count
 
     try:
-        supabase.table("sst_jobs").insert(row).execute()
+        await db.execute(supabase.table("sst_jobs").insert(row))
     except Exception:
         # Common during upload bootstrap: session row may not exist yet.
         # Retry once without session_id so polling can still find the job row.
@@ -37,7 +38,7 @@ def register_job(
         if "session_id" in row:
             try:
                 fallback_row = {k: v for k, v in row.items() if k != "session_id"}
-                supabase.table("sst_jobs").insert(fallback_row).execute()
+                await db.execute(supabase.table("sst_jobs").insert(fallback_row))
                 logger.warning(
                     "Registered job %s without session_id due to FK timing; session_id will be patched later",
                     job_id,
@@ -46,7 +47,7 @@ def register_job(
                 logger.exception("Fallback register without session_id also failed for job %s", job_id)
 
 
-def set_job_status(
+async def set_job_status(
     job_id: str,
     *,
     status: UploadJobStatus,
@@ -54,6 +55,7 @@ def set_job_status(
     error: str | None = None,
     session_id: str | None = None,
     file_count: int | None = None,
+    queue_position: int | None = None,
 ):
     update: dict = {
         "status": status.value,
@@ -67,22 +69,30 @@ def set_job_status(
         update["session_id"] = session_id
     if file_count is not None:
         update["file_count"] = file_count
+    if queue_position is not None:
+        update["queue_position"] = queue_position
 
     try:
-        supabase.table("sst_jobs").update(update).eq("id", job_id).execute()
+        await db.execute(supabase.table("sst_jobs").update(update).eq("id", job_id))
     except Exception:
         logger.exception("Failed to update job %s", job_id)
+        # Environments without the queue_position migration: retry without it.
+        if "queue_position" in update:
+            try:
+                fallback_update = {k: v for k, v in update.items() if k != "queue_position"}
+                await db.execute(supabase.table("sst_jobs").update(fallback_update).eq("id", job_id))
+            except Exception:
+                logger.exception("Fallback update without queue_position also failed for job %s", job_id)
 
 
-def get_job(job_id: str) -> JobStatusResponse | None:
+async def get_job(job_id: str) -> JobStatusResponse | None:
     try:
         # Avoid maybe_single() 406/None edge-cases by querying as list.
-        res = (
+        res = await db.execute(
             supabase.table("sst_jobs")
             .select("*")
             .eq("id", job_id)
             .limit(1)
-            .execute()
         )
         rows = getattr(res, "data", None) or []
         if not rows:
@@ -95,6 +105,7 @@ def get_job(job_id: str) -> JobStatusResponse | None:
             session_id=d.get("session_id"),
             file_count=d.get("file_count"),
             error=d.get("error"),
+            queue_position=d.get("queue_position"),
         )
     except Exception:
         logger.exception("Failed to get job %s", job_id)
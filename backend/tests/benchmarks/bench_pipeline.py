@@ -0,0 +1,299 @@
+"""분석 파이프라인 성능 벤치마크 (장시간 합성 녹음).
+
+generate_test_fixtures.py의 픽스쳐(≤2분)로는 드러나지 않는 특징 추출/후처리의 성능 회귀를 잡기 위한
+독립 실행 스크립트. pytest 수집 대상이 아니다.
+
+Usage:
+    cd backend
+    python -m tests.benchmarks.bench_pipeline                          # quick 프로필, 결과만 출력
+    python -m tests.benchmarks.bench_pipeline --compare tests/benchmarks/baseline.json
+    python -m tests.benchmarks.bench_pipeline --profile full --save-baseline tests/benchmarks/baseline.json
+    python -m tests.benchmarks.bench_pipeline --durations 1h --rates 16000 --channels 2 --mode batch
+
+케이스 = 길이 × sample rate × 채널 수 (× pipeline 모드):
+- quick: 10m × {16000, 44100} Hz × {1, 2} ch
+- full:  {10m, 1h, 8h} × {16000, 44100, 48000} Hz × {1, 2} ch
+  (8h 44.1 kHz 스테레오 PCM_16은 약 5 GB — 합성 파일은 --fixtures-dir에 보관해 재사용한다)
+
+합성 신호는 10분 주기: 시작 10초 서지(60+120 Hz), 535 Hz 가동 구간 두 번, 그 사이 정지 구간, 약한 노이즈.
+블록 단위로 생성/기록하므로 길이와 무관하게 메모리를 적게 쓴다.
+
+각 케이스는 새 spawn 프로세스에서 실행한다 (최대 RSS가 케이스마다 독립적으로 측정됨).
+기저 행렬 warm-up 후 엔진(SoundLabV57Engine.analyze_output_sync)을 --repeat회 실행하고
+end-to-end wall/CPU 시간과 STEP_REGISTRY 스텝별 wall/CPU 시간(ctx.metadata["timings"])의 최솟값을 기록한다.
+기본 모드는 streaming이다 (batch 모드로 8h를 읽으면 신호 전체가 메모리에 올라감).
+
+--compare: 기준 JSON과 같은 케이스를 비교해 wall 시간이나 RSS 증가량이 --tolerance(기본 50%)보다
+나빠지면 종료 코드 1. 아주 짧은 스텝의 잡음은 --min-ms 이하 차이로 무시한다.
+기준 값은 측정한 머신에 종속적이므로 결과 JSON에 머신 정보를 함께 기록하고, 다르면 경고한다.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DURATIONS = {"10m": 600.0, "1h": 3600.0, "8h": 28800.0}
+PROFILES = {
+    "quick": {"durations": ["10m"], "rates": [16000, 44100], "channels": [1, 2]},
+    "full": {"durations": ["10m", "1h", "8h"], "rates": [16000, 44100, 48000], "channels": [1, 2]},
+}
+DEFAULT_FIXTURES_DIR = os.path.join(tempfile.gettempdir(), "sst-bench-fixtures")
+_CYCLE_SEC = 600.0
+_BLOCK_SEC = 60.0
+_RSS_NOISE_MB = 16.0
+# ru_maxrss 단위: Linux는 KB, macOS는 바이트
+_MAXRSS_DIVISOR = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    duration: str
+    sample_rate: int
+    channels: int
+    mode: str = "streaming"
+
+    @property
+    def case_id(self) -> str:
+        return f"{self.duration}_{self.sample_rate}hz_{self.channels}ch_{self.mode}"
+
+    @property
+    def duration_sec(self) -> float:
+        return DURATIONS[self.duration]
+
+
+# ─── 합성 녹음 ───
+
+
+def _synth_block(start: int, num: int, sample_rate: int, channels: int) -> np.ndarray:
+    """절대 샘플 위치 start부터 num개 (위상이 블록 경계에서 이어지도록 절대 시각으로 계산)."""
+    t = (start + np.arange(num, dtype=np.float64)) / sample_rate
+    phase = np.mod(t, _CYCLE_SEC)
+    surge = phase < 10.0
+    running = ((phase >= 30.0) & (phase < 270.0)) | ((phase >= 360.0) & (phase < 540.0))
+
+    mono = np.zeros(num, dtype=np.float64)
+    mono += surge * (0.4 * np.sin(2 * np.pi * 60.0 * t) + 0.3 * np.sin(2 * np.pi * 120.0 * t))
+    mono += running * 0.5 * np.sin(2 * np.pi * 535.0 * t)
+
+    rng = np.random.default_rng(start)
+    out = np.empty((num, channels), dtype=np.float32)
+    for ch in range(channels):
+        gain = 1.0 if ch == 0 else 0.8
+        out[:, ch] = gain * mono + rng.normal(0, 0.005, num)
+    return out
+
+
+def synth_recording(path: str, duration_sec: float, sample_rate: int, channels: int) -> str:
+    """PCM_16 WAV로 블록 단위 합성. 이미 있으면 그대로 사용."""
+    if os.path.exists(path):
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    total = int(duration_sec * sample_rate)
+    block = int(_BLOCK_SEC * sample_rate)
+    tmp_path = path + ".tmp"
+    with sf.SoundFile(tmp_path, "w", samplerate=sample_rate, channels=channels, subtype="PCM_16", format="WAV") as f:
+        for start in range(0, total, block):
+            f.write(_synth_block(start, min(block, total - start), sample_rate, channels))
+    os.replace(tmp_path, path)
+    return path
+
+
+def fixture_path(fixtures_dir: str, case: BenchCase) -> str:
+    return os.path.join(fixtures_dir, f"bench_{case.duration}_{case.sample_rate}hz_{case.channels}ch.wav")
+
+
+# ─── 케이스 실행 (워커 프로세스) ───
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / _MAXRSS_DIVISOR
+
+
+def run_case(path: str, case: BenchCase, repeat: int = 1) -> dict:
+    """현재 프로세스에서 엔진을 repeat회 실행하고 최솟값을 기록."""
+    from app.services.analysis.soundlab_v57 import SoundLabV57Engine
+    from app.services.analysis.steps import STEP_REGISTRY
+
+    step_names = {cls.__name__: name for name, cls in STEP_REGISTRY.items()}
+    engine = SoundLabV57Engine()
+    engine.warm_up([case.sample_rate])
+    config = {"pipeline": {"mode": case.mode}}
+    rss_before = _peak_rss_mb()
+
+    runs = []
+    for _ in range(max(1, repeat)):
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        output = engine.analyze_output_sync(path, config)
+        runs.append((
+            (time.perf_counter() - wall_start) * 1000,
+            (time.process_time() - cpu_start) * 1000,
+            output,
+        ))
+
+    steps: dict[str, dict] = {}
+    for _, _, output in runs:
+        for class_name, entry in output.timings.items():
+            name = step_names.get(class_name, class_name)
+            best = steps.setdefault(name, {"wall_ms": entry["wall_ms"], "cpu_ms": entry["cpu_ms"]})
+            best["wall_ms"] = round(min(best["wall_ms"], entry["wall_ms"]), 3)
+            best["cpu_ms"] = round(min(best["cpu_ms"], entry["cpu_ms"]), 3)
+
+    wall_ms = min(r[0] for r in runs)
+    peak_rss = _peak_rss_mb()
+    return {
+        **asdict(case),
+        "duration_sec": case.duration_sec,
+        "chunks": runs[0][2].features.num_chunks if runs[0][2].features is not None else 0,
+        "suggestions": len(runs[0][2].drafts),
+        "repeat": len(runs),
+        "engine_wall_ms": round(wall_ms, 3),
+        "engine_cpu_ms": round(min(r[1] for r in runs), 3),
+        "realtime_factor": round(case.duration_sec * 1000 / wall_ms, 1) if wall_ms > 0 else 0.0,
+        "peak_rss_mb": round(peak_rss, 1),
+        "rss_growth_mb": round(max(0.0, peak_rss - rss_before), 1),
+        "steps": steps,
+    }
+
+
+def _run_case_isolated(path: str, case: BenchCase, repeat: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(run_case, path, case, repeat).result()
+
+
+# ─── 기준 비교 ───
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float = 0.5, min_ms: float = 25.0) -> list[str]:
+    """기준 대비 회귀 목록. 기준에 없는 케이스/스텝은 비교하지 않는다."""
+    regressions = []
+
+    def check(label: str, current: float, base: float, floor: float) -> None:
+        if base > 0 and current > base * (1 + tolerance) and current - base > floor:
+            regressions.append(f"{label}: {base:.1f} -> {current:.1f} (+{(current / base - 1) * 100:.0f}%)")
+
+    for case_id, current in results["cases"].items():
+        base = baseline.get("cases", {}).get(case_id)
+        if base is None:
+            continue
+        check(f"{case_id} engine_wall_ms", current["engine_wall_ms"], base["engine_wall_ms"], min_ms)
+        check(f"{case_id} rss_growth_mb", current["rss_growth_mb"], base["rss_growth_mb"], _RSS_NOISE_MB)
+        for step, entry in current["steps"].items():
+            base_step = base.get("steps", {}).get(step)
+            if base_step is not None:
+                check(f"{case_id} {step}.wall_ms", entry["wall_ms"], base_step["wall_ms"], min_ms)
+    return regressions
+
+
+# ─── CLI ───
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline on long synthetic recordings.")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--durations", help=f"comma-separated subset of {list(DURATIONS)} (overrides profile)")
+    parser.add_argument("--rates", help="comma-separated sample rates (overrides profile)")
+    parser.add_argument("--channels", help="comma-separated channel counts (overrides profile)")
+    parser.add_argument("--mode", choices=["streaming", "batch"], default="streaming")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--fixtures-dir", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--save-baseline", help="write results JSON as the new baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against (exit 1 on regression)")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--min-ms", type=float, default=25.0)
+    return parser.parse_args(argv)
+
+
+def _cases(args: argparse.Namespace) -> list[BenchCase]:
+    profile = PROFILES[args.profile]
+    durations = args.durations.split(",") if args.durations else profile["durations"]
+    rates = [int(r) for r in args.rates.split(",")] if args.rates else profile["rates"]
+    channels = [int(c) for c in args.channels.split(",")] if args.channels else profile["channels"]
+    unknown = [d for d in durations if d not in DURATIONS]
+    if unknown:
+        raise SystemExit(f"unknown durations {unknown}; available: {list(DURATIONS)}")
+    return [BenchCase(d, r, c, args.mode) for d in durations for r in rates for c in channels]
+
+
+def _write_json(path: str, payload: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "cases": {},
+    }
+
+    for case in _cases(args):
+        path = fixture_path(args.fixtures_dir, case)
+        if not os.path.exists(path):
+            print(f"synthesizing {path} ...", file=sys.stderr)
+            synth_recording(path, case.duration_sec, case.sample_rate, case.channels)
+        result = _run_case_isolated(path, case, args.repeat)
+        results["cases"][case.case_id] = result
+        steps = " ".join(f"{name}={entry['wall_ms']:.0f}" for name, entry in result["steps"].items())
+        print(
+            f"{case.case_id}: wall_ms={result['engine_wall_ms']:.0f} x{result['realtime_factor']:.0f} realtime "
+            f"rss_growth_mb={result['rss_growth_mb']:.0f} | {steps}",
+            file=sys.stderr,
+        )
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            _write_json(path, results)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != results["machine"]:
+            print("warning: baseline was recorded on a different machine", file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance, args.min_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
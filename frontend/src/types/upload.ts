@@ -16,4 +16,5 @@ export interface JobStatusResponse {
   progress: number;
   result?: { sessionId: string; fileCount: number };
   error?: string;
+  queuePosition?: number;
 }
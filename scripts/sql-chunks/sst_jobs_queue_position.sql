@@ -0,0 +1,2 @@
+alter table public.sst_jobs
+  add column if not exists queue_position integer;
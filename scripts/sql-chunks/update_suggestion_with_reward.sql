@@ -0,0 +1,121 @@
+create or replace function public.update_suggestion_with_reward(
+  p_suggestion_id text,
+  p_user_id text,
+  p_update jsonb
+)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public, pg_temp
+as $$
+declare
+  v_previous_status text;
+  v_reward_granted_at timestamptz;
+  v_next_status text;
+  v_points integer := 0;
+  v_now_kst timestamp := now() at time zone 'Asia/Seoul';
+  v_suggestion public.sst_suggestions%rowtype;
+  v_mission record;
+  v_delta integer;
+  v_completed_at timestamptz;
+begin
+  -- Row lock: concurrent updates of the same suggestion are serialized,
+  -- so the pending -> confirmed/corrected transition rewards exactly once.
+  select status, reward_granted_at
+    into v_previous_status, v_reward_granted_at
+  from public.sst_suggestions
+  where id = p_suggestion_id
+  for update;
+
+  if not found then
+    return null;
+  end if;
+
+  update public.sst_suggestions set
+    status = coalesce(p_update->>'status', status),
+    label = coalesce(p_update->>'label', label),
+    description = coalesce(p_update->>'description', description),
+    start_time = coalesce((p_update->>'start_time')::double precision, start_time),
+    end_time = coalesce((p_update->>'end_time')::double precision, end_time),
+    freq_low = coalesce((p_update->>'freq_low')::int, freq_low),
+    freq_high = coalesce((p_update->>'freq_high')::int, freq_high),
+    updated_at = coalesce((p_update->>'updated_at')::timestamptz, now())
+  where id = p_suggestion_id
+  returning * into v_suggestion;
+
+  v_next_status := p_update->>'status';
+  if v_previous_status = 'pending'
+     and v_next_status in ('confirmed', 'corrected')
+     and v_reward_granted_at is null then
+    v_points := case when v_next_status = 'confirmed' then 10 else 20 end;
+
+    update public.sst_users set
+      today_score = today_score + v_points,
+      all_time_score = all_time_score + v_points
+    where id = p_user_id;
+
+    update public.sst_suggestions set
+      reward_granted_at = now(),
+      reward_points = v_points
+    where id = p_suggestion_id
+    returning * into v_suggestion;
+
+    insert into public.sst_reward_events (user_id, event_type, ref_type, ref_id, points, message)
+    values (p_user_id, 'score', 'suggestion', p_suggestion_id, v_points,
+            format('Suggestion %s: +%s', v_next_status, v_points));
+
+    for v_mission in
+      select * from public.sst_missions where is_active order by sort_order
+    loop
+      v_delta := case v_mission.target_type
+        when 'confirm_count' then (v_next_status = 'confirmed')::int
+        when 'fix_count' then (v_next_status = 'corrected')::int
+        when 'review_count' then 1
+        when 'score_gain' then v_points
+        else 0
+      end;
+      continue when v_delta <= 0;
+
+      -- completed_at = now() only when this transaction completed the mission
+      insert into public.sst_user_mission_progress as p (user_id, mission_id, period_key, progress, completed_at, updated_at)
+      values (
+        p_user_id,
+        v_mission.id,
+        -- missing scope counts as daily, like gamification/service.py
+        case when coalesce(v_mission.scope, 'daily') = 'daily'
+          then to_char(v_now_kst, 'YYYY-MM-DD')
+          else to_char(v_now_kst, 'IYYY-"W"IW')
+        end,
+        least(v_mission.target_value, v_delta),
+        case when v_delta >= v_mission.target_value then now() end,
+        now()
+      )
+      on conflict (user_id, mission_id, period_key) do update set
+        progress = least(v_mission.target_value, p.progress + v_delta),
+        completed_at = coalesce(
+          p.completed_at,
+          case when p.progress + v_delta >= v_mission.target_value then now() end
+        ),
+        updated_at = now()
+      returning p.completed_at into v_completed_at;
+
+      if v_completed_at = now() then
+        insert into public.sst_reward_events (user_id, event_type, ref_type, ref_id, points, message)
+        values (p_user_id, 'mission_completed', 'mission', v_mission.id, 0,
+                format('Mission completed: %s', v_mission.title));
+      end if;
+    end loop;
+  end if;
+
+  return jsonb_build_object(
+    'suggestion', to_jsonb(v_suggestion),
+    'previous_status', v_previous_status,
+    'reward_points', v_points
+  );
+end;
+$$;
+
+-- Called only by the backend with the service-role key: p_user_id is trusted input,
+-- so the function must not be reachable through PostgREST with the anon/authenticated keys.
+revoke execute on function public.update_suggestion_with_reward(text, text, jsonb) from public, anon, authenticated;
+grant execute on function public.update_suggestion_with_reward(text, text, jsonb) to service_role;